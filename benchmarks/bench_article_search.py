@@ -0,0 +1,93 @@
+"""
+Benchmark pencarian artikel semantik (/api/search/articles): top-k eksak float32 dan float16 dibandingkan
+indeks HNSW faiss. Mengukur latensi per kueri (p50/p95) dan recall@k HNSW terhadap hasil eksak.
+
+Embedding sintetis dibuat berkelompok (seperti topik) lalu disimpan sebagai .npy dan dibuka dengan memory-map,
+sama seperti di API. 1M x 384 float32 membutuhkan ~1,5 GB disk/page cache.
+
+Jalankan dari root proyek:
+    python -m benchmarks.bench_article_search --rows 1000000
+    python -m benchmarks.bench_article_search --embeddings data/final/topic_results/doc_embeddings_3.npy
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.article_search import ArticleEmbeddingIndex, build_faiss_index, faiss, normalize_embeddings
+
+def make_synthetic_embeddings(path, rows, dim, n_clusters=200, seed=42, chunk_rows=100000):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim)).astype(np.float32)
+    embeddings = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=(rows, dim))
+    for start in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - start)
+        block = centers[rng.integers(n_clusters, size=n)] + rng.normal(scale=0.8, size=(n, dim)).astype(np.float32)
+        embeddings[start:start + n] = normalize_embeddings(block)
+    embeddings.flush()
+    del embeddings
+
+def measure(label, index, queries, limit):
+    index.search(queries[0], limit)  # pemanasan (page cache, alokasi)
+    latencies, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        indices, _ = index.search(query, limit)
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append(indices)
+    p50, p95 = np.percentile(latencies, [50, 95])
+    print(f"{label:<16} p50 {p50:8.2f} ms  p95 {p95:8.2f} ms  {1000 / np.mean(latencies):8.1f} kueri/s")
+    return results
+
+def recall_at_k(approximate, exact):
+    return float(np.mean([len(set(a.tolist()) & set(e.tolist())) / max(len(e), 1) for a, e in zip(approximate, exact)]))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pencarian artikel: eksak vs HNSW faiss.")
+    parser.add_argument("--embeddings", default=None, help="doc_embeddings_<id>.npy nyata; default data sintetis.")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--skip-float16", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        embeddings_path = args.embeddings
+        if embeddings_path is None:
+            embeddings_path = os.path.join(tmp_dir, "doc_embeddings.npy")
+            print(f"Membuat {args.rows} x {args.dim} embedding sintetis...")
+            make_synthetic_embeddings(embeddings_path, args.rows, args.dim)
+        embeddings = np.load(embeddings_path, mmap_mode='r')
+        rng = np.random.default_rng(7)
+        # Kueri = artikel acak yang sedikit diganggu, sehingga tetangga terdekatnya bermakna
+        sample = rng.choice(embeddings.shape[0], size=args.queries, replace=False)
+        queries = normalize_embeddings(np.asarray(embeddings[np.sort(sample)], dtype=np.float32)
+                                       + rng.normal(scale=0.05, size=(args.queries, embeddings.shape[1])).astype(np.float32))
+        print(f"{embeddings.shape[0]} artikel x {embeddings.shape[1]} dimensi, {args.queries} kueri, top-{args.limit}")
+
+        exact = measure("eksak float32", ArticleEmbeddingIndex(embeddings), queries, args.limit)
+        if not args.skip_float16:
+            float16_path = os.path.join(tmp_dir, "doc_embeddings_f16.npy")
+            float16 = np.lib.format.open_memmap(float16_path, mode='w+', dtype=np.float16, shape=embeddings.shape)
+            for start in range(0, embeddings.shape[0], 100000):
+                float16[start:start + 100000] = embeddings[start:start + 100000]
+            float16.flush()
+            del float16
+            measure("eksak float16", ArticleEmbeddingIndex(np.load(float16_path, mmap_mode='r')), queries, args.limit)
+
+        if faiss is None:
+            print("faiss tidak terinstal (pip install faiss-cpu): HNSW dilewati.")
+            return
+        faiss_path = os.path.join(tmp_dir, "doc_embeddings.faiss")
+        started = time.perf_counter()
+        build_faiss_index(embeddings_path, faiss_path)
+        print(f"Indeks HNSW dibangun dalam {time.perf_counter() - started:.1f} s")
+        hnsw_index = ArticleEmbeddingIndex.load(embeddings_path, faiss_path, use_faiss=True)
+        approximate = measure("HNSW faiss", hnsw_index, queries, args.limit)
+        print(f"recall@{args.limit} HNSW terhadap eksak: {recall_at_k(approximate, exact):.3f}")
+
+if __name__ == "__main__":
+    main()
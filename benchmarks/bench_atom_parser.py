@@ -0,0 +1,60 @@
+"""
+Benchmark parser feed Atom: BeautifulSoup (parse_arxiv_feed_bs4 / parse_arxiv_entry) dibandingkan
+parser streaming lxml (parse_arxiv_feed_lxml). Memverifikasi hasil identik lalu mengukur throughput
+dan puncak alokasi memori (tracemalloc).
+
+Jalankan dari root proyek:
+    python -m benchmarks.bench_atom_parser                          # fixture, halaman 200 entri
+    python -m benchmarks.bench_atom_parser --feeds "data/raw_feeds/*.xml"
+"""
+import argparse
+import glob
+import time
+import tracemalloc
+
+from benchmarks.feed_server import DEFAULT_FIXTURE_GLOB, build_feed, load_entries
+from src.atom_parser import parse_arxiv_feed_lxml
+from src.scraper import parse_arxiv_feed_bs4
+
+def load_feeds(feed_glob, entries_per_page, pages):
+    """File feed nyata jika --feeds diberikan; selain itu halaman sintetis dari fixture (seperti respons arXiv)."""
+    if feed_glob != DEFAULT_FIXTURE_GLOB:
+        feeds = []
+        for path in sorted(glob.glob(feed_glob)):
+            with open(path, 'rb') as f:
+                feeds.append(f.read())
+        return feeds
+    entries = [entry for _, entry in load_entries(feed_glob, repeat=max(1, entries_per_page // 6 + 1))]
+    page = build_feed(entries[:entries_per_page], entries_per_page, 0, entries_per_page)
+    return [page] * pages
+
+def measure(label, parse_fn, feeds):
+    tracemalloc.start()
+    started = time.perf_counter()
+    results = [parse_fn(feed) for feed in feeds]
+    elapsed = time.perf_counter() - started
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    entries = sum(len(articles) for articles in results)
+    print(f"{label:<14} {elapsed:8.3f} s  {entries / elapsed:10.0f} entri/s  puncak memori {peak_bytes / 1e6:7.1f} MB")
+    return results, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parser feed Atom arXiv.")
+    parser.add_argument("--feeds", default=DEFAULT_FIXTURE_GLOB, help="Glob file feed Atom yang direkam.")
+    parser.add_argument("--entries-per-page", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=20)
+    args = parser.parse_args()
+
+    feeds = load_feeds(args.feeds, args.entries_per_page, args.pages)
+    print(f"Jumlah feed: {len(feeds)}, total ukuran: {sum(len(feed) for feed in feeds) / 1e6:.1f} MB")
+
+    bs4_results, bs4_seconds = measure("BeautifulSoup", parse_arxiv_feed_bs4, feeds)
+    lxml_results, lxml_seconds = measure("lxml iterparse", parse_arxiv_feed_lxml, feeds)
+
+    assert lxml_results == bs4_results, "Hasil parser lxml berbeda dari parse_arxiv_entry!"
+    print("Hasil identik dengan parse_arxiv_entry.")
+    print(f"Speedup: {bs4_seconds / lxml_seconds:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark pra-pemrosesan: implementasi lama (Series.apply + preprocess_text_pipeline per baris)
+dibandingkan mesin batch (preprocess_texts_batch / preprocess_texts_parallel).
+
+Jalankan dari root proyek:
+    python -m benchmarks.bench_preprocess --rows 200000 --n-jobs 4
+    python -m benchmarks.bench_preprocess --input data/rawdata/arxiv_cs_articles_by_date.jsonl
+"""
+import argparse
+import os
+import random
+import time
+
+import pandas as pd
+
+from src.preprocess import (load_data_from_jsonl, preprocess_text_pipeline, preprocess_texts_batch,
+                            preprocess_texts_parallel)
+from src.workers import load_english_stopwords
+
+SAMPLE_WORDS = ["learning", "the", "of", "neural", "networks", "graph", "a", "transformer", "for", "with",
+                "attention", "is", "robust", "optimization", "and", "Large-Scale", "LLMs", "3D", "can't",
+                "naïve", "α-divergence", "(GNN)", "state-of-the-art", "on", "data,", "x_{t+1}", "\tmodel\n"]
+
+def make_synthetic_corpus(rows, words_per_text, seed=42):
+    rng = random.Random(seed)
+    texts = [" ".join(rng.choices(SAMPLE_WORDS, k=words_per_text)) for _ in range(rows)]
+    texts[::1000] = [float("nan")] * len(texts[::1000])  # nilai kosong dari JSONL menjadi NaN di pandas
+    return pd.Series(texts)
+
+def time_it(label, fn):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<32} {elapsed:8.2f} s")
+    return result, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mesin pra-pemrosesan batch.")
+    parser.add_argument("--input", default=None, help="File JSONL nyata (kolom 'abstract'); default korpus sintetis.")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--words", type=int, default=150, help="Jumlah kata per teks sintetis (mirip abstrak).")
+    parser.add_argument("--n-jobs", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    if args.input:
+        series = load_data_from_jsonl(args.input)['abstract']
+    else:
+        series = make_synthetic_corpus(args.rows, args.words)
+    stopword_set = load_english_stopwords()
+    print(f"Jumlah teks: {len(series)}, stopwords: {len(stopword_set)}, n_jobs: {args.n_jobs}")
+
+    legacy, legacy_seconds = time_it("apply(preprocess_text_pipeline)",
+                                     lambda: series.apply(lambda x: preprocess_text_pipeline(x, stopword_set)).tolist())
+    single, single_seconds = time_it("preprocess_texts_batch",
+                                     lambda: preprocess_texts_batch(series, stopword_set))
+    parallel, parallel_seconds = time_it(f"preprocess_texts_parallel({args.n_jobs})",
+                                         lambda: preprocess_texts_parallel(series, stopword_set, n_jobs=args.n_jobs))
+
+    assert single == legacy, "Hasil preprocess_texts_batch berbeda dari implementasi lama!"
+    assert parallel == legacy, "Hasil preprocess_texts_parallel berbeda dari implementasi lama!"
+    print("Hasil identik dengan implementasi lama.")
+    print(f"Speedup single-core: {legacy_seconds / single_seconds:.2f}x, "
+          f"multi-core: {legacy_seconds / parallel_seconds:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Server HTTP lokal pengganti arXiv API untuk menguji scraper tanpa jaringan.
+
+Entri dimuat dari file feed Atom (default: benchmarks/fixtures/*.xml) lalu disajikan seperti arXiv:
+filter `submittedDate:[YYYYMMDD TO YYYYMMDD]` dari search_query, urut published menurun, paginasi
+dengan start/max_results. --repeat memperbanyak entri (salinan diberi id/judul berbeda dan tanpa DOI)
+untuk volume besar, --latency mensimulasikan waktu respons arXiv. GET /stats mengembalikan jumlah
+request dan jarak antar request terkecil (untuk memeriksa pembatas laju scraper).
+
+    python -m benchmarks.feed_server --port 8765 --repeat 200 --latency 0.5
+    python src/async_scraper.py --start 2024-04 --end 2024-05 --api-url http://127.0.0.1:8765/api/query? --rate-interval 0
+"""
+import argparse
+import copy
+import glob
+import json
+import os
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+ARXIV_NS = "http://arxiv.org/schemas/atom"
+OPENSEARCH_NS = "http://a9.com/-/spec/opensearch/1.1/"
+ET.register_namespace('', ATOM_NS)
+ET.register_namespace('arxiv', ARXIV_NS)
+ET.register_namespace('opensearch', OPENSEARCH_NS)
+
+DEFAULT_FIXTURE_GLOB = os.path.join(os.path.dirname(__file__), "fixtures", "*.xml")
+DATE_FILTER_PATTERN = re.compile(r'submittedDate:\[(\d{8})\s+TO\s+(\d{8})\]')
+
+def _tag(namespace, name):
+    return f"{{{namespace}}}{name}"
+
+def load_entries(fixture_glob, repeat=1):
+    """Memuat semua <entry> dari file fixture; hasilnya list (published_yyyymmdd, element) urut menurun."""
+    entries = []
+    for path in sorted(glob.glob(fixture_glob)):
+        for entry in ET.parse(path).getroot().iter(_tag(ATOM_NS, 'entry')):
+            published = entry.findtext(_tag(ATOM_NS, 'published'), default='')
+            entries.append((published[:10].replace('-', ''), entry))
+            for copy_number in range(1, repeat):
+                entries.append((published[:10].replace('-', ''), make_variant(entry, copy_number)))
+    entries.sort(key=lambda item: item[0], reverse=True)
+    return entries
+
+def make_variant(entry, copy_number):
+    """Salinan entri dengan id dan judul unik, tanpa DOI, agar tidak dianggap duplikat oleh dedup."""
+    variant = copy.deepcopy(entry)
+    id_element = variant.find(_tag(ATOM_NS, 'id'))
+    if id_element is not None:
+        id_element.text = f"{id_element.text}-{copy_number}"
+    title_element = variant.find(_tag(ATOM_NS, 'title'))
+    if title_element is not None:
+        title_element.text = f"{title_element.text} (copy {copy_number})"
+    for doi_element in variant.findall(_tag(ARXIV_NS, 'doi')):
+        variant.remove(doi_element)
+    for link in variant.findall(_tag(ATOM_NS, 'link')):
+        if link.get('title') == 'doi':
+            variant.remove(link)
+    return variant
+
+def build_feed(entries, total_results, start, max_results):
+    feed = ET.Element(_tag(ATOM_NS, 'feed'))
+    ET.SubElement(feed, _tag(ATOM_NS, 'title')).text = "ArXiv Query (server lokal)"
+    ET.SubElement(feed, _tag(OPENSEARCH_NS, 'totalResults')).text = str(total_results)
+    ET.SubElement(feed, _tag(OPENSEARCH_NS, 'startIndex')).text = str(start)
+    ET.SubElement(feed, _tag(OPENSEARCH_NS, 'itemsPerPage')).text = str(max_results)
+    feed.extend(entries)
+    return ET.tostring(feed, encoding='utf-8', xml_declaration=True)
+
+class FeedServerState:
+    def __init__(self, entries, latency):
+        self.entries = entries
+        self.latency = latency
+        self.request_count = 0
+        self.min_interval_seconds = None
+        self._last_request_at = None
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._last_request_at is not None:
+                interval = now - self._last_request_at
+                if self.min_interval_seconds is None or interval < self.min_interval_seconds:
+                    self.min_interval_seconds = interval
+            self._last_request_at = now
+            self.request_count += 1
+
+def make_handler(state):
+    class FeedRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, agar connection pooling klien ikut teruji
+
+        def _send(self, status, body, content_type):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path == "/stats":
+                body = json.dumps({"requests": state.request_count,
+                                   "min_interval_seconds": state.min_interval_seconds}).encode('utf-8')
+                return self._send(200, body, "application/json")
+            if parsed.path != "/api/query":
+                return self._send(404, b"not found", "text/plain")
+
+            state.record_request()
+            params = parse_qs(parsed.query)
+            query = params.get("search_query", [""])[0]
+            start = int(params.get("start", ["0"])[0])
+            max_results = int(params.get("max_results", ["10"])[0])
+            matches = state.entries
+            date_filter = DATE_FILTER_PATTERN.search(query)
+            if date_filter:
+                date_from, date_to = date_filter.groups()
+                matches = [item for item in matches if date_from <= item[0] <= date_to]
+            page = [entry for _, entry in matches[start:start + max_results]]
+            if state.latency:
+                time.sleep(state.latency)
+            self._send(200, build_feed(page, len(matches), start, max_results), "application/atom+xml; charset=utf-8")
+
+        def log_message(self, format, *args):
+            pass  # jumlah request tersedia di /stats; log per request terlalu ramai untuk benchmark
+
+    return FeedRequestHandler
+
+def start_feed_server(port=0, fixture_glob=DEFAULT_FIXTURE_GLOB, repeat=1, latency=0.0):
+    """Menjalankan server di thread latar belakang. Mengembalikan (server, state); port di server.server_address."""
+    state = FeedServerState(load_entries(fixture_glob, repeat), latency)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Server lokal pengganti arXiv API (feed Atom dari fixture).")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURE_GLOB, help="Glob file feed Atom.")
+    parser.add_argument("--repeat", type=int, default=1, help="Perbanyak setiap entri menjadi N salinan unik.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Waktu respons buatan per request (detik).")
+    args = parser.parse_args()
+
+    server, state = start_feed_server(args.port, args.fixtures, args.repeat, args.latency)
+    print(f"Server feed lokal berjalan di http://127.0.0.1:{server.server_address[1]}/api/query? "
+          f"({len(state.entries)} entri). Tekan Ctrl+C untuk berhenti.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
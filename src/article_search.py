@@ -0,0 +1,177 @@
+"""
+Pencarian semantik tingkat artikel.
+Embedding dokumen disimpan sebagai doc_embeddings_<id>.npy (ter-normalisasi L2, float16/float32) di samping
+topic_results_<id>.parquet/.csv dengan urutan baris yang sama, lalu dibuka sebagai memory-map oleh API.
+Untuk korpus kecil pencarian memakai top-k eksak yang tervektorisasi. Mulai FAISS_MIN_ROWS artikel, modelling.py
+membangun indeks HNSW faiss (doc_embeddings_<id>.faiss) dan API memakainya secara default. Top-k eksak membaca
+seluruh matriks per kueri (1M x 384 float32 = 1,5 GB, ~100 ms atau lebih per kueri di CPU), sedangkan HNSW
+hanya mengunjungi beberapa ribu vektor. Ukur dengan: python -m benchmarks.bench_article_search --rows 1000000
+"""
+import os
+import argparse
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+# Baris per blok saat menghitung skor dari embedding float16 (dikonversi ke float32 per blok)
+EXACT_SEARCH_CHUNK_ROWS = 65536
+# Mulai jumlah artikel ini indeks HNSW dibangun saat pelatihan dan dipakai API (mode "auto")
+FAISS_MIN_ROWS = int(os.getenv("ARTICLE_SEARCH_FAISS_MIN_ROWS", "200000"))
+HNSW_EF_SEARCH = int(os.getenv("ARTICLE_SEARCH_HNSW_EF_SEARCH", "128"))
+
+def get_doc_embeddings_path(results_dir, run_id):
+    return os.path.join(results_dir, f"doc_embeddings_{run_id}.npy")
+
+def get_faiss_index_path(results_dir, run_id):
+    return os.path.join(results_dir, f"doc_embeddings_{run_id}.faiss")
+
+def normalize_embeddings(embeddings):
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+def save_doc_embeddings(path, embeddings, dtype="float32"):
+    """Menyimpan embedding dokumen ter-normalisasi ke .npy (ditulis ke .tmp lalu di-rename)."""
+    normalized = normalize_embeddings(embeddings).astype(dtype, copy=False)
+    tmp_path = f"{path}.tmp.npy"
+    np.save(tmp_path, normalized)
+    os.replace(tmp_path, path)
+    print(f"Embedding dokumen ({normalized.shape[0]} x {normalized.shape[1]}, {dtype}) disimpan di: {path}")
+    return path
+
+class ArticleEmbeddingIndex:
+    """Indeks embedding artikel read-only dengan top-k eksak (dan faiss opsional)."""
+    def __init__(self, embeddings, faiss_index=None):
+        self.embeddings = embeddings
+        self.faiss_index = faiss_index
+
+    @classmethod
+    def load(cls, path, faiss_path=None, use_faiss="auto", faiss_min_rows=FAISS_MIN_ROWS):
+        """use_faiss: True, False, atau "auto" (faiss jika jumlah artikel >= faiss_min_rows)."""
+        embeddings = np.load(path, mmap_mode='r')
+        faiss_index = None
+        if use_faiss == "auto":
+            use_faiss = embeddings.shape[0] >= faiss_min_rows
+        if use_faiss:
+            if faiss is None:
+                print("Peringatan: faiss tidak terinstal (pip install faiss-cpu). Memakai pencarian eksak.")
+            elif not faiss_path or not os.path.exists(faiss_path):
+                print(f"Peringatan: Indeks faiss {faiss_path} tidak ada; pencarian eksak atas {embeddings.shape[0]} "
+                      f"artikel membaca seluruh matriks per kueri. Bangun dengan: python -m src.article_search build-faiss <id>")
+            else:
+                faiss_index = faiss.read_index(faiss_path, faiss.IO_FLAG_MMAP)
+                faiss_index.hnsw.efSearch = max(faiss_index.hnsw.efSearch, HNSW_EF_SEARCH)
+                print(f"Indeks faiss dimuat dari: {faiss_path}")
+        print(f"Embedding dokumen dimuat (memory-mapped) dari: {path}")
+        return cls(embeddings, faiss_index)
+
+    def __len__(self):
+        return self.embeddings.shape[0]
+
+    @property
+    def backend(self):
+        return "faiss" if self.faiss_index is not None else "exact"
+
+    def _exact_scores(self, query):
+        if self.embeddings.dtype == np.float32:
+            return self.embeddings @ query
+        scores = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), EXACT_SEARCH_CHUNK_ROWS):
+            block = np.asarray(self.embeddings[start:start + EXACT_SEARCH_CHUNK_ROWS], dtype=np.float32)
+            scores[start:start + block.shape[0]] = block @ query
+        return scores
+
+    def search(self, query_embedding, limit=10, offset=0):
+        """Mengembalikan tuple (indeks_baris, skor) untuk hasil ke-offset s.d. offset+limit, urut skor menurun."""
+        n = len(self)
+        k = min(offset + limit, n)
+        if limit <= 0 or k <= offset:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        if self.faiss_index is not None:
+            scores, indices = self.faiss_index.search(query[None, :], k)
+            indices, scores = indices[0], scores[0]
+            valid = indices >= 0
+            indices, scores = indices[valid], scores[valid]
+        else:
+            all_scores = self._exact_scores(query)
+            if k < n:
+                indices = np.argpartition(-all_scores, k - 1)[:k]
+            else:
+                indices = np.arange(n)
+            indices = indices[np.argsort(-all_scores[indices], kind='stable')]
+            scores = all_scores[indices]
+        return indices[offset:k].astype(np.int64), scores[offset:k].astype(np.float32)
+
+def build_faiss_index(embeddings_path, faiss_path, hnsw_m=32, ef_construction=200, ef_search=HNSW_EF_SEARCH):
+    """Membangun indeks HNSW (inner product) dari file embedding dokumen untuk pencarian aproksimasi."""
+    if faiss is None:
+        raise RuntimeError("faiss belum terinstal. Jalankan: pip install faiss-cpu")
+    embeddings = np.load(embeddings_path, mmap_mode='r')
+    index = faiss.IndexHNSWFlat(embeddings.shape[1], hnsw_m, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efConstruction = ef_construction
+    index.hnsw.efSearch = ef_search
+    for start in range(0, embeddings.shape[0], EXACT_SEARCH_CHUNK_ROWS):
+        index.add(np.ascontiguousarray(embeddings[start:start + EXACT_SEARCH_CHUNK_ROWS], dtype=np.float32))
+    faiss.write_index(index, f"{faiss_path}.tmp")
+    os.replace(f"{faiss_path}.tmp", faiss_path)
+    print(f"Indeks faiss ({index.ntotal} vektor) disimpan di: {faiss_path}")
+
+def maybe_build_faiss_index(embeddings_path, faiss_path, min_rows=FAISS_MIN_ROWS):
+    """Membangun indeks HNSW jika jumlah artikel >= min_rows (dipanggil modelling.py setelah embedding disimpan)."""
+    rows = np.load(embeddings_path, mmap_mode='r').shape[0]
+    if rows < min_rows:
+        return None
+    if faiss is None:
+        print(f"Peringatan: {rows} artikel, tetapi faiss tidak terinstal. Pencarian artikel API akan memakai top-k eksak.")
+        return None
+    build_faiss_index(embeddings_path, faiss_path)
+    return faiss_path
+
+def encode_results_file(results_path, embeddings_path, sentence_model_name, dtype="float32", batch_size=256):
+    """Membuat embedding dokumen untuk run lama yang belum punya doc_embeddings_<id>.npy."""
+    from sentence_transformers import SentenceTransformer
+    try:
+        from .artifacts import read_table
+    except ImportError:
+        from artifacts import read_table
+
+    df = read_table(results_path, columns=['Processed_Text', 'Processed_Title', 'Processed_Abstract'])
+    if 'Processed_Text' in df.columns:
+        texts = df['Processed_Text'].fillna('').astype(str).tolist()
+    elif 'Processed_Abstract' in df.columns:
+        texts = (df['Processed_Title'].fillna('') + ' ' + df['Processed_Abstract'].fillna('')).tolist()
+    else:
+        texts = df['Processed_Title'].fillna('').astype(str).tolist()
+    model = SentenceTransformer(sentence_model_name)
+    embeddings = model.encode(texts, batch_size=batch_size, show_progress_bar=True, convert_to_numpy=True)
+    save_doc_embeddings(embeddings_path, embeddings, dtype=dtype)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Utilitas indeks embedding artikel AlbertopicAI.")
+    parser.add_argument("command", choices=["encode", "build-faiss"],
+                        help="encode: buat doc_embeddings_<id>.npy dari hasil topik; build-faiss: buat indeks HNSW.")
+    parser.add_argument("run_id", type=int)
+    parser.add_argument("--results-dir", default=os.path.join("data", "final", "topic_results"))
+    parser.add_argument("--sentence-model", default='paraphrase-MiniLM-L6-v2')
+    parser.add_argument("--dtype", choices=["float16", "float32"], default="float32")
+    args = parser.parse_args()
+
+    embeddings_path = get_doc_embeddings_path(args.results_dir, args.run_id)
+    if args.command == "encode":
+        try:
+            from .artifacts import find_artifact
+        except ImportError:
+            from artifacts import find_artifact
+        results_path = find_artifact(os.path.join(args.results_dir, f"topic_results_{args.run_id}"))
+        if results_path is None:
+            parser.error(f"Hasil topik untuk run {args.run_id} tidak ditemukan di {args.results_dir}")
+        encode_results_file(results_path, embeddings_path, args.sentence_model, dtype=args.dtype)
+    else:
+        build_faiss_index(embeddings_path, get_faiss_index_path(args.results_dir, args.run_id))
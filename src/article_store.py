@@ -0,0 +1,330 @@
+"""
+Penyimpanan artikel ringkas (read-only) untuk API.
+
+topic_results_<id> memuat abstrak lengkap. Jika dibaca sebagai DataFrame dan diubah menjadi satu objek record
+per artikel, setiap worker uvicorn menyimpan salinannya sendiri. ArticleStore hanya menyimpan field yang
+disajikan, dalam array numpy padat:
+- Topic sebagai int32 (MISSING_TOPIC untuk nilai kosong); tahun sebagai kode ke tabel string tahun.
+- Judul dan snippet abstrak (sudah dipotong ARTICLE_SNIPPET_CHARS karakter) sebagai blob UTF-8 + offset.
+- Nama penulis di-intern ke satu tabel string; tiap artikel menyimpan rentang indeks penulisnya.
+- Indeks topik -> baris: nomor baris yang diurutkan stabil per topik, beserta batas rentang per topik.
+Store dibangun per chunk (tanpa memuat seluruh tabel), ditulis sekali ke subdirektori per versi sumber
+article_store_<id>/v<format>_<sumber>_<ukuran>_<mtime>/ (file .npy, meta.json ditulis terakhir) di samping
+topic_results_<id>, lalu dibuka sebagai memory-map. Dengan begitu beberapa worker berbagi halaman yang sama
+lewat page cache OS. Store yang sudah diterbitkan tidak pernah dihapus oleh worker: versi sumber baru mendapat
+subdirektori baru, dan worker yang kalah balapan menerbitkan versi yang sama cukup memakai milik worker lain.
+
+    python src/article_store.py 3       # bangun store run 3 dan cetak laporan byte per artikel
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from array import array
+
+import numpy as np
+
+# Modul lain di 'src' (mendukung dijalankan sebagai skrip maupun sebagai paket)
+try:
+    from .artifacts import find_artifact, iter_table_chunks, parse_authors, read_table
+except ImportError:
+    from artifacts import find_artifact, iter_table_chunks, parse_authors, read_table
+
+ARTICLE_STORE_CHUNK_ROWS = int(os.getenv("ARTICLE_STORE_CHUNK_ROWS", "50000"))
+ARTICLE_SNIPPET_CHARS = 150
+# Kolom topic_results yang disajikan API; kolom teks terproses (Processed_*) tidak pernah dibaca
+ARTICLE_COLUMNS = ['title', 'authors', 'year', 'abstract', 'Topic']
+MISSING_TOPIC = np.iinfo(np.int32).min
+STORE_FORMAT_VERSION = 1
+STORE_ARRAYS = ("topics", "year_codes", "title_blob", "title_offsets", "snippet_blob", "snippet_offsets",
+                "author_ids", "author_offsets", "author_blob", "author_table_offsets", "year_blob",
+                "year_table_offsets", "topic_order", "topic_index_ids", "topic_index_starts")
+
+def get_article_store_path(results_dir, run_id):
+    return os.path.join(results_dir, f"article_store_{run_id}")
+
+def get_store_version_path(store_path, results_path):
+    """Subdirektori store untuk versi results_path saat ini."""
+    signature = source_signature(results_path)
+    return os.path.join(store_path, f"v{STORE_FORMAT_VERSION}_{signature['source']}_{signature['source_size']}_"
+                                    f"{signature['source_mtime_ns']}")
+
+def source_signature(results_path):
+    """Identitas file hasil topik (nama, ukuran, mtime) untuk mendeteksi store yang basi."""
+    stat = os.stat(results_path)
+    return {"source": os.path.basename(results_path), "source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+class PackedStrings:
+    """Daftar string read-only: blob UTF-8 (uint8) dan offset int64 sepanjang n + 1."""
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return bytes(self.blob[start:end]).decode('utf-8')
+
+class _PackedStringsBuilder:
+    def __init__(self):
+        self.blob = bytearray()
+        self.offsets = array('q', [0])
+
+    def append(self, text):
+        self.blob += text.encode('utf-8', errors='replace')
+        self.offsets.append(len(self.blob))
+
+    def to_arrays(self):
+        return np.frombuffer(bytes(self.blob), dtype=np.uint8), np.asarray(self.offsets, dtype=np.int64)
+
+def _code_dtype(table_size):
+    return np.uint16 if table_size <= np.iinfo(np.uint16).max + 1 else np.uint32
+
+class ArticleStore:
+    """Artikel hasil topik dalam array padat; get(i) mengembalikan field yang disajikan untuk baris ke-i."""
+    def __init__(self, arrays, meta=None):
+        self.arrays = arrays
+        self.meta = meta or {}
+        self.topics = arrays["topics"]
+        self.year_codes = arrays["year_codes"]
+        self.titles = PackedStrings(arrays["title_blob"], arrays["title_offsets"])
+        self.snippets = PackedStrings(arrays["snippet_blob"], arrays["snippet_offsets"])
+        self.author_ids = arrays["author_ids"]
+        self.author_offsets = arrays["author_offsets"]
+        self.authors = PackedStrings(arrays["author_blob"], arrays["author_table_offsets"])
+        # Tabel tahun hanya berisi puluhan nilai unik, jadi didekode sekali
+        year_table = PackedStrings(arrays["year_blob"], arrays["year_table_offsets"])
+        self.years = [year_table[i] for i in range(len(year_table))]
+        self.topic_order = arrays["topic_order"]
+        starts = arrays["topic_index_starts"].tolist()
+        self.topic_ranges = {int(tid): (starts[i], starts[i + 1]) for i, tid in enumerate(arrays["topic_index_ids"].tolist())
+                             if tid != MISSING_TOPIC}
+
+    def __len__(self):
+        return len(self.topics)
+
+    @property
+    def nbytes(self):
+        return sum(int(array_.nbytes) for array_ in self.arrays.values())
+
+    @property
+    def topic_ids(self):
+        return list(self.topic_ranges)
+
+    def title(self, index):
+        return self.titles[index]
+
+    def topic(self, index):
+        topic = int(self.topics[index])
+        return None if topic == MISSING_TOPIC else topic
+
+    def get(self, index):
+        """Dict title, authors, year, abstract_snippet, topic (None jika kosong) untuk baris ke-index."""
+        snippet = self.snippets[index]
+        start, end = int(self.author_offsets[index]), int(self.author_offsets[index + 1])
+        return {
+            "title": self.titles[index],
+            "authors": [self.authors[author_id] for author_id in self.author_ids[start:end].tolist()],
+            "year": self.years[int(self.year_codes[index])],
+            "abstract_snippet": (snippet + '...') if snippet else "Abstrak tidak tersedia.",
+            "topic": self.topic(index),
+        }
+
+    def offsets_for_topic(self, topic_id):
+        """Nomor baris artikel bertopik topic_id dengan urutan baris asli, atau None jika topik tidak ada."""
+        bounds = self.topic_ranges.get(int(topic_id))
+        if bounds is None: return None
+        return self.topic_order[bounds[0]:bounds[1]]
+
+    @classmethod
+    def build(cls, results_path, chunk_rows=ARTICLE_STORE_CHUNK_ROWS):
+        """Membangun store (di memori) dari topic_results per chunk, tanpa memuat seluruh tabel."""
+        import pandas as pd
+
+        topics = array('i')
+        year_codes = array('I')
+        year_table, year_index = _PackedStringsBuilder(), {}
+        titles, snippets = _PackedStringsBuilder(), _PackedStringsBuilder()
+        author_table, author_index = _PackedStringsBuilder(), {}
+        author_ids = array('I')
+        author_offsets = array('q', [0])
+
+        for chunk in iter_table_chunks(results_path, chunk_rows, columns=ARTICLE_COLUMNS):
+            def column(name):
+                return chunk[name].tolist() if name in chunk.columns else [None] * len(chunk)
+
+            chunk_topics = (pd.to_numeric(chunk['Topic'], errors='coerce') if 'Topic' in chunk.columns
+                            else pd.Series([float('nan')] * len(chunk), dtype='float64'))
+            topics.extend(chunk_topics.fillna(MISSING_TOPIC).astype(np.int32).tolist())
+            for title, authors, year, abstract in zip(column('title'), column('authors'), column('year'),
+                                                      column('abstract')):
+                titles.append(title if isinstance(title, str) else 'Tanpa Judul')
+                year_str = str(year if year is not None else 'N/A')
+                if year_str not in year_index:
+                    year_index[year_str] = len(year_index)
+                    year_table.append(year_str)
+                year_codes.append(year_index[year_str])
+                for author in parse_authors(authors):
+                    if author not in author_index:
+                        author_index[author] = len(author_index)
+                        author_table.append(author)
+                    author_ids.append(author_index[author])
+                author_offsets.append(len(author_ids))
+                abstract_str = str(abstract) if pd.notna(abstract) else ""
+                snippets.append(abstract_str[:ARTICLE_SNIPPET_CHARS])
+
+        topics_arr = np.asarray(topics, dtype=np.int32)
+        # Urutan stabil per topik: dalam satu topik, baris tetap berurutan seperti di file hasil
+        topic_order = np.argsort(topics_arr, kind='stable').astype(np.int32)
+        topic_index_ids, topic_index_starts = np.unique(topics_arr[topic_order], return_index=True)
+        arrays = {
+            "topics": topics_arr,
+            "year_codes": np.asarray(year_codes, dtype=_code_dtype(len(year_index))),
+            "author_ids": np.asarray(author_ids, dtype=np.uint32),
+            "author_offsets": np.asarray(author_offsets, dtype=np.int64),
+            "topic_order": topic_order,
+            "topic_index_ids": topic_index_ids.astype(np.int32),
+            "topic_index_starts": np.append(topic_index_starts, len(topics_arr)).astype(np.int64),
+        }
+        arrays["title_blob"], arrays["title_offsets"] = titles.to_arrays()
+        arrays["snippet_blob"], arrays["snippet_offsets"] = snippets.to_arrays()
+        arrays["author_blob"], arrays["author_table_offsets"] = author_table.to_arrays()
+        arrays["year_blob"], arrays["year_table_offsets"] = year_table.to_arrays()
+        meta = {"format_version": STORE_FORMAT_VERSION, "articles": len(topics_arr), "authors": len(author_index),
+                "years": len(year_index), **source_signature(results_path)}
+        return cls(arrays, meta)
+
+    def save(self, path, replace=False):
+        """
+        Menulis store ke direktori tmp unik per proses (file .npy per array, meta.json terakhir), lalu
+        menerbitkannya dengan satu rename atomik. Jika path sudah ada (worker lain menerbitkan store yang sama),
+        itu dianggap berhasil dan tmp dibuang; path hanya diganti jika replace=True (mis. --rebuild).
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name in STORE_ARRAYS:
+            np.save(os.path.join(tmp_path, f"{name}.npy"), self.arrays[name])
+        with open(os.path.join(tmp_path, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        old_path = None
+        if replace and os.path.exists(path):
+            # Hanya untuk build ulang manual: worker yang sudah memetakan store lama tetap bisa membacanya
+            old_path = f"{path}.old{os.getpid()}"
+            os.replace(path, old_path)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+            print(f"Store artikel {path} sudah diterbitkan proses lain; dipakai apa adanya.")
+            return path
+        finally:
+            if old_path is not None:
+                shutil.rmtree(old_path, ignore_errors=True)
+        print(f"Store artikel ({len(self)} artikel, {self.nbytes / max(len(self), 1):.0f} byte/artikel) disimpan di: {path}")
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Membuka store sebagai memory-map (halaman dibagi antar proses lewat page cache OS)."""
+        with open(os.path.join(path, "meta.json"), encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in STORE_ARRAYS}
+        store = cls(arrays, meta)
+        print(f"Store artikel dimuat (memory-mapped) dari: {path} ({len(store)} artikel, "
+              f"{store.nbytes / max(len(store), 1):.0f} byte/artikel)")
+        return store
+
+def is_store_current(store_path, results_path):
+    """True jika store di store_path lengkap dan dibangun dari versi results_path saat ini."""
+    meta_path = os.path.join(store_path, "meta.json")
+    if not os.path.exists(meta_path):
+        return False
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (meta.get("format_version") == STORE_FORMAT_VERSION
+            and all(meta.get(key) == value for key, value in source_signature(results_path).items()))
+
+def open_article_store(results_path, store_path, chunk_rows=ARTICLE_STORE_CHUNK_ROWS):
+    """
+    Membuka store artikel untuk results_path. Store yang belum ada atau basi dibangun ulang dan disimpan;
+    jika direktori tidak bisa ditulis (mis. read-only di container), store di memori yang dipakai.
+    """
+    version_path = get_store_version_path(store_path, results_path)
+    if is_store_current(version_path, results_path):
+        return ArticleStore.load(version_path)
+    print(f"Membangun store artikel dari {results_path}...")
+    store = ArticleStore.build(results_path, chunk_rows)
+    try:
+        store.save(version_path)
+        return ArticleStore.load(version_path)
+    except OSError as e:
+        print(f"Peringatan: Gagal menyimpan store artikel ke {version_path}: {e}. Memakai store di memori.")
+        return store
+
+def _deep_sizeof(value):
+    """Ukuran objek beserta isi list/dict-nya (string, list penulis) dalam byte."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_sizeof(key) + _deep_sizeof(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_deep_sizeof(item) for item in value)
+    return size
+
+def memory_report(results_path, store, sample_size=2000):
+    """
+    Byte per artikel sebelum (DataFrame kolom yang disajikan + satu record per artikel) dan sesudah (store).
+    Ukuran record diperkirakan dari sampel record dict; objek pydantic di API sedikit lebih besar.
+    """
+    results_df = read_table(results_path, columns=ARTICLE_COLUMNS)
+    n_articles = max(len(results_df), 1)
+    dataframe_bytes = int(results_df.memory_usage(index=True, deep=True).sum())
+    del results_df
+
+    sample = np.linspace(0, len(store) - 1, num=min(sample_size, len(store)), dtype=np.int64) if len(store) else []
+    record_bytes = (sum(_deep_sizeof(store.get(int(i))) for i in sample) / len(sample)) if len(sample) else 0.0
+    report = {
+        "articles": len(store),
+        "before_dataframe_bytes_per_article": dataframe_bytes / n_articles,
+        "before_records_bytes_per_article": record_bytes,
+        "before_total_bytes_per_article": dataframe_bytes / n_articles + record_bytes,
+        "after_store_bytes_per_article": store.nbytes / max(len(store), 1),
+    }
+    print(f"Laporan memori untuk {report['articles']} artikel (byte per artikel):")
+    print(f"  Sebelum: DataFrame {report['before_dataframe_bytes_per_article']:.0f} + record "
+          f"~{report['before_records_bytes_per_article']:.0f} = {report['before_total_bytes_per_article']:.0f} (per worker)")
+    print(f"  Sesudah: store {report['after_store_bytes_per_article']:.0f} (memory-map, dibagi antar worker)")
+    for name in STORE_ARRAYS:
+        print(f"    {name:<22} {store.arrays[name].nbytes / max(len(store), 1):8.1f}")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Membangun store artikel ringkas dan mencetak laporan memori.")
+    parser.add_argument("run_id", help="ID lokal run (topic_results_<id>).")
+    parser.add_argument("--final-dir", default="data/final")
+    parser.add_argument("--chunk-rows", type=int, default=ARTICLE_STORE_CHUNK_ROWS)
+    parser.add_argument("--rebuild", action="store_true", help="Bangun ulang meski store yang ada masih cocok.")
+    args = parser.parse_args()
+
+    results_dir = os.path.join(args.final_dir, "topic_results")
+    results_path = find_artifact(os.path.join(results_dir, f"topic_results_{args.run_id}"))
+    if results_path is None:
+        raise SystemExit(f"Error: Hasil topik untuk run {args.run_id} tidak ditemukan.")
+    store_path = get_article_store_path(results_dir, args.run_id)
+    started = time.perf_counter()
+    if args.rebuild:
+        ArticleStore.build(results_path, args.chunk_rows).save(get_store_version_path(store_path, results_path),
+                                                               replace=True)
+    article_store = open_article_store(results_path, store_path, args.chunk_rows)
+    print(f"Store siap dalam {time.perf_counter() - started:.1f} detik.")
+    memory_report(results_path, article_store)
@@ -0,0 +1,283 @@
+"""
+Format artefak tabular pipeline (processed_articles, topic_results_<id>).
+
+Parquet (pyarrow) adalah format utama: kolom bertipe (authors sebagai list<string>, bukan list yang
+di-stringify), terkompresi, bisa dibaca sebagian kolom saja dan di-memory-map. CSV tetap didukung
+sebagai fallback ketika pyarrow tidak terinstal atau artefak lama masih berupa CSV.
+Format ditentukan dari ekstensi file (.parquet / .csv).
+
+Artefak boleh terdiri dari file utama ditambah part file di direktori <path>.parts/ (ditulis oleh
+TableWriter(append=True), mis. pra-pemrosesan inkremental). Semua fungsi baca di modul ini membaca file
+utama lalu part-nya secara berurutan, sehingga pemanggil cukup memakai path file utama.
+"""
+import ast
+import os
+import re
+import shutil
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Format default untuk artefak baru: "parquet" atau "csv"
+ARTIFACT_FORMAT = os.getenv("ARTIFACT_FORMAT", "parquet")
+PARQUET_COMPRESSION = os.getenv("PARQUET_COMPRESSION", "zstd")
+# Urutan prioritas saat mencari artefak yang sudah ada
+ARTIFACT_EXTENSIONS = (".parquet", ".csv")
+# Mencocokkan nama file hasil seperti 'topic_results_5.csv' atau 'topic_results_5.parquet'
+RUN_ID_FILE_PATTERN = re.compile(r'_(\d+)\.(?:csv|parquet)$')
+
+def resolve_format(fmt=None):
+    """Format yang benar-benar dipakai untuk menulis: parquet hanya jika pyarrow tersedia."""
+    fmt = (fmt or ARTIFACT_FORMAT).lower()
+    if fmt == "parquet" and pa is None:
+        print("Peringatan: pyarrow belum terinstal, artefak ditulis sebagai CSV. Jalankan: pip install pyarrow")
+        return "csv"
+    return fmt
+
+def format_from_path(path):
+    return "parquet" if path.endswith(".parquet") else "csv"
+
+def artifact_path(base_path, fmt=None):
+    """Menambahkan ekstensi format ke path tanpa ekstensi, mis. '.../processed_articles' -> '...parquet'."""
+    return f"{base_path}.{resolve_format(fmt)}"
+
+def find_artifact(base_path):
+    """Mencari artefak yang ada untuk path tanpa ekstensi (Parquet diutamakan). None jika tidak ada."""
+    for extension in ARTIFACT_EXTENSIONS:
+        if os.path.exists(base_path + extension):
+            return base_path + extension
+    return None
+
+def get_parts_dir(path):
+    return f"{path}.parts"
+
+def list_part_files(path):
+    """Part file tambahan artefak, urut sesuai urutan penulisan."""
+    parts_dir = get_parts_dir(path)
+    if not os.path.isdir(parts_dir):
+        return []
+    extension = os.path.splitext(path)[1]
+    return sorted(os.path.join(parts_dir, name) for name in os.listdir(parts_dir)
+                  if name.startswith("part-") and name.endswith(extension))
+
+def artifact_files(path):
+    """File utama artefak diikuti part file-nya."""
+    return [path] + list_part_files(path)
+
+def count_table_rows(path):
+    """Jumlah baris artefak Parquet dari metadata footer (tanpa membaca data); None untuk CSV."""
+    if format_from_path(path) != "parquet" or pq is None:
+        return None
+    return sum(pq.ParquetFile(file_path).metadata.num_rows for file_path in artifact_files(path))
+
+def parse_authors(authors_data):
+    """Mengubah nilai kolom authors (list, array Arrow, atau list yang di-stringify di CSV) menjadi list of strings."""
+    if isinstance(authors_data, (list, tuple)):
+        return [str(author) for author in authors_data]
+    if hasattr(authors_data, 'tolist'):  # numpy array dari kolom list Parquet
+        return [str(author) for author in authors_data.tolist()]
+    if isinstance(authors_data, str):
+        try:
+            parsed = ast.literal_eval(authors_data)
+            return [str(author) for author in parsed] if isinstance(parsed, (list, tuple)) else [authors_data]
+        except (ValueError, SyntaxError):
+            return [authors_data]
+    return []
+
+def to_arrow_table(df, schema=None):
+    """Mengonversi DataFrame ke tabel Arrow; kolom authors disimpan sebagai list<string>."""
+    if 'authors' in df.columns:
+        df = df.copy()
+        df['authors'] = [parse_authors(authors) for authors in df['authors']]
+    if schema is not None:
+        df = df.reindex(columns=schema.names)
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+def write_table(df, path):
+    """Menulis DataFrame secara atomik (file .tmp lalu os.replace) sesuai ekstensi path."""
+    tmp_path = f"{path}.tmp"
+    if format_from_path(path) == "parquet":
+        pq.write_table(to_arrow_table(df), tmp_path, compression=PARQUET_COMPRESSION)
+    else:
+        df.to_csv(tmp_path, index=False, encoding='utf-8')
+    os.replace(tmp_path, path)
+
+def _read_file(path, columns=None, memory_map=False):
+    import pandas as pd
+
+    if format_from_path(path) == "parquet":
+        if pq is None:
+            raise RuntimeError(f"pyarrow belum terinstal, tidak bisa membaca {path}. Jalankan: pip install pyarrow")
+        if columns is not None:
+            available = set(pq.read_schema(path, memory_map=memory_map).names)
+            columns = [col for col in columns if col in available]
+        return pq.read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+    if columns is not None:
+        wanted = set(columns)
+        return pd.read_csv(path, usecols=lambda col: col in wanted)
+    return pd.read_csv(path)
+
+def read_table(path, columns=None, memory_map=False):
+    """
+    Membaca artefak (beserta part file-nya) sebagai DataFrame. columns membatasi kolom yang dibaca (kolom
+    yang tidak ada di file diabaikan); memory_map membuka file Parquet sebagai memory-map alih-alih
+    membacanya ke buffer.
+    """
+    import pandas as pd
+
+    frames = [_read_file(file_path, columns, memory_map) for file_path in artifact_files(path)]
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+def _iter_file_chunks(path, chunk_rows, columns=None):
+    import pandas as pd
+
+    if format_from_path(path) == "parquet":
+        if pq is None:
+            raise RuntimeError(f"pyarrow belum terinstal, tidak bisa membaca {path}. Jalankan: pip install pyarrow")
+        parquet_file = pq.ParquetFile(path)
+        if columns is not None:
+            available = set(parquet_file.schema_arrow.names)
+            columns = [col for col in columns if col in available]
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+        return
+    usecols = None
+    if columns is not None:
+        wanted = set(columns)
+        usecols = lambda col: col in wanted
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunk_rows):
+        yield chunk.reset_index(drop=True)
+
+def iter_table_chunks(path, chunk_rows, columns=None):
+    """
+    Membaca artefak (beserta part file-nya) per chunk (DataFrame berisi paling banyak chunk_rows baris)
+    tanpa memuat seluruh file.
+    """
+    for file_path in artifact_files(path):
+        yield from _iter_file_chunks(file_path, chunk_rows, columns)
+
+def compact_artifact(path):
+    """
+    Menggabungkan part file ke file utama (per row group untuk Parquet) lalu menghapus direktori part.
+    Biayanya sebanding dengan ukuran seluruh artefak, jadi hanya dipanggil sesekali agar jumlah part tetap kecil.
+    """
+    parts = list_part_files(path)
+    if not parts:
+        return
+    tmp_path = f"{path}.tmp"
+    if format_from_path(path) == "parquet":
+        schema = pq.read_schema(path)
+        with pq.ParquetWriter(tmp_path, schema, compression=PARQUET_COMPRESSION) as writer:
+            for file_path in [path] + parts:
+                source = pq.ParquetFile(file_path)
+                for row_group in range(source.num_row_groups):
+                    writer.write_table(source.read_row_group(row_group))
+    else:
+        shutil.copyfile(path, tmp_path)
+        with open(tmp_path, 'ab') as target:
+            for file_path in parts:
+                with open(file_path, 'rb') as source:
+                    source.readline()  # header
+                    shutil.copyfileobj(source, target)
+    os.replace(tmp_path, path)
+    shutil.rmtree(get_parts_dir(path))
+
+class TableWriter:
+    """
+    Penulis artefak bertahap (per chunk) untuk mode streaming. Skema ditetapkan oleh chunk pertama; chunk
+    berikutnya diselaraskan ke skema tersebut. File tujuan baru diganti setelah close() berhasil.
+    Dengan append=True dan artefak yang sudah ada, data baru ditulis sebagai part file baru di <path>.parts/
+    dengan skema/kolom artefak tersebut; isi lama tidak disalin, sehingga biayanya hanya sebanding data baru.
+    """
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self.target_path = path
+        self.format = format_from_path(path)
+        self.columns = None
+        self.rows_written = 0
+        self._csv_started = False
+        self._parquet_writer = None
+        self._schema = None
+        self._is_part = append and os.path.exists(path)
+        if self._is_part:
+            self._start_part()
+        self.tmp_path = f"{self.target_path}.tmp"
+
+    def _start_part(self):
+        parts = list_part_files(self.path)
+        next_number = int(os.path.basename(parts[-1])[len("part-"):].split(".")[0]) + 1 if parts else 1
+        extension = os.path.splitext(self.path)[1]
+        os.makedirs(get_parts_dir(self.path), exist_ok=True)
+        self.target_path = os.path.join(get_parts_dir(self.path), f"part-{next_number:06d}{extension}")
+        if self.format == "parquet":
+            self._schema = pq.read_schema(self.path)
+            self.columns = list(self._schema.names)
+        else:
+            import pandas as pd
+            self.columns = list(pd.read_csv(self.path, nrows=0).columns)
+
+    def write(self, df):
+        if self.columns is None:
+            self.columns = list(df.columns)
+        else:
+            extra_columns = [col for col in df.columns if col not in self.columns]
+            if extra_columns:
+                print(f"Peringatan: kolom {extra_columns} tidak ada di chunk pertama dan diabaikan.")
+            df = df.reindex(columns=self.columns)
+
+        if self.format == "parquet":
+            if self._parquet_writer is None and self._schema is None:
+                table = to_arrow_table(df)
+                # Kolom yang seluruhnya kosong di chunk pertama bertipe null; jadikan string agar chunk lain muat
+                self._schema = pa.schema([pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field
+                                          for field in table.schema])
+                table = table.cast(self._schema)
+            else:
+                table = to_arrow_table(df, schema=self._schema)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.tmp_path, self._schema, compression=PARQUET_COMPRESSION)
+            self._parquet_writer.write_table(table)
+        else:
+            df.to_csv(self.tmp_path, mode='a' if self._csv_started else 'w', header=not self._csv_started,
+                      index=False, encoding='utf-8')
+            self._csv_started = True
+        self.rows_written += len(df)
+
+    def close(self):
+        """
+        Menyelesaikan file dan menggantikan artefak tujuan (atau menambahkan part baru). Tidak melakukan apa-apa
+        jika belum ada data. Menulis ulang artefak penuh juga membuang part file lamanya.
+        """
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+        if not os.path.exists(self.tmp_path):
+            return
+        if not self._is_part and os.path.isdir(get_parts_dir(self.path)):
+            # Part lama dibuang lebih dulu: jika terhenti di antaranya, artefak kurang data (manifest tidak cocok
+            # sehingga run inkremental berikutnya build ulang), bukan berisi baris ganda
+            shutil.rmtree(get_parts_dir(self.path))
+        os.replace(self.tmp_path, self.target_path)
+
+    def abort(self):
+        """Membuang hasil parsial tanpa menyentuh artefak tujuan."""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
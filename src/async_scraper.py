@@ -0,0 +1,281 @@
+"""
+Mode scraping asinkron untuk arXiv.
+
+Beberapa jendela bulan diambil bersamaan melalui satu httpx.AsyncClient (connection pool), sementara
+satu token bucket global membatasi laju request sesuai kebijakan arXiv (maksimal 1 request per 3 detik).
+Setiap bulan punya checkpoint sendiri sehingga worker dapat dilanjutkan secara independen.
+Output, seen-set dedup, dan format artikel sama dengan scraper.py.
+
+    python src/async_scraper.py --start 2023-01 --end 2024-05 --concurrency 4
+    python src/async_scraper.py --api-url http://127.0.0.1:8765/api/query? --rate-interval 0   # server lokal
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Modul lain di 'src' (mendukung dijalankan sebagai skrip maupun sebagai paket)
+try:
+    from .scraper import (ARXIV_API_URL, DEFAULT_BASE_QUERY, OUTPUT_FILENAME, BATCH_SIZE_PER_ITERATION,
+                          TARGET_ARTICLES_GOAL, build_arxiv_params, parse_arxiv_feed, get_arxiv_date_query_for_month,
+                          get_previous_month_year, append_articles_to_jsonl)
+    from .dedup import load_seen_articles, SEEN_ARTICLES_FILENAME
+    from .response_cache import get_default_response_cache
+except ImportError:
+    from scraper import (ARXIV_API_URL, DEFAULT_BASE_QUERY, OUTPUT_FILENAME, BATCH_SIZE_PER_ITERATION,
+                         TARGET_ARTICLES_GOAL, build_arxiv_params, parse_arxiv_feed, get_arxiv_date_query_for_month,
+                         get_previous_month_year, append_articles_to_jsonl)
+    from dedup import load_seen_articles, SEEN_ARTICLES_FILENAME
+    from response_cache import get_default_response_cache
+
+# --- Konfigurasi ---
+ARXIV_MIN_REQUEST_INTERVAL_SECONDS = float(os.getenv("ARXIV_MIN_REQUEST_INTERVAL_SECONDS", "3"))
+MONTH_CHECKPOINT_DIR = "data/rawdata/scraper_checkpoints"
+DEFAULT_CONCURRENCY = 4
+MAX_FETCH_RETRIES = 4
+# Halaman kosong sebelum akhir hasil (feed kosong sementara / halaman error) dicoba ulang sebanyak ini
+MAX_EMPTY_PAGE_RETRIES = 3
+TOTAL_RESULTS_PATTERN = re.compile(rb'<opensearch:totalResults[^>]*>\s*(\d+)\s*<')
+HTTP_TIMEOUT_SECONDS = 60.0
+
+class TokenBucket:
+    """
+    Pembatas laju global untuk semua worker: token diisi ulang `rate` per detik hingga `capacity`.
+    Dengan capacity=1, jarak antar request tidak pernah lebih rapat dari 1/rate detik.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:  # tanpa batas (mis. server lokal)
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+# --- Checkpoint per bulan ---
+def get_month_checkpoint_path(checkpoint_dir, base_query, year, month):
+    """Checkpoint dipisah per kueri dasar agar kueri berbeda tidak saling menimpa."""
+    query_hash = hashlib.sha1(base_query.encode('utf-8')).hexdigest()[:10]
+    return os.path.join(checkpoint_dir, query_hash, f"{year:04d}-{month:02d}.json")
+
+def load_month_checkpoint(path):
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            print(f"Peringatan: Checkpoint bulan '{path}' rusak. Bulan ini dimulai dari awal.")
+    return {"start_index": 0, "articles_written": 0, "done": False}
+
+def save_month_checkpoint(path, state):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+def list_months_descending(start_year, start_month, end_year, end_month):
+    """Daftar (tahun, bulan) dari bulan akhir mundur hingga bulan awal (inklusif), seperti scraper sekuensial."""
+    months = []
+    year, month = end_year, end_month
+    while (year, month) >= (start_year, start_month):
+        months.append((year, month))
+        year, month = get_previous_month_year(year, month)
+    return months
+
+class AsyncScrapeSession:
+    """Status bersama semua worker: klien HTTP, pembatas laju, seen-set dedup, dan penghitung target."""
+
+    def __init__(self, client, rate_limiter, base_query, batch_size, target_total, output_path, checkpoint_dir,
+                 api_url, seen_articles, response_cache=None):
+        self.client = client
+        self.rate_limiter = rate_limiter
+        self.base_query = base_query
+        self.batch_size = batch_size
+        self.target_total = target_total
+        self.output_path = output_path
+        self.checkpoint_dir = checkpoint_dir
+        self.api_url = api_url
+        self.seen_articles = seen_articles
+        self.response_cache = response_cache
+        self.total_written = 0
+        self.total_duplicates = 0
+        self.requests_made = 0
+
+    def target_reached(self):
+        return self.target_total is not None and self.total_written >= self.target_total
+
+async def fetch_feed(session, params):
+    """
+    Mengambil satu halaman feed dengan retry (backoff eksponensial). Mengembalikan (konten, dari_cache);
+    konten None jika semua percobaan gagal. Halaman dari cache respons tidak memakai token pembatas laju.
+    """
+    if session.response_cache is not None:
+        cached_content = session.response_cache.get(params)
+        if cached_content is not None:
+            return cached_content, True
+    for attempt in range(MAX_FETCH_RETRIES):
+        await session.rate_limiter.acquire()
+        session.requests_made += 1
+        try:
+            response = await session.client.get(session.api_url, params=params)
+            response.raise_for_status()
+            return response.content, False
+        except httpx.HTTPError as e:
+            backoff_seconds = max(ARXIV_MIN_REQUEST_INTERVAL_SECONDS, 1.0) * (2 ** attempt)
+            print(f"  Error saat request API (percobaan {attempt + 1}/{MAX_FETCH_RETRIES}): {e}. "
+                  f"Mencoba lagi dalam {backoff_seconds:.0f} detik.")
+            await asyncio.sleep(backoff_seconds)
+    return None, False
+
+def parse_total_results(content):
+    """Nilai opensearch:totalResults dari feed arXiv, atau None jika tidak ada (mis. halaman error)."""
+    match = TOTAL_RESULTS_PATTERN.search(content)
+    return int(match.group(1)) if match else None
+
+async def scrape_month(session, year, month):
+    """Mengambil semua halaman satu bulan, melanjutkan dari checkpoint bulan tersebut."""
+    checkpoint_path = get_month_checkpoint_path(session.checkpoint_dir, session.base_query, year, month)
+    state = load_month_checkpoint(checkpoint_path)
+    if state["done"]:
+        return
+    query = get_arxiv_date_query_for_month(year, month, session.base_query)
+    loop = asyncio.get_running_loop()
+    empty_retries = 0
+
+    while not session.target_reached():
+        params = build_arxiv_params(query, state["start_index"], session.batch_size)
+        content, from_cache = await fetch_feed(session, params)
+        if content is None:
+            print(f"  Bulan {month:02d}-{year} dihentikan di start_idx={state['start_index']}; akan dilanjutkan pada run berikutnya.")
+            return
+        # Parsing XML (CPU) dijalankan di thread agar worker lain tetap bisa menunggu jaringan
+        articles = await loop.run_in_executor(None, parse_arxiv_feed, content)
+        # Halaman kosong tidak disimpan: arXiv kadang mengembalikan feed kosong sementara
+        if session.response_cache is not None and not from_cache and articles:
+            session.response_cache.put(params, content)
+        if not articles:
+            total_results = parse_total_results(content)
+            if total_results is not None and state["start_index"] >= total_results:
+                # Akhir hasil yang sebenarnya (bulan kosong atau jumlah artikel kelipatan batch_size)
+                state["done"] = True
+                save_month_checkpoint(checkpoint_path, state)
+                print(f"  Bulan {month:02d}-{year} selesai ({state['articles_written']} artikel).")
+                return
+            if empty_retries >= MAX_EMPTY_PAGE_RETRIES:
+                print(f"  Bulan {month:02d}-{year}: halaman kosong di start_idx={state['start_index']} "
+                      f"(totalResults={total_results}); akan dilanjutkan pada run berikutnya.")
+                return
+            empty_retries += 1
+            backoff_seconds = max(ARXIV_MIN_REQUEST_INTERVAL_SECONDS, 1.0) * (2 ** empty_retries)
+            print(f"  Bulan {month:02d}-{year}: halaman kosong di start_idx={state['start_index']} "
+                  f"(percobaan {empty_retries}/{MAX_EMPTY_PAGE_RETRIES}). Mencoba lagi dalam {backoff_seconds:.0f} detik.")
+            await asyncio.sleep(backoff_seconds)
+            continue
+        empty_retries = 0
+
+        # Tidak ada await di antara penulisan artikel, seen-set, dan checkpoint, sehingga urutan ini
+        # tidak bisa diselingi worker lain (semua berjalan di satu event loop)
+        new_articles, new_keys, duplicate_count = session.seen_articles.filter_new(articles)
+        append_articles_to_jsonl(new_articles, session.output_path)
+        session.seen_articles.add(new_keys)
+        session.seen_articles.save()
+        session.total_written += len(new_articles)
+        session.total_duplicates += duplicate_count
+
+        state["start_index"] += len(articles)
+        state["articles_written"] += len(new_articles)
+        # Halaman tidak penuh (dan tidak kosong) menandakan akhir hasil untuk bulan ini
+        state["done"] = len(articles) < session.batch_size
+        save_month_checkpoint(checkpoint_path, state)
+        print(f"  {month:02d}-{year}: {len(new_articles)} artikel baru, {duplicate_count} duplikat "
+              f"(start_idx={state['start_index']}). Total sesi: {session.total_written}.")
+        if state["done"]:
+            print(f"  Bulan {month:02d}-{year} selesai ({state['articles_written']} artikel).")
+            return
+
+async def run_async_scraper(start_year, start_month, end_year, end_month, base_query=DEFAULT_BASE_QUERY,
+                            concurrency=DEFAULT_CONCURRENCY, batch_size=BATCH_SIZE_PER_ITERATION,
+                            target_total_articles=TARGET_ARTICLES_GOAL, output_path=OUTPUT_FILENAME,
+                            checkpoint_dir=MONTH_CHECKPOINT_DIR, api_url=ARXIV_API_URL,
+                            min_request_interval=ARXIV_MIN_REQUEST_INTERVAL_SECONDS,
+                            seen_path=SEEN_ARTICLES_FILENAME, response_cache=None):
+    if httpx is None:
+        raise RuntimeError("httpx belum terinstal. Jalankan: pip install httpx")
+
+    months = list_months_descending(start_year, start_month, end_year, end_month)
+    month_queue = asyncio.Queue()
+    for year_month in months:
+        month_queue.put_nowait(year_month)
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    rate_limiter = TokenBucket(1.0 / min_request_interval if min_request_interval > 0 else 0)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    started = time.perf_counter()
+    print(f"--- Scraper Asinkron: {len(months)} bulan, {concurrency} worker, "
+          f"interval minimum {min_request_interval} detik per request ---")
+
+    async with httpx.AsyncClient(limits=limits, timeout=HTTP_TIMEOUT_SECONDS) as client:
+        session = AsyncScrapeSession(client, rate_limiter, base_query, batch_size, target_total_articles, output_path,
+                                     checkpoint_dir, api_url, load_seen_articles(seen_path, output_path),
+                                     response_cache if response_cache is not None else get_default_response_cache())
+
+        async def worker():
+            while not month_queue.empty() and not session.target_reached():
+                year, month = month_queue.get_nowait()
+                await scrape_month(session, year, month)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    elapsed = time.perf_counter() - started
+    print(f"\n--- Scraper Asinkron Selesai dalam {elapsed:.1f} detik ---")
+    print(f"Artikel baru: {session.total_written}, duplikat dilewati: {session.total_duplicates}, "
+          f"request: {session.requests_made}.")
+    if session.response_cache is not None:
+        print(f"Cache respons: {session.response_cache.hits} hit, {session.response_cache.misses} miss.")
+    return session.total_written
+
+def parse_year_month(value):
+    year, month = value.split('-')
+    return int(year), int(month)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scraper arXiv asinkron dengan pembatas laju global.")
+    parser.add_argument("--start", type=parse_year_month, required=True, help="Bulan paling lama, format YYYY-MM.")
+    parser.add_argument("--end", type=parse_year_month, required=True, help="Bulan paling baru, format YYYY-MM.")
+    parser.add_argument("--query", default=DEFAULT_BASE_QUERY)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Jumlah bulan yang diambil bersamaan.")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE_PER_ITERATION)
+    parser.add_argument("--target", type=int, default=TARGET_ARTICLES_GOAL, help="Jumlah artikel baru maksimum pada sesi ini.")
+    parser.add_argument("--output", default=OUTPUT_FILENAME)
+    parser.add_argument("--checkpoint-dir", default=MONTH_CHECKPOINT_DIR)
+    parser.add_argument("--seen-file", default=SEEN_ARTICLES_FILENAME)
+    parser.add_argument("--api-url", default=ARXIV_API_URL)
+    parser.add_argument("--rate-interval", type=float, default=ARXIV_MIN_REQUEST_INTERVAL_SECONDS,
+                        help="Jarak minimum antar request (detik) untuk semua worker; 0 = tanpa batas.")
+    args = parser.parse_args()
+
+    asyncio.run(run_async_scraper(args.start[0], args.start[1], args.end[0], args.end[1], base_query=args.query,
+                                  concurrency=args.concurrency, batch_size=args.batch_size,
+                                  target_total_articles=args.target, output_path=args.output,
+                                  checkpoint_dir=args.checkpoint_dir, api_url=args.api_url,
+                                  min_request_interval=args.rate_interval, seen_path=args.seen_file))
@@ -0,0 +1,88 @@
+"""
+Parser Atom arXiv berbasis lxml.iterparse.
+
+Menghasilkan dict artikel yang sama persis dengan scraper.parse_arxiv_entry (BeautifulSoup), tetapi tanpa
+membangun seluruh pohon BeautifulSoup: setiap <entry> diproses saat selesai dibaca lalu dibuang dari
+memori. Pencocokan tag memakai nama lokal di namespace apa pun ('{*}title'), sama seperti find() BeautifulSoup
+dengan parser "xml", sehingga fallback prefix 'atom:' tidak diperlukan.
+"""
+from io import BytesIO
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+ARXIV_NS = "http://arxiv.org/schemas/atom"
+DOI_URL_PREFIXES = ('http://dx.doi.org/', 'https://doi.org/')
+
+def _first(element, tag):
+    """Elemen keturunan pertama (urutan dokumen) dengan tag tersebut, seperti Tag.find() BeautifulSoup."""
+    for found in element.iter(tag):
+        if found is not element:
+            return found
+    return None
+
+def _text(element, tag):
+    found = _first(element, tag)
+    if found is None:
+        return ""
+    return "".join(found.itertext()).strip().replace('\n', ' ')
+
+def entry_to_article(entry):
+    """Mengubah satu elemen <entry> lxml menjadi dict artikel (format sama dengan parse_arxiv_entry)."""
+    authors = []
+    for author in entry.iter('{*}author'):
+        name = _text(author, '{*}name')
+        if name:
+            authors.append(name)
+
+    published_date = _text(entry, '{*}published')
+
+    doi = ""
+    doi_link = None
+    for link in entry.iter('{*}link'):
+        if link.get('title') == 'doi':
+            doi_link = link
+            break
+    if doi_link is not None and doi_link.get('href'):
+        doi = doi_link.get('href')
+        for prefix in DOI_URL_PREFIXES:
+            doi = doi.replace(prefix, '')
+    else:
+        doi_element = _first(entry, f'{{{ARXIV_NS}}}doi')
+        if doi_element is not None:
+            doi = "".join(doi_element.itertext()).strip()
+
+    return {
+        "title": _text(entry, '{*}title'),
+        "abstract": _text(entry, '{*}summary'),
+        "authors": authors,
+        "journal_conference_name": "arXiv",
+        "publisher": "arXiv",
+        "year": published_date.split('-')[0] if published_date else "",
+        "doi": doi,
+        "group_name": "default_group"
+    }
+
+def iter_arxiv_articles(source):
+    """
+    Membaca feed Atom secara streaming dan menghasilkan dict artikel satu per satu.
+    source: bytes, path file, atau file object biner.
+    """
+    if etree is None:
+        raise RuntimeError("lxml belum terinstal. Jalankan: pip install lxml")
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    for _, entry in etree.iterparse(source, events=('end',), tag='{*}entry', resolve_entities=False,
+                                    huge_tree=True):
+        yield entry_to_article(entry)
+        # Lepaskan entri yang sudah diproses agar memori tidak tumbuh seiring ukuran feed
+        entry.clear()
+        parent = entry.getparent()
+        if parent is not None:
+            while entry.getprevious() is not None:
+                del parent[0]
+
+def parse_arxiv_feed_lxml(feed_content):
+    return list(iter_arxiv_articles(feed_content))
@@ -0,0 +1,197 @@
+"""
+Penilaian topik massal (offline) untuk korpus besar tanpa menjalankan API.
+
+Input dibaca streaming per chunk: JSONL mentah dari scraper, atau CSV/Parquet (mentah dengan kolom
+title/abstract, atau artefak processed_articles yang sudah berisi Processed_Title/Processed_Abstract).
+Teks mentah dipra-proses di process pool; pra-pemrosesan chunk berikutnya berjalan selagi chunk saat ini
+di-embed (lewat cache embedding persisten) dan di-transform. Hasil (Topic dan probabilitas top-k sebagai
+kolom top_<n>_topic/top_<n>_prob) ditulis per chunk ke output Parquet (atau CSV sesuai ekstensi).
+
+    python src/bulk_score.py --input data/rawdata/arxiv_cs_articles_by_date.jsonl \
+        --output data/final/bulk_scores/arxiv_scores.parquet
+"""
+import argparse
+import multiprocessing
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sentence_transformers import SentenceTransformer
+
+# Modul lain di 'src' (mendukung dijalankan sebagai skrip maupun sebagai paket)
+try:
+    from .artifacts import TableWriter, artifact_path, count_table_rows, format_from_path, iter_table_chunks
+    from .embedding_store import EmbeddingStore
+    from .modelling import (PROBABILITY_TOP_K, add_processed_text, compute_embeddings, get_next_run_id,
+                            get_output_dirs, top_k_probabilities)
+    from .preprocess import iter_jsonl_chunks, preprocess_texts_batch
+    from .topic_updates import assign_update_topics
+except ImportError:
+    from artifacts import TableWriter, artifact_path, count_table_rows, format_from_path, iter_table_chunks
+    from embedding_store import EmbeddingStore
+    from modelling import (PROBABILITY_TOP_K, add_processed_text, compute_embeddings, get_next_run_id,
+                           get_output_dirs, top_k_probabilities)
+    from preprocess import iter_jsonl_chunks, preprocess_texts_batch
+    from topic_updates import assign_update_topics
+
+BULK_SCORE_CHUNK_ROWS = int(os.getenv("BULK_SCORE_CHUNK_ROWS", "20000"))
+DEFAULT_KEEP_COLUMNS = ("title", "year", "doi")
+
+def iter_input_chunks(input_path, chunk_rows, progress):
+    """DataFrame per chunk dari JSONL/CSV/Parquet. progress['fraction'] diperbarui untuk JSONL (posisi byte)."""
+    if input_path.endswith(".jsonl"):
+        file_size = max(os.path.getsize(input_path), 1)
+        stats = {}
+        for records in iter_jsonl_chunks(input_path, chunk_rows, stats):
+            progress['fraction'] = stats.get('end_offset', 0) / file_size
+            progress['malformed'] = stats.get('malformed', 0)
+            yield pd.DataFrame(records)
+        return
+    if format_from_path(input_path) == "parquet":
+        progress['total_rows'] = count_table_rows(input_path)
+    yield from iter_table_chunks(input_path, chunk_rows)
+
+def submit_preprocess(executor, chunk_df, stopword_set, n_parts):
+    """
+    Menjadwalkan pra-pemrosesan chunk di pool. Mengembalikan fungsi yang menunggu hasilnya dan
+    mengembalikan chunk dengan kolom Processed_Text. Artefak yang sudah diproses tidak dikirim ke pool.
+    """
+    if 'Processed_Title' in chunk_df.columns:
+        return lambda: add_processed_text(chunk_df)
+    if 'title' not in chunk_df.columns:
+        chunk_df['title'] = float('nan')  # sama seperti nilai hilang pada preprocess.py
+    if 'abstract' not in chunk_df.columns:
+        chunk_df['abstract'] = ""
+
+    def split(values):
+        values = values.tolist()
+        part_size = max(1, -(-len(values) // n_parts))
+        return [values[i:i + part_size] for i in range(0, len(values), part_size)]
+
+    if executor is None:
+        title_parts = [preprocess_texts_batch(part, stopword_set) for part in split(chunk_df['title'])]
+        abstract_parts = [preprocess_texts_batch(part, stopword_set) for part in split(chunk_df['abstract'])]
+        title_futures = abstract_futures = None
+    else:
+        title_futures = [executor.submit(preprocess_texts_batch, part, stopword_set) for part in split(chunk_df['title'])]
+        abstract_futures = [executor.submit(preprocess_texts_batch, part, stopword_set) for part in split(chunk_df['abstract'])]
+
+    def collect():
+        titles = title_parts if title_futures is None else [future.result() for future in title_futures]
+        abstracts = abstract_parts if abstract_futures is None else [future.result() for future in abstract_futures]
+        chunk_df['Processed_Title'] = [text for part in titles for text in part]
+        chunk_df['Processed_Abstract'] = [text for part in abstracts for text in part]
+        return add_processed_text(chunk_df)
+    return collect
+
+def score_chunk(topic_model, embedding_model, chunk_df, embedding_store, probability_top_k, keep_columns):
+    """Embedding + transform untuk satu chunk; mengembalikan DataFrame output (kolom kolumnar datar)."""
+    texts = chunk_df['Processed_Text'].tolist()
+    embeddings = np.asarray(compute_embeddings(embedding_model, texts, embedding_store), dtype=np.float32)
+    topics, probabilities = topic_model.transform(texts, embeddings)
+    topics = assign_update_topics(topic_model, topics, embeddings)
+    output = chunk_df[[col for col in keep_columns if col in chunk_df.columns]].reset_index(drop=True)
+    output['Topic'] = topics.astype(np.int32)
+    if probability_top_k > 0:
+        topic_ids, values = top_k_probabilities(topics, probabilities, probability_top_k)
+        for rank in range(probability_top_k):
+            output[f'top_{rank + 1}_topic'] = topic_ids[:, rank]
+            output[f'top_{rank + 1}_prob'] = values[:, rank]
+    return output
+
+def run_bulk_scoring(input_path, output_path, topic_model, sentence_model_name, stopword_set, embedding_store=None,
+                     n_jobs=None, chunk_rows=BULK_SCORE_CHUNK_ROWS, probability_top_k=PROBABILITY_TOP_K,
+                     keep_columns=DEFAULT_KEEP_COLUMNS):
+    """
+    Menilai seluruh input per chunk dan menulis hasilnya ke output_path. Pra-pemrosesan chunk berikutnya
+    dijadwalkan ke pool sebelum chunk saat ini di-transform. Mengembalikan dict statistik.
+    """
+    if not os.path.exists(input_path):
+        print(f"Error: File input {input_path} tidak ditemukan!")
+        return None
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    embedding_model = SentenceTransformer(sentence_model_name)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    # 'spawn': worker ProcessPoolExecutor dibuat saat submit, yaitu setelah SentenceTransformer dimuat;
+    # fork dari proses yang sudah memuat torch bisa deadlock di thread pool OpenMP/MKL
+    executor = None
+    if n_jobs > 1:
+        executor = ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context("spawn"))
+    progress = {}
+    started = time.perf_counter()
+    rows_scored = 0
+    try:
+        with TableWriter(output_path) as writer:
+            chunks = iter_input_chunks(input_path, chunk_rows, progress)
+            first_chunk = next(chunks, None)
+            pending = submit_preprocess(executor, first_chunk, stopword_set, n_jobs) if first_chunk is not None else None
+            while pending is not None:
+                chunk_df = pending()
+                next_chunk = next(chunks, None)
+                pending = submit_preprocess(executor, next_chunk, stopword_set, n_jobs) if next_chunk is not None else None
+
+                writer.write(score_chunk(topic_model, embedding_model, chunk_df, embedding_store, probability_top_k,
+                                         keep_columns))
+                rows_scored += len(chunk_df)
+                elapsed = time.perf_counter() - started
+                if progress.get('total_rows'):
+                    done = f"{rows_scored}/{progress['total_rows']} ({rows_scored / progress['total_rows']:.1%})"
+                elif 'fraction' in progress:
+                    done = f"{rows_scored} ({progress['fraction']:.1%} file)"
+                else:
+                    done = str(rows_scored)
+                print(f"Dokumen dinilai: {done}, {rows_scored / max(elapsed, 1e-9):.0f} dok/detik, {elapsed:.0f} detik")
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    if progress.get('malformed'):
+        print(f"Peringatan: {progress['malformed']} baris JSONL rusak dilewati.")
+    print(f"Selesai: {rows_scored} dokumen dalam {elapsed:.1f} detik "
+          f"({rows_scored / max(elapsed, 1e-9):.0f} dok/detik) -> {output_path}")
+    stats = {"rows_scored": rows_scored, "seconds": elapsed, "malformed": progress.get('malformed', 0)}
+    if embedding_store is not None and embedding_store.total_stats["texts"]:
+        stats["embedding_cache_hit_ratio"] = embedding_store.total_stats["hits"] / embedding_store.total_stats["texts"]
+        print(f"Rasio hit cache embedding: {stats['embedding_cache_hit_ratio']:.1%}")
+    return stats
+
+if __name__ == "__main__":
+    from nltk.corpus import stopwords
+
+    parser = argparse.ArgumentParser(description="Penilaian topik massal untuk korpus JSONL/CSV/Parquet.")
+    parser.add_argument("--input", required=True, help="JSONL scraper, atau CSV/Parquet (mentah atau processed_articles).")
+    parser.add_argument("--output", default=None,
+                        help="Path output (.parquet/.csv). Default: data/final/bulk_scores/<nama_input>_run<id>.")
+    parser.add_argument("--run-id", type=int, default=None, help="ID run model (default: run terakhir).")
+    parser.add_argument("--sentence-model", default='paraphrase-MiniLM-L6-v2',
+                        help="Model SentenceTransformer yang dipakai saat pelatihan run tersebut.")
+    parser.add_argument("--chunk-rows", type=int, default=BULK_SCORE_CHUNK_ROWS)
+    parser.add_argument("--n-jobs", type=int, default=None, help="Jumlah proses pra-pemrosesan (default: semua core).")
+    parser.add_argument("--top-k", type=int, default=PROBABILITY_TOP_K, help="Jumlah probabilitas topik teratas (0 = tidak ada).")
+    parser.add_argument("--keep-columns", default=",".join(DEFAULT_KEEP_COLUMNS),
+                        help="Kolom input yang ikut disalin ke output, dipisahkan koma.")
+    parser.add_argument("--no-embedding-cache", action="store_true", help="Jangan gunakan cache embedding persisten.")
+    args = parser.parse_args()
+
+    model_output_dir, results_output_dir = get_output_dirs()
+    run_id = args.run_id if args.run_id is not None else get_next_run_id(results_output_dir) - 1
+    model_path = os.path.join(model_output_dir, f"bertopic_model_{run_id}.pkl")
+    if not os.path.exists(model_path):
+        raise SystemExit(f"Error: Model {model_path} tidak ditemukan.")
+    with open(model_path, 'rb') as f:
+        loaded_model = pickle.load(f)
+    print(f"Model run {run_id} dimuat dari: {model_path}")
+
+    output_path = args.output
+    if output_path is None:
+        input_name = os.path.splitext(os.path.basename(args.input))[0]
+        output_path = artifact_path(os.path.join(os.path.dirname(results_output_dir), "bulk_scores",
+                                                 f"{input_name}_run{run_id}"))
+    run_bulk_scoring(args.input, output_path, loaded_model, args.sentence_model, frozenset(stopwords.words('english')),
+                     embedding_store=None if args.no_embedding_cache else EmbeddingStore(args.sentence_model),
+                     n_jobs=args.n_jobs, chunk_rows=args.chunk_rows, probability_top_k=args.top_k,
+                     keep_columns=[col.strip() for col in args.keep_columns.split(",") if col.strip()])
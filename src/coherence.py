@@ -0,0 +1,160 @@
+"""
+Evaluasi coherence topik (c_v) yang lebih cepat untuk korpus besar.
+
+- Tokenisasi di-cache per proses dan gensim Dictionary di-cache di disk (data/coherence_cache/), dengan kunci
+  sidik jari SHA-256 dari dokumen, sehingga run/konfigurasi berikutnya pada korpus yang sama tidak
+  membangunnya ulang.
+- Statistik ko-okurensi sliding window dihitung paralel oleh worker gensim (parameter processes).
+- Mode sampel: c_v dihitung pada beberapa sampel dokumen acak dengan seed tetap, lalu dilaporkan rata-rata
+  beserta interval kepercayaan 95% (distribusi t).
+
+    python src/coherence.py 3 --sample-size 20000 --n-samples 5
+"""
+import argparse
+import hashlib
+import os
+import pickle
+import time
+
+import numpy as np
+from gensim.corpora import Dictionary
+from gensim.models.coherencemodel import CoherenceModel
+from scipy import stats
+
+COHERENCE_CACHE_DIR = os.getenv("COHERENCE_CACHE_DIR", "data/coherence_cache")
+# 0 = default gensim (jumlah core - 1); set 1 di dalam worker yang sudah paralel agar tidak oversubscribe
+COHERENCE_PROCESSES = int(os.getenv("COHERENCE_PROCESSES", "0"))
+COHERENCE_TOP_N_WORDS = 10
+CONFIDENCE_LEVEL = 0.95
+
+_TOKENIZED_CORPUS_CACHE = {}
+
+def corpus_fingerprint(documents):
+    hasher = hashlib.sha256()
+    for document in documents:
+        hasher.update(document.encode('utf-8'))
+        hasher.update(b'\n')
+    return hasher.hexdigest()
+
+def load_or_build_dictionary(tokenized_docs, fingerprint, cache_dir=COHERENCE_CACHE_DIR):
+    dictionary_path = os.path.join(cache_dir, f"{fingerprint[:32]}.dict") if cache_dir else None
+    if dictionary_path and os.path.exists(dictionary_path):
+        return Dictionary.load(dictionary_path)
+    dictionary = Dictionary(tokenized_docs)
+    if dictionary_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Nama tmp unik per proses: beberapa proses bisa membangun dictionary yang sama bersamaan
+        tmp_path = f"{dictionary_path}.{os.getpid()}.tmp"
+        dictionary.save(tmp_path)
+        os.replace(tmp_path, dictionary_path)
+    return dictionary
+
+def prepare_dictionary_cache(documents, cache_dir=COHERENCE_CACHE_DIR):
+    """
+    Membangun Dictionary korpus ke cache disk jika belum ada, tanpa menyimpannya di cache proses. Dipanggil
+    proses induk sebelum membuat pool agar worker cukup memanggil Dictionary.load.
+    """
+    if not cache_dir:
+        return
+    documents = [str(document) for document in documents]
+    fingerprint = corpus_fingerprint(documents)
+    if fingerprint not in _TOKENIZED_CORPUS_CACHE:
+        load_or_build_dictionary((document.split() for document in documents), fingerprint, cache_dir)
+
+def load_tokenized_corpus(documents, cache_dir=COHERENCE_CACHE_DIR):
+    """(dokumen ter-tokenisasi, Dictionary) untuk korpus ini; dari cache proses/disk jika tersedia."""
+    documents = [str(document) for document in documents]
+    fingerprint = corpus_fingerprint(documents)
+    if fingerprint in _TOKENIZED_CORPUS_CACHE:
+        return _TOKENIZED_CORPUS_CACHE[fingerprint]
+
+    tokenized_docs = [document.split() for document in documents]
+    dictionary = load_or_build_dictionary(tokenized_docs, fingerprint, cache_dir)
+
+    # Hanya satu korpus disimpan per proses (sweep memakai korpus yang sama untuk semua konfigurasi)
+    _TOKENIZED_CORPUS_CACHE.clear()
+    _TOKENIZED_CORPUS_CACHE[fingerprint] = (tokenized_docs, dictionary)
+    return tokenized_docs, dictionary
+
+def get_topic_words(topic_model, top_n_words=COHERENCE_TOP_N_WORDS):
+    """Daftar kata teratas per topik BERTopic (tanpa topik outlier -1 dan kata kosong)."""
+    topic_words = []
+    for topic_id, words in topic_model.get_topics().items():
+        if topic_id == -1 or not words:
+            continue
+        words = [word for word, _ in words[:top_n_words] if word]
+        if words:
+            topic_words.append(words)
+    return topic_words
+
+def compute_cv(topic_words, tokenized_docs, dictionary, processes=COHERENCE_PROCESSES, top_n_words=COHERENCE_TOP_N_WORDS):
+    # Kata yang tidak ada di dictionary dibuang agar gensim tidak gagal pada topik tersebut
+    topic_words = [[word for word in words if word in dictionary.token2id] for words in topic_words]
+    topic_words = [words for words in topic_words if words]
+    if not topic_words or not tokenized_docs:
+        return 0.0
+    coherence_model = CoherenceModel(topics=topic_words, texts=tokenized_docs, dictionary=dictionary,
+                                     coherence='c_v', topn=top_n_words, processes=processes if processes > 0 else -1)
+    return float(coherence_model.get_coherence())
+
+def evaluate_topic_coherence(documents, topic_model, sample_size=None, n_samples=5, seed=42,
+                             processes=COHERENCE_PROCESSES, top_n_words=COHERENCE_TOP_N_WORDS,
+                             cache_dir=COHERENCE_CACHE_DIR):
+    """
+    Coherence c_v model terhadap dokumen. Tanpa sample_size seluruh korpus dipakai; dengan sample_size,
+    c_v dihitung pada n_samples sampel acak (seed tetap, tanpa pengembalian) dan dilaporkan rata-rata serta
+    interval kepercayaan 95%. Mengembalikan dict: coherence_cv, ci_low, ci_high, std, n_samples,
+    sample_size, num_topics, seconds.
+    """
+    started = time.perf_counter()
+    topic_words = get_topic_words(topic_model, top_n_words)
+    tokenized_docs, dictionary = load_tokenized_corpus(documents, cache_dir)
+    result = {"num_topics": len(topic_words), "sample_size": len(tokenized_docs), "n_samples": 1, "std": 0.0}
+
+    if sample_size and sample_size < len(tokenized_docs):
+        rng = np.random.default_rng(seed)
+        scores = []
+        for _ in range(max(1, n_samples)):
+            indices = np.sort(rng.choice(len(tokenized_docs), size=sample_size, replace=False))
+            scores.append(compute_cv(topic_words, [tokenized_docs[i] for i in indices], dictionary, processes, top_n_words))
+        mean = float(np.mean(scores))
+        std = float(np.std(scores, ddof=1)) if len(scores) > 1 else 0.0
+        margin = 0.0
+        if len(scores) > 1:
+            margin = float(stats.t.ppf((1 + CONFIDENCE_LEVEL) / 2, len(scores) - 1)) * std / np.sqrt(len(scores))
+        result.update({"coherence_cv": mean, "ci_low": mean - margin, "ci_high": mean + margin, "std": std,
+                       "n_samples": len(scores), "sample_size": sample_size})
+    else:
+        score = compute_cv(topic_words, tokenized_docs, dictionary, processes, top_n_words)
+        result.update({"coherence_cv": score, "ci_low": score, "ci_high": score})
+
+    result["seconds"] = time.perf_counter() - started
+    print(f"Coherence Score (c_v): {result['coherence_cv']:.4f} "
+          f"[{result['ci_low']:.4f}, {result['ci_high']:.4f}] dari {result['n_samples']} x {result['sample_size']} dokumen, "
+          f"{result['seconds']:.1f} detik")
+    return result
+
+if __name__ == "__main__":
+    try:
+        from .artifacts import find_artifact, read_table
+    except ImportError:
+        from artifacts import find_artifact, read_table
+
+    parser = argparse.ArgumentParser(description="Menghitung coherence c_v untuk run model yang tersimpan.")
+    parser.add_argument("run_id", help="ID lokal run (bertopic_model_<id>.pkl dan topic_results_<id>).")
+    parser.add_argument("--final-dir", default="data/final")
+    parser.add_argument("--sample-size", type=int, default=None)
+    parser.add_argument("--n-samples", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--processes", type=int, default=COHERENCE_PROCESSES)
+    args = parser.parse_args()
+
+    results_path = find_artifact(os.path.join(args.final_dir, "topic_results", f"topic_results_{args.run_id}"))
+    if results_path is None:
+        raise SystemExit(f"Error: Hasil topik untuk run {args.run_id} tidak ditemukan.")
+    with open(os.path.join(args.final_dir, "bertopic_model", f"bertopic_model_{args.run_id}.pkl"), 'rb') as f:
+        loaded_model = pickle.load(f)
+    results_df = read_table(results_path, columns=['Processed_Text'])
+    evaluate_topic_coherence(results_df['Processed_Text'].fillna('').tolist(), loaded_model,
+                             sample_size=args.sample_size, n_samples=args.n_samples, seed=args.seed,
+                             processes=args.processes)
@@ -0,0 +1,195 @@
+"""
+Deduplikasi artikel antara scraper dan modelling.
+
+Setiap artikel punya kunci berbasis hash dari DOI dan dari judul yang dinormalisasi. Artikel dianggap
+duplikat jika salah satu kuncinya sudah pernah terlihat, sehingga artikel yang baru mendapat DOI di
+pengambilan berikutnya tetap terdeteksi lewat judulnya. Kunci yang sudah terlihat disimpan di file teks
+append-only (satu kunci per baris) agar tetap berlaku antar restart scraper.
+
+Batasan: dua artikel berbeda dengan judul yang persis sama (setelah normalisasi) dianggap duplikat.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import unicodedata
+
+SEEN_ARTICLES_FILENAME = "data/rawdata/seen_articles.txt"
+NON_ALNUM_PATTERN = re.compile(r'[^0-9a-z]+')
+DOI_PREFIX_PATTERN = re.compile(r'^(?:https?://(?:dx\.)?doi\.org/|doi:)', re.IGNORECASE)
+
+def normalize_title(title):
+    """Lowercase, hapus aksen dan tanda baca, serta rapikan spasi: 'Deep  Learning!' -> 'deep learning'."""
+    if not isinstance(title, str):
+        return ""
+    ascii_title = unicodedata.normalize('NFKD', title).encode('ascii', 'ignore').decode('ascii')
+    return NON_ALNUM_PATTERN.sub(' ', ascii_title.lower()).strip()
+
+def normalize_doi(doi):
+    if not isinstance(doi, str):
+        return ""
+    return DOI_PREFIX_PATTERN.sub('', doi.strip()).lower()
+
+def _hash_key(prefix, value):
+    return prefix + hashlib.blake2b(value.encode('utf-8'), digest_size=8).hexdigest()
+
+def article_keys(article):
+    """Daftar kunci dedup sebuah artikel (dict): 'd<hash DOI>' dan/atau 't<hash judul ternormalisasi>'."""
+    keys = []
+    doi = normalize_doi(article.get('doi'))
+    if doi:
+        keys.append(_hash_key('d', doi))
+    title = normalize_title(article.get('title'))
+    if title:
+        keys.append(_hash_key('t', title))
+    return keys
+
+class SeenArticleSet:
+    """
+    Himpunan kunci artikel yang sudah terlihat. Dengan path, kunci dimuat dari file saat dibuat dan
+    kunci baru ditambahkan ke file saat save() dipanggil; tanpa path hanya disimpan di memori.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.keys = set()
+        self._pending = []
+        self._replace_file = False
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.keys.update(line.strip() for line in f if line.strip())
+
+    def __len__(self):
+        return len(self.keys)
+
+    def is_duplicate(self, article):
+        return any(key in self.keys for key in article_keys(article))
+
+    def filter_new(self, articles):
+        """
+        Memisahkan artikel baru dari duplikat (terhadap set ini maupun sesama artikel dalam daftar).
+        Mengembalikan (artikel_baru, kunci_baru, jumlah_duplikat); set belum diubah sampai add() dipanggil.
+        """
+        batch_keys = set()
+        new_articles, new_keys, duplicate_count = [], [], 0
+        for article in articles:
+            keys = article_keys(article)
+            if any(key in self.keys or key in batch_keys for key in keys):
+                duplicate_count += 1
+                continue
+            batch_keys.update(keys)
+            new_articles.append(article)
+            new_keys.extend(keys)
+        return new_articles, new_keys, duplicate_count
+
+    def add(self, keys):
+        """Menandai kunci sebagai terlihat (di memori); kunci baru akan ditulis ke file saat save()."""
+        for key in keys:
+            if key not in self.keys:
+                self.keys.add(key)
+                self._pending.append(key)
+
+    def save(self):
+        """
+        Menambahkan kunci yang belum tersimpan ke file seen-set. Setelah reset(), file diganti secara atomik
+        dengan seluruh isi set.
+        """
+        if not self.path:
+            self._pending = []
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        if self._replace_file:
+            with open(f"{self.path}.tmp", 'w', encoding='utf-8') as f:
+                f.writelines(f"{key}\n" for key in self.keys)
+            os.replace(f"{self.path}.tmp", self.path)
+            self._replace_file = False
+        elif self._pending:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(self._pending) + '\n')
+        self._pending = []
+
+    def reset(self):
+        """
+        Mengosongkan set (dipakai saat build ulang penuh). File seen-set lama tidak disentuh sampai save()
+        dipanggil, sehingga build ulang yang gagal tidak menghilangkan status dedup.
+        """
+        self.keys.clear()
+        self._pending = []
+        self._replace_file = True
+
+def iter_jsonl_articles(jsonl_path):
+    """Membaca artikel dari JSONL satu per satu; baris rusak dilewati."""
+    with open(jsonl_path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            try:
+                article = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(article, dict):
+                yield article
+
+def build_seen_set_from_jsonl(jsonl_path, seen_path):
+    """Membangun seen-set dari file JSONL yang sudah ada (mis. saat dedup pertama kali diaktifkan)."""
+    seen = SeenArticleSet(seen_path)
+    seen.reset()
+    for article in iter_jsonl_articles(jsonl_path):
+        seen.add(article_keys(article))
+    seen.save()
+    print(f"Seen-set dibangun dari {jsonl_path}: {len(seen)} kunci disimpan di {seen_path}")
+    return seen
+
+def load_seen_articles(seen_path=SEEN_ARTICLES_FILENAME, jsonl_path=None):
+    """Memuat seen-set scraper; jika belum ada tetapi file JSONL sudah ada, seen-set dibangun dari file tersebut."""
+    if not os.path.exists(seen_path) and jsonl_path and os.path.exists(jsonl_path):
+        return build_seen_set_from_jsonl(jsonl_path, seen_path)
+    return SeenArticleSet(seen_path)
+
+def dedup_jsonl_file(input_path, output_path=None):
+    """
+    Menulis ulang file JSONL tanpa duplikat (urutan dipertahankan, kemunculan pertama yang disimpan).
+    Baris disalin byte demi byte; baris yang bukan UTF-8/JSON objek valid tidak dibuang melainkan disalin
+    apa adanya dan dihitung sebagai baris rusak. Tanpa output_path, file input diganti secara atomik.
+    Mengembalikan (jumlah_unik, jumlah_duplikat, jumlah_baris_rusak).
+    """
+    output_path = output_path or input_path
+    seen = SeenArticleSet()
+    kept, duplicates, malformed = 0, 0, 0
+    with open(input_path, 'rb') as source, open(f"{output_path}.tmp", 'wb') as out:
+        for line in source:
+            if not line.strip():
+                out.write(line)
+                continue
+            try:
+                article = json.loads(line.decode('utf-8'))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                article = None
+            if not isinstance(article, dict):
+                malformed += 1
+                out.write(line)
+                continue
+            new_articles, new_keys, duplicate_count = seen.filter_new([article])
+            duplicates += duplicate_count
+            if new_articles:
+                seen.add(new_keys)
+                out.write(line)
+                kept += 1
+    os.replace(f"{output_path}.tmp", output_path)
+    print(f"Dedup {input_path}: {kept} artikel unik, {duplicates} duplikat dibuang -> {output_path}")
+    if malformed:
+        print(f"Peringatan: {malformed} baris rusak (bukan UTF-8/JSON objek valid) disalin tanpa diubah.")
+    return kept, duplicates, malformed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deduplikasi artikel arXiv (DOI / hash judul ternormalisasi).")
+    parser.add_argument("command", choices=["file", "rebuild-seen"],
+                        help="file: buang duplikat dari file JSONL; rebuild-seen: bangun seen-set scraper dari JSONL.")
+    parser.add_argument("input", help="Path file JSONL.")
+    parser.add_argument("--output", default=None, help="Path hasil (default: menimpa input).")
+    parser.add_argument("--seen-file", default=SEEN_ARTICLES_FILENAME)
+    args = parser.parse_args()
+
+    if args.command == "file":
+        dedup_jsonl_file(args.input, args.output)
+    else:
+        build_seen_set_from_jsonl(args.input, args.seen_file)
@@ -0,0 +1,193 @@
+"""
+Cache embedding dokumen yang persisten untuk pelatihan model.
+
+Embedding disimpan per nama model sentence-transformers di data/embedding_cache/<model>/ sebagai segmen
+append-only: seg_<id>.npy (float32, dibuka sebagai memory-map) dan seg_<id>.keys.npy (hash BLAKE2b 16 byte
+dari teks, sejajar per baris). Setiap run hanya meng-encode teks yang belum ada di cache; sisanya dibaca
+dari segmen. Segmen baru ditulis atomik dan dianggap ada setelah file kuncinya muncul, sehingga dua proses
+pelatihan bisa menambah segmen tanpa saling menimpa.
+
+Jika jumlah segmen melebihi EMBEDDING_STORE_MAX_SEGMENTS (saat store dibuka atau setelah segmen baru
+ditulis), segmen terkecil digabung menjadi satu segmen sehingga jumlah file terbuka dan fan-out lookup tetap
+kecil. Segmen besar jarang ikut digabung, jadi biaya penggabungan per embedding tetap kecil (amortized).
+"""
+import glob
+import hashlib
+import os
+import re
+import time
+from collections import defaultdict
+
+import numpy as np
+
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", "data/embedding_cache")
+KEYS_SUFFIX = ".keys.npy"
+EMBEDDING_STORE_MAX_SEGMENTS = int(os.getenv("EMBEDDING_STORE_MAX_SEGMENTS", "16"))
+
+def hash_text(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+def model_dir_name(model_name):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+
+def _save_npy_atomic(path, array):
+    with open(f"{path}.tmp", 'wb') as f:
+        np.save(f, array)
+    os.replace(f"{path}.tmp", path)
+
+class EmbeddingStore:
+    """Cache embedding untuk satu model; get_embeddings() mengembalikan embedding sesuai urutan teks input."""
+
+    def __init__(self, model_name, store_dir=EMBEDDING_STORE_DIR, max_segments=EMBEDDING_STORE_MAX_SEGMENTS):
+        self.model_name = model_name
+        self.path = os.path.join(store_dir, model_dir_name(model_name))
+        self.max_segments = max(max_segments, 2)
+        self.segments = []
+        self.segment_bases = []  # path segmen tanpa ekstensi, sejajar dengan self.segments
+        self.index = {}  # hash teks -> (nomor segmen, baris)
+        self.dim = None
+        self.last_stats = None
+        # Akumulasi seluruh panggilan get_embeddings (mis. per chunk) untuk dicatat ke MLflow
+        self.total_stats = {"texts": 0, "hits": 0, "misses": 0, "encoded": 0, "encode_seconds": 0.0}
+        self._load_segments()
+        self.compact()
+
+    def __len__(self):
+        return len(self.index)
+
+    def _load_segments(self):
+        for keys_path in sorted(glob.glob(os.path.join(self.path, f"*{KEYS_SUFFIX}"))):
+            embeddings_path = keys_path[:-len(KEYS_SUFFIX)] + ".npy"
+            if not os.path.exists(embeddings_path):
+                continue
+            try:
+                keys = np.load(keys_path)
+                embeddings = np.load(embeddings_path, mmap_mode='r')
+            except (OSError, ValueError):
+                continue  # segmen baru saja dihapus oleh compact() di proses lain
+            if embeddings.ndim != 2 or len(keys) != embeddings.shape[0]:
+                print(f"Peringatan: Segmen cache embedding {embeddings_path} tidak konsisten. Diabaikan.")
+                continue
+            if self.dim is None:
+                self.dim = embeddings.shape[1]
+            elif embeddings.shape[1] != self.dim:
+                print(f"Peringatan: Dimensi segmen {embeddings_path} ({embeddings.shape[1]}) berbeda dari {self.dim}. Diabaikan.")
+                continue
+            self._register_segment(keys_path[:-len(KEYS_SUFFIX)], keys, embeddings)
+        if self.index:
+            print(f"Cache embedding '{self.model_name}': {len(self.index)} teks dalam {len(self.segments)} segmen.")
+
+    def _register_segment(self, segment_base, keys, embeddings):
+        segment_number = len(self.segments)
+        self.segments.append(embeddings)
+        self.segment_bases.append(segment_base)
+        for row, key in enumerate(keys.tolist()):
+            self.index.setdefault(key, (segment_number, row))
+
+    def _new_segment_base(self):
+        os.makedirs(self.path, exist_ok=True)
+        return os.path.join(self.path, f"seg_{time.time_ns()}_{os.getpid()}")
+
+    def _add_segment(self, keys, embeddings):
+        segment_base = self._new_segment_base()
+        _save_npy_atomic(f"{segment_base}.npy", embeddings)
+        # File kunci ditulis terakhir: segmen baru terlihat oleh proses lain hanya jika embedding-nya lengkap
+        _save_npy_atomic(f"{segment_base}{KEYS_SUFFIX}", np.array(keys, dtype='S16'))
+        if self.dim is None:
+            self.dim = embeddings.shape[1]
+        self._register_segment(segment_base, np.array(keys, dtype='S16'), np.load(f"{segment_base}.npy", mmap_mode='r'))
+        self.compact()
+
+    def compact(self):
+        """
+        Jika segmen lebih dari max_segments, segmen-segmen terkecil digabung menjadi satu segmen baru
+        (sisa max_segments // 2 segmen). Segmen gabungan ditulis lewat memory-map dan file kuncinya terakhir;
+        segmen lama baru dihapus setelahnya.
+        """
+        if len(self.segments) <= self.max_segments:
+            return
+        by_size = sorted(range(len(self.segments)), key=lambda number: self.segments[number].shape[0])
+        merged_numbers = set(by_size[:len(self.segments) - self.max_segments // 2 + 1])
+        merged_entries = sorted((segment_number, row, key) for key, (segment_number, row) in self.index.items()
+                                if segment_number in merged_numbers)
+        print(f"Menggabungkan {len(merged_numbers)} segmen cache embedding ({len(merged_entries)} teks)...")
+
+        segment_base = self._new_segment_base()
+        merged = np.lib.format.open_memmap(f"{segment_base}.npy.tmp", mode='w+', dtype=np.float32,
+                                           shape=(len(merged_entries), self.dim))
+        rows_by_segment = defaultdict(list)
+        for merged_row, (segment_number, row, _) in enumerate(merged_entries):
+            rows_by_segment[segment_number].append((merged_row, row))
+        for segment_number, pairs in rows_by_segment.items():
+            merged_rows, rows = np.asarray(pairs).T
+            merged[merged_rows] = self.segments[segment_number][rows]
+        merged.flush()
+        del merged
+        os.replace(f"{segment_base}.npy.tmp", f"{segment_base}.npy")
+        merged_keys = np.array([key for _, _, key in merged_entries], dtype='S16')
+        _save_npy_atomic(f"{segment_base}{KEYS_SUFFIX}", merged_keys)
+
+        for number in merged_numbers:
+            # Kunci dihapus lebih dulu agar proses lain tidak memuat segmen yang embedding-nya sudah hilang
+            for path in (f"{self.segment_bases[number]}{KEYS_SUFFIX}", f"{self.segment_bases[number]}.npy"):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass  # sudah digabung oleh proses lain
+
+        kept = [number for number in range(len(self.segments)) if number not in merged_numbers]
+        renumber = {old: new for new, old in enumerate(kept)}
+        self.segments = [self.segments[number] for number in kept]
+        self.segment_bases = [self.segment_bases[number] for number in kept]
+        self.index = {key: (renumber[segment_number], row) for key, (segment_number, row) in self.index.items()
+                      if segment_number in renumber}
+        self._register_segment(segment_base, merged_keys, np.load(f"{segment_base}.npy", mmap_mode='r'))
+
+    def get_embeddings(self, texts, encode_fn, **encode_kwargs):
+        """
+        Embedding float32 untuk setiap teks (urutan sama dengan input). Hanya teks baru/berubah yang di-encode
+        dengan encode_fn(list_teks, **encode_kwargs); statistik hit/miss disimpan di self.last_stats.
+        """
+        started = time.perf_counter()
+        keys = [hash_text(str(text)) for text in texts]
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self.index and key not in missing:
+                missing[key] = str(text)
+        hits = sum(1 for key in keys if key not in missing)
+
+        encode_seconds = 0.0
+        if missing:
+            print(f"Meng-encode {len(missing)} teks baru (cache: {hits}/{len(keys)} hit)...")
+            encode_started = time.perf_counter()
+            new_embeddings = np.asarray(encode_fn(list(missing.values()), **encode_kwargs), dtype=np.float32)
+            encode_seconds = time.perf_counter() - encode_started
+            if self.dim is not None and new_embeddings.shape[1] != self.dim:
+                raise ValueError(f"Dimensi embedding baru ({new_embeddings.shape[1]}) berbeda dari cache ({self.dim}).")
+            self._add_segment(list(missing.keys()), new_embeddings)
+
+        result = np.empty((len(keys), self.dim or 0), dtype=np.float32)
+        positions_by_segment = defaultdict(lambda: ([], []))
+        for position, key in enumerate(keys):
+            segment_number, row = self.index[key]
+            positions_by_segment[segment_number][0].append(position)
+            positions_by_segment[segment_number][1].append(row)
+        for segment_number, (positions, rows) in positions_by_segment.items():
+            positions, rows = np.asarray(positions), np.asarray(rows)
+            order = np.argsort(rows, kind='stable')  # baca memmap berurutan
+            result[positions[order]] = self.segments[segment_number][rows[order]]
+
+        self.last_stats = {
+            "texts": len(keys),
+            "hits": hits,
+            "misses": len(keys) - hits,
+            "encoded": len(missing),
+            "hit_ratio": hits / len(keys) if keys else 0.0,
+            "encode_seconds": encode_seconds,
+            "total_seconds": time.perf_counter() - started,
+        }
+        for name in self.total_stats:
+            self.total_stats[name] += self.last_stats[name]
+        print(f"Embedding siap: {hits} dari cache, {len(missing)} di-encode "
+              f"(hit ratio {self.last_stats['hit_ratio']:.1%}, {self.last_stats['total_seconds']:.1f} detik).")
+        return result
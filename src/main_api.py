@@ -1,110 +1,616 @@
 import os
-import re
 import pickle
 import time
-import pandas as pd
+import hashlib
+import hmac
+import asyncio
+import json
 import numpy as np
-from sentence_transformers import util, SentenceTransformer
-from fastapi import FastAPI, UploadFile, File, HTTPException, Query
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 from typing import List, Optional, Dict, Any
-import fitz  # PyMuPDF
+# pandas, sentence_transformers (torch), PyMuPDF dan NLTK sengaja diimpor secara lazy di dalam fungsi
+# agar proses bisa bind ke port dalam hitungan detik; artefak dimuat di background (lihat startup_event).
+from prometheus_fastapi_instrumentator import Instrumentator
 
 # Impor fungsi dari modul lain dalam paket 'src'
-from .preprocess import preprocess_text_pipeline
+from .metrics import (TRANSFORM_QUEUE_DEPTH, TRANSFORM_BATCH_SIZE, TRANSFORM_QUEUE_WAIT_SECONDS,
+                      STAGE_LATENCY_SECONDS, INPUT_PDF_PAGES, INPUT_CHARACTERS, MODEL_LOAD_SECONDS,
+                      MODEL_RUN_ID, ARTICLES_LOADED, stage_timer, timed_call)
+from .worker_pools import BoundedPool, PoolSaturatedError
+from .prediction_cache import PredictionCache
+from .article_search import ArticleEmbeddingIndex, get_doc_embeddings_path, get_faiss_index_path
+from .artifacts import RUN_ID_FILE_PATTERN, find_artifact
+from .article_store import get_article_store_path, open_article_store
+from .topic_updates import assign_update_topics, has_update_topics
+from . import workers
 
 # --- Konfigurasi Path ---
 BASE_DATA_PATH = "data"
 STATIC_FILES_DIR = "static" 
 
+SENTENCE_MODEL_NAME = 'paraphrase-MiniLM-L6-v2'
+
+# --- Konfigurasi Micro-batching Inferensi ---
+# Permintaan yang tiba dalam jendela TRANSFORM_MAX_WAIT_MS digabung menjadi satu pemanggilan transform
+TRANSFORM_MAX_BATCH_SIZE = int(os.getenv("TRANSFORM_MAX_BATCH_SIZE", "32"))
+TRANSFORM_MAX_WAIT_MS = float(os.getenv("TRANSFORM_MAX_WAIT_MS", "10"))
+TRANSFORM_MAX_QUEUE_SIZE = int(os.getenv("TRANSFORM_MAX_QUEUE_SIZE", "256"))
+
+# --- Konfigurasi Pool Eksekutor ---
+# Thread pool untuk pemanggilan model (torch/numpy melepas GIL), process pool untuk PDF dan pra-pemrosesan
+MODEL_POOL_WORKERS = int(os.getenv("MODEL_POOL_WORKERS", "2"))
+MODEL_POOL_MAX_PENDING = int(os.getenv("MODEL_POOL_MAX_PENDING", "16"))
+CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+CPU_POOL_MAX_PENDING = int(os.getenv("CPU_POOL_MAX_PENDING", "32"))
+
+# --- Konfigurasi Cache Prediksi ---
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "10000"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "86400"))
+PREDICTION_CACHE_SPILL_DIR = os.getenv("PREDICTION_CACHE_SPILL_DIR", "")  # kosong = tanpa spill ke disk
+
+# --- Konfigurasi Analisis Batch (/api/analyze/batch) ---
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "50000"))
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "256"))
+BATCH_MAX_BODY_BYTES = int(os.getenv("BATCH_MAX_BODY_BYTES", str(64 * 1024 * 1024)))  # batas memori body request
+
+# --- Konfigurasi Pencarian Artikel Semantik ---
+# "auto" = indeks HNSW doc_embeddings_<id>.faiss mulai ARTICLE_SEARCH_FAISS_MIN_ROWS artikel; "1"/"0" memaksa
+ARTICLE_SEARCH_USE_FAISS = os.getenv("ARTICLE_SEARCH_USE_FAISS", "auto").lower()
+ARTICLE_SEARCH_MAX_LIMIT = int(os.getenv("ARTICLE_SEARCH_MAX_LIMIT", "100"))
+
+# --- Konfigurasi Hot Reload Model ---
+MODEL_RELOAD_INTERVAL_SECONDS = float(os.getenv("MODEL_RELOAD_INTERVAL_SECONDS", "60"))  # 0 = watcher nonaktif
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")  # endpoint admin hanya aktif jika diisi (header X-Admin-Token)
+
 # --- Variabel Global untuk Model dan Data ---
-TOPIC_MODEL = None
-TOPIC_RESULTS_DF = None
 SENTENCE_MODEL = None
-
-# --- Stopwords ---
-try:
-    from nltk.corpus import stopwords
-    ENGLISH_STOPWORDS = set(stopwords.words('english'))
-except ImportError:
-    print("NLTK stopwords tidak ditemukan. Pastikan NLTK terinstal dan resource diunduh.")
-    ENGLISH_STOPWORDS = set()
+# Versi model aktif (ModelState). Diganti utuh secara atomik saat run baru dimuat;
+# request yang sedang berjalan tetap memakai versi yang dipegangnya sampai selesai.
+MODEL_STATE = None
+MODEL_RELOAD_LOCK = None
+MODEL_WATCHER_TASK = None
+STARTUP_LOADER_TASK = None
+
+# --- Status Pemuatan Artefak (untuk /readyz) ---
+REQUIRED_ARTIFACTS = ("sentence_model", "topic_model", "topic_results", "article_index", "topic_embeddings")
+# Artefak opsional dilaporkan statusnya tetapi tidak menentukan kesiapan
+OPTIONAL_ARTIFACTS = ("doc_embeddings",)
+ARTIFACT_STATUS = {name: {"status": "pending", "seconds": None} for name in REQUIRED_ARTIFACTS + OPTIONAL_ARTIFACTS}
+STARTUP_TIMINGS = {"started_at": time.time(), "ready_after_seconds": None}
+
+# Stopwords NLTK dimuat oleh masing-masing proses worker (lihat workers.init_worker)
+MODEL_POOL = BoundedPool("model", "thread", MODEL_POOL_WORKERS, MODEL_POOL_MAX_PENDING)
+CPU_POOL = BoundedPool("cpu", "process", CPU_POOL_WORKERS, CPU_POOL_MAX_PENDING,
+                       initializer=workers.init_worker)
+
+PREDICTION_CACHE = PredictionCache(PREDICTION_CACHE_MAX_ENTRIES, PREDICTION_CACHE_TTL_SECONDS,
+                                   spill_dir=PREDICTION_CACHE_SPILL_DIR)
+
+async def run_in_pool(pool, fn, *args, **kwargs):
+    """Menjalankan fn di pool; pool yang penuh diterjemahkan menjadi HTTP 503 dengan Retry-After."""
+    try:
+        return await pool.run(fn, *args, **kwargs)
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
 
 # --- Fungsi Baru untuk Menemukan Model dan Hasil Terbaru ---
-def find_latest_model_paths():
-    """
-    Menemukan path untuk model .pkl dan hasil .csv terbaru berdasarkan ID numerik tertinggi.
-    Mengembalikan tuple (model_path, results_path).
-    """
-    model_dir = os.path.join(BASE_DATA_PATH, "final", "bertopic_model")
+def find_latest_run_id(verbose=True):
+    """Mengembalikan ID run numerik tertinggi di direktori hasil topik, atau None jika tidak ada."""
     results_dir = os.path.join(BASE_DATA_PATH, "final", "topic_results")
-    
-    latest_id = -1
-    
+
     # Pastikan direktori ada sebelum memindai
     if not os.path.isdir(results_dir):
-        print(f"Peringatan: Direktori hasil topik '{results_dir}' tidak ditemukan.")
-        return None, None
+        if verbose:
+            print(f"Peringatan: Direktori hasil topik '{results_dir}' tidak ditemukan.")
+        return None
 
+    latest_id = -1
     # Cari ID tertinggi dari file hasil (bisa juga dari file model)
     for filename in os.listdir(results_dir):
-        match = re.search(r'_(\d+)\.csv$', filename)
+        match = RUN_ID_FILE_PATTERN.search(filename)
         if match:
             current_id = int(match.group(1))
             if current_id > latest_id:
                 latest_id = current_id
 
     if latest_id == -1:
-        print("Tidak ditemukan file model atau hasil topik yang valid dengan ID berurutan.")
+        if verbose:
+            print("Tidak ditemukan file model atau hasil topik yang valid dengan ID berurutan.")
+        return None
+    return latest_id
+
+def find_latest_model_paths():
+    """
+    Menemukan path untuk model .pkl dan hasil .csv terbaru berdasarkan ID numerik tertinggi.
+    Mengembalikan tuple (model_path, results_path).
+    """
+    latest_id = find_latest_run_id()
+    if latest_id is None:
         return None, None
-        
-    # Buat path lengkap berdasarkan ID tertinggi yang ditemukan
-    latest_model_path = os.path.join(model_dir, f"bertopic_model_{latest_id}.pkl")
-    latest_results_path = os.path.join(results_dir, f"topic_results_{latest_id}.csv")
-    
+
     print(f"Menemukan file terbaru dengan ID: {latest_id}")
-    return latest_model_path, latest_results_path
+    return get_run_paths(latest_id)
 
-# --- Fungsi Pemuatan Model yang Diperbarui ---
-def load_model_and_data():
-    """Memuat model BERTopic dan data hasil topik versi terbaru."""
-    global TOPIC_MODEL, TOPIC_RESULTS_DF, SENTENCE_MODEL
+def get_run_paths(run_id):
+    """Membuat path lengkap model .pkl dan hasil (.parquet, atau .csv untuk run lama) untuk ID run tertentu."""
+    model_path = os.path.join(BASE_DATA_PATH, "final", "bertopic_model", f"bertopic_model_{run_id}.pkl")
+    results_base = os.path.join(BASE_DATA_PATH, "final", "topic_results", f"topic_results_{run_id}")
+    results_path = find_artifact(results_base) or f"{results_base}.csv"
+    return model_path, results_path
 
-    model_path, results_path = find_latest_model_paths()
+def get_topic_embeddings_path(run_id):
+    """Path cache embedding topik, disimpan di samping bertopic_model_<id>.pkl."""
+    return os.path.join(BASE_DATA_PATH, "final", "bertopic_model", f"topic_embeddings_{run_id}.npz")
 
+# --- Matriks Embedding Topik (dihitung sekali per model) ---
+def build_topic_embeddings(topic_model, sentence_model, run_id=None):
+    """
+    Menghitung embedding representasi kata kunci setiap topik (kecuali -1) sekali saja.
+    Hasil dinormalisasi L2 sehingga cosine similarity cukup dihitung dengan perkalian matriks-vektor.
+    Jika run_id diberikan, matriks disimpan/dibaca dari file .npz agar restart tidak perlu encode ulang.
+    Mengembalikan tuple (topic_ids, embeddings).
+    """
+    topic_ids = sorted(tid for tid in topic_model.get_topics() if tid != -1)
+    representations = [" ".join(word for word, _ in topic_model.get_topic(tid)) for tid in topic_ids]
+    # Sidik jari representasi untuk memastikan cache cocok dengan model yang dimuat
+    fingerprint = hashlib.sha1("\n".join(representations).encode('utf-8')).hexdigest()
+    cache_path = get_topic_embeddings_path(run_id) if run_id is not None else None
+
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with np.load(cache_path) as cached:
+                if (str(cached['fingerprint']) == fingerprint
+                        and str(cached['model_name']) == SENTENCE_MODEL_NAME
+                        and cached['topic_ids'].tolist() == topic_ids):
+                    print(f"Embedding topik dimuat dari cache: {cache_path}")
+                    return cached['topic_ids'].astype(np.int64), cached['embeddings'].astype(np.float32)
+            print(f"Cache embedding topik {cache_path} tidak cocok dengan model. Menghitung ulang...")
+        except Exception as e:
+            print(f"Error membaca cache embedding topik {cache_path}: {e}")
+
+    if not topic_ids:
+        return np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32)
+
+    embeddings = sentence_model.encode(representations, convert_to_numpy=True, normalize_embeddings=True)
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    topic_ids_arr = np.asarray(topic_ids, dtype=np.int64)
+    print(f"Embedding untuk {len(topic_ids)} topik berhasil dihitung.")
+
+    if cache_path:
+        try:
+            np.savez(cache_path, topic_ids=topic_ids_arr, embeddings=embeddings,
+                     fingerprint=np.array(fingerprint), model_name=np.array(SENTENCE_MODEL_NAME))
+            print(f"Embedding topik disimpan di: {cache_path}")
+        except Exception as e:
+            # Direktori data bisa saja read-only di container; cukup lanjut tanpa cache
+            print(f"Peringatan: Gagal menyimpan cache embedding topik ke {cache_path}: {e}")
+
+    return topic_ids_arr, embeddings
+
+# --- Indeks Artikel per Topik ---
+def compute_topic_representation(topic_model, topic_id):
+    """Menggabungkan 5 kata kunci teratas sebuah topik menjadi string."""
+    if topic_model is None: return "Model tidak tersedia"
+    try:
+        topic_words_scores = topic_model.get_topic(topic_id)
+        if topic_words_scores:
+            return ", ".join([word for word, score in topic_words_scores[:5]])
+        return f"Topik {topic_id} (tidak ada kata kunci)"
+    except Exception as e:
+        return f"Topik {topic_id} (error)"
+
+def build_article_index(topic_model, articles):
+    """
+    Me-resolve kata kunci setiap topik (topik model dan topik yang muncul di store artikel) sekali saja.
+    Record artikel dan indeks topik -> baris sudah tersedia di ArticleStore. Mengembalikan dict topic_keywords.
+    """
+    topic_keywords = {}
+    if topic_model is not None:
+        for tid in topic_model.get_topics():
+            topic_keywords[tid] = compute_topic_representation(topic_model, tid)
+
+    if articles is None:
+        return topic_keywords
+
+    for tid in articles.topic_ids:
+        if tid not in topic_keywords:
+            topic_keywords[tid] = compute_topic_representation(topic_model, tid)
+    print(f"Indeks artikel siap: {len(articles)} artikel dalam {len(articles.topic_ids)} topik.")
+    return topic_keywords
+
+# --- Versi Model yang Dapat Ditukar ---
+class ModelState:
+    """Satu versi model BERTopic beserta hasil topik dan indeks turunannya. Tidak diubah setelah dibuat."""
+    def __init__(self, run_id=None, topic_model=None, articles=None, topic_ids=None, topic_embeddings=None,
+                 topic_keywords=None, article_embeddings=None):
+        self.run_id = run_id
+        self.topic_model = topic_model
+        # ArticleStore (memory-mapped): field artikel yang disajikan dan indeks topik -> baris
+        self.articles = articles
+        # Matriks embedding representasi topik (ter-normalisasi L2), urut sesuai topic_ids
+        self.topic_ids = topic_ids
+        self.topic_embeddings = topic_embeddings
+        self.topic_keywords = topic_keywords or {}
+        # ArticleEmbeddingIndex (memory-mapped) untuk pencarian artikel semantik, baris sejajar articles
+        self.article_embeddings = article_embeddings
+
+    def get_topic_representation(self, topic_id):
+        if self.topic_model is None: return "Model tidak tersedia"
+        if topic_id in self.topic_keywords:
+            return self.topic_keywords[topic_id]
+        return compute_topic_representation(self.topic_model, topic_id)
+
+    def get_article(self, offset):
+        fields = self.articles.get(int(offset))
+        topic = fields.pop("topic")
+        keywords = self.get_topic_representation(topic) if topic is not None else "N/A"
+        return ArticleResponse(**fields, topic_keywords=keywords)
+
+    def find_related_articles(self, topic_id, current_article_title=None, limit=5):
+        related = []
+        offsets = self.articles.offsets_for_topic(topic_id) if self.articles is not None else None
+        if offsets is None: return related
+
+        skip_title = current_article_title.strip().lower() if current_article_title else None
+        for offset in offsets[:limit].tolist():
+            if skip_title and self.articles.title(offset).strip().lower() == skip_title: continue
+            related.append(self.get_article(offset))
+        return related
+
+    def rank_topics_by_similarity(self, query_embedding, top_k=1):
+        """Mengembalikan list (topic_id, skor) top-k berdasarkan cosine similarity terhadap embedding topik."""
+        if self.topic_embeddings is None or len(self.topic_ids) == 0:
+            return []
+        scores = self.topic_embeddings @ np.asarray(query_embedding, dtype=np.float32)
+        k = min(top_k, len(scores))
+        if k < len(scores):
+            top_indices = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top_indices = np.arange(len(scores))
+        top_indices = top_indices[np.argsort(-scores[top_indices])]
+        return [(int(self.topic_ids[i]), float(scores[i])) for i in top_indices]
+
+# --- Fungsi Pemuatan Model yang Diperbarui ---
+def timed_phase(name, fn, *args):
+    """Menjalankan satu fase pemuatan artefak sambil mencatat status dan durasinya di ARTIFACT_STATUS."""
+    ARTIFACT_STATUS[name] = {"status": "loading", "seconds": None}
+    started = time.perf_counter()
+    result = fn(*args)
+    elapsed = round(time.perf_counter() - started, 3)
+    ARTIFACT_STATUS[name] = {"status": "ready" if result is not None else "failed", "seconds": elapsed}
+    MODEL_LOAD_SECONDS.labels(name).set(elapsed)
+    print(f"Fase '{name}' selesai dalam {elapsed:.2f} detik ({ARTIFACT_STATUS[name]['status']}).")
+    return result
+
+def load_sentence_model():
+    try:
+        from sentence_transformers import SentenceTransformer
+        sentence_model = SentenceTransformer(SENTENCE_MODEL_NAME)
+        print("Model SentenceTransformer berhasil dimuat.")
+        return sentence_model
+    except Exception as e:
+        print(f"Error memuat SentenceTransformer: {e}")
+        return None
+
+def load_topic_model(run_id):
+    model_path = get_run_paths(run_id)[0] if run_id is not None else None
     if model_path and os.path.exists(model_path):
         try:
             with open(model_path, 'rb') as f:
-                TOPIC_MODEL = pickle.load(f)
+                topic_model = pickle.load(f)
             print(f"Model BERTopic terbaru berhasil dimuat dari: {model_path}")
+            return topic_model
         except Exception as e:
             print(f"Error memuat model BERTopic dari {model_path}: {e}")
-            TOPIC_MODEL = None
     else:
         print(f"Peringatan: File model terbaru tidak ditemukan di path yang diharapkan ({model_path}).")
-        TOPIC_MODEL = None
+    return None
 
+def load_topic_results(run_id):
+    """Membuka store artikel ringkas untuk hasil topik run ini (dibangun dari topic_results jika belum ada)."""
+    results_path = get_run_paths(run_id)[1] if run_id is not None else None
     if results_path and os.path.exists(results_path):
         try:
-            TOPIC_RESULTS_DF = pd.read_csv(results_path)
-            if 'Topic' in TOPIC_RESULTS_DF.columns:
-                TOPIC_RESULTS_DF['Topic'] = pd.to_numeric(TOPIC_RESULTS_DF['Topic'], errors='coerce')
+            store_path = get_article_store_path(os.path.dirname(results_path), run_id)
+            articles = open_article_store(results_path, store_path)
             print(f"Hasil topik terbaru berhasil dimuat dari: {results_path}")
+            return articles
         except Exception as e:
             print(f"Error memuat hasil topik dari {results_path}: {e}")
-            TOPIC_RESULTS_DF = None
     else:
         print(f"Peringatan: File hasil topik terbaru tidak ditemukan di path yang diharapkan ({results_path}).")
-        TOPIC_RESULTS_DF = None
+    return None
 
+def try_build_article_index(topic_model, articles):
     try:
-        SENTENCE_MODEL = SentenceTransformer('paraphrase-MiniLM-L6-v2')
-        print("Model SentenceTransformer berhasil dimuat.")
+        return build_article_index(topic_model, articles)
     except Exception as e:
-        print(f"Error memuat SentenceTransformer: {e}")
-        SENTENCE_MODEL = None
+        print(f"Error membangun indeks artikel: {e}")
+        return None
+
+def try_build_topic_embeddings(topic_model, sentence_model, run_id):
+    if topic_model is None or sentence_model is None:
+        return None
+    try:
+        return build_topic_embeddings(topic_model, sentence_model, run_id)
+    except Exception as e:
+        print(f"Error menghitung embedding topik: {e}")
+        return None
+
+def load_article_embeddings(run_id, expected_rows):
+    """Membuka doc_embeddings_<id>.npy sebagai memory-map; None jika tidak ada atau tidak sejajar dengan hasil topik."""
+    if run_id is None: return None
+    results_dir = os.path.join(BASE_DATA_PATH, "final", "topic_results")
+    embeddings_path = get_doc_embeddings_path(results_dir, run_id)
+    if not os.path.exists(embeddings_path):
+        print(f"Info: Embedding dokumen {embeddings_path} tidak ditemukan. Pencarian artikel semantik dinonaktifkan.")
+        return None
+    try:
+        index = ArticleEmbeddingIndex.load(embeddings_path, get_faiss_index_path(results_dir, run_id),
+                                           use_faiss="auto" if ARTICLE_SEARCH_USE_FAISS == "auto" else ARTICLE_SEARCH_USE_FAISS == "1")
+    except Exception as e:
+        print(f"Error memuat embedding dokumen dari {embeddings_path}: {e}")
+        return None
+    if len(index) != expected_rows:
+        print(f"Peringatan: Jumlah embedding dokumen ({len(index)}) tidak sama dengan jumlah artikel ({expected_rows}). Diabaikan.")
+        return None
+    return index
+
+def make_model_state(run_id, topic_model, articles, topic_keywords, topic_embeddings, article_embeddings=None):
+    topic_ids, embeddings = topic_embeddings or (None, None)
+    return ModelState(run_id, topic_model, articles, topic_ids, embeddings, topic_keywords, article_embeddings)
+
+def load_model_state(run_id, sentence_model):
+    """Memuat model BERTopic dan store artikel untuk satu ID run, lalu membangun indeks turunannya."""
+    topic_model = load_topic_model(run_id)
+    articles = load_topic_results(run_id)
+    topic_keywords = try_build_article_index(topic_model, articles)
+    topic_embeddings = try_build_topic_embeddings(topic_model, sentence_model, run_id)
+    article_embeddings = load_article_embeddings(run_id, len(articles) if articles is not None else 0)
+    return make_model_state(run_id, topic_model, articles, topic_keywords, topic_embeddings, article_embeddings)
+
+def activate_model_state(state):
+    """Menukar versi model aktif. Penugasan satu referensi global bersifat atomik bagi request lain."""
+    global MODEL_STATE
+    MODEL_STATE = state
+    # Status /readyz mengikuti versi yang aktif, termasuk run yang baru muncul lewat hot reload
+    for name, ready in (("sentence_model", SENTENCE_MODEL is not None),
+                        ("topic_model", state.topic_model is not None),
+                        ("topic_results", state.articles is not None),
+                        ("article_index", state.topic_model is not None and state.articles is not None),
+                        ("topic_embeddings", state.topic_embeddings is not None),
+                        ("doc_embeddings", state.article_embeddings is not None)):
+        ARTIFACT_STATUS[name] = {"status": "ready" if ready else "failed", "seconds": ARTIFACT_STATUS[name]["seconds"]}
+    # Cache prediksi tidak perlu dikosongkan: kuncinya memuat ID run, sehingga entri model lama tidak pernah
+    # cocok lagi dan hilang sendiri lewat LRU/TTL (termasuk spill di disk yang tetap valid setelah restart)
+    MODEL_RUN_ID.set(state.run_id if state.run_id is not None else -1)
+    ARTICLES_LOADED.set(len(state.articles) if state.articles is not None else 0)
+    print(f"Model aktif sekarang: run ID {state.run_id}")
+
+def load_model_and_data():
+    """Memuat model BERTopic dan data hasil topik versi terbaru."""
+    global SENTENCE_MODEL
+
+    run_id = find_latest_run_id()
+    if run_id is not None:
+        print(f"Menemukan file terbaru dengan ID: {run_id}")
+
+    # SentenceTransformer tidak bergantung pada run, jadi hanya dimuat sekali
+    if SENTENCE_MODEL is None:
+        SENTENCE_MODEL = load_sentence_model()
+
+    activate_model_state(load_model_state(run_id, SENTENCE_MODEL))
+
+def get_reload_lock():
+    """Lock yang menyerialkan semua pemuatan model (startup, watcher, endpoint admin)."""
+    global MODEL_RELOAD_LOCK
+    if MODEL_RELOAD_LOCK is None:
+        MODEL_RELOAD_LOCK = asyncio.Lock()
+    return MODEL_RELOAD_LOCK
+
+async def load_artifacts_in_background():
+    """
+    Memuat semua artefak setelah server sudah menerima koneksi. SentenceTransformer, model BERTopic
+    dan hasil topik dimuat bersamaan di thread terpisah; fase yang saling bergantung menunggu inputnya.
+    """
+    async with get_reload_lock():
+        await _load_artifacts_in_background()
+
+async def _load_artifacts_in_background():
+    global SENTENCE_MODEL
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+
+    run_id = await loop.run_in_executor(None, find_latest_run_id)
+    if run_id is not None:
+        print(f"Menemukan file terbaru dengan ID: {run_id}")
+
+    sentence_future = loop.run_in_executor(None, timed_phase, "sentence_model", load_sentence_model)
+    topic_model, articles = await asyncio.gather(
+        loop.run_in_executor(None, timed_phase, "topic_model", load_topic_model, run_id),
+        loop.run_in_executor(None, timed_phase, "topic_results", load_topic_results, run_id),
+    )
+    topic_keywords = await loop.run_in_executor(None, timed_phase, "article_index",
+                                                try_build_article_index, topic_model, articles)
+    article_embeddings = await loop.run_in_executor(None, timed_phase, "doc_embeddings", load_article_embeddings,
+                                                    run_id, len(articles) if articles is not None else 0)
+    SENTENCE_MODEL = await sentence_future
+    topic_embeddings = await loop.run_in_executor(None, timed_phase, "topic_embeddings",
+                                                  try_build_topic_embeddings, topic_model, SENTENCE_MODEL, run_id)
+
+    activate_model_state(make_model_state(run_id, topic_model, articles, topic_keywords, topic_embeddings,
+                                          article_embeddings))
+    STARTUP_TIMINGS["ready_after_seconds"] = round(time.perf_counter() - started, 3)
+    print(f"Semua artefak dimuat dalam {STARTUP_TIMINGS['ready_after_seconds']:.2f} detik.")
+
+def is_ready():
+    return MODEL_STATE is not None and all(ARTIFACT_STATUS[name]["status"] == "ready" for name in REQUIRED_ARTIFACTS)
+
+# --- Hot Reload Model ---
+async def reload_latest_model(force=False):
+    """
+    Memuat run dengan ID lebih tinggi dari model aktif (atau run terbaru jika force=True) di thread
+    terpisah, lalu menukarnya secara atomik. Mengembalikan tuple (run_id_aktif, berhasil_ditukar).
+    """
+    global SENTENCE_MODEL
+    async with get_reload_lock():
+        loop = asyncio.get_running_loop()
+        current_run_id = MODEL_STATE.run_id if MODEL_STATE is not None else None
+        latest_run_id = await loop.run_in_executor(None, find_latest_run_id, False)
+        if latest_run_id is None:
+            return current_run_id, False
+        if not force and current_run_id is not None and latest_run_id <= current_run_id:
+            return current_run_id, False
+
+        print(f"Memuat model baru dengan ID run {latest_run_id} di background...")
+        reload_started = time.perf_counter()
+        if SENTENCE_MODEL is None:
+            SENTENCE_MODEL = await loop.run_in_executor(None, load_sentence_model)
+        new_state = await loop.run_in_executor(None, load_model_state, latest_run_id, SENTENCE_MODEL)
+        MODEL_LOAD_SECONDS.labels("reload").set(time.perf_counter() - reload_started)
+        lost_topic_embeddings = (MODEL_STATE is not None and MODEL_STATE.topic_embeddings is not None
+                                 and new_state.topic_embeddings is None)
+        if new_state.topic_model is None or not new_state.articles or lost_topic_embeddings:
+            print(f"Peringatan: Run {latest_run_id} gagal dimuat lengkap. Tetap memakai run {current_run_id}.")
+            return current_run_id, False
+
+        activate_model_state(new_state)
+        return latest_run_id, True
+
+async def model_watcher():
+    """Memeriksa secara berkala apakah modelling.py sudah menghasilkan run baru."""
+    # Mulai memeriksa setelah pemuatan startup selesai (berhasil atau gagal), bukan bersamaan dengannya
+    if STARTUP_LOADER_TASK is not None:
+        await asyncio.wait({STARTUP_LOADER_TASK})
+    while True:
+        await asyncio.sleep(MODEL_RELOAD_INTERVAL_SECONDS)
+        try:
+            await reload_latest_model()
+        except Exception as e:
+            print(f"Error saat hot reload model: {e}")
+
+# --- Micro-batching untuk topic_model.transform ---
+def transform_texts(state, texts):
+    """Menjalankan topic_model.transform untuk sekumpulan teks terproses (dipanggil di thread pool model)."""
+    TRANSFORM_BATCH_SIZE.observe(len(texts))
+    with stage_timer("transform"):
+        if has_update_topics(state.topic_model) and SENTENCE_MODEL is not None:
+            # Topik dari `modelling.py update` ditetapkan lewat centroid embedding setelah transform
+            embeddings = SENTENCE_MODEL.encode(texts, convert_to_numpy=True)
+            topic_ids, _ = state.topic_model.transform(texts, embeddings)
+            topic_ids = assign_update_topics(state.topic_model, topic_ids, embeddings)
+        else:
+            topic_ids, _ = state.topic_model.transform(texts)
+    return [int(tid) for tid in topic_ids]
+
+class TransformBatcher:
+    """
+    Antrean asyncio yang mengumpulkan teks dari permintaan bersamaan, menjalankan satu
+    topic_model.transform untuk seluruh batch, lalu mengembalikan hasil ke masing-masing peminta.
+    """
+    def __init__(self, max_batch_size, max_wait_ms, max_queue_size):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_queue_size = max(1, max_queue_size)
+        self._queue = None
+        self._has_items = None
+        self._worker = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._has_items = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is None: return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        # Gagalkan permintaan yang masih menunggu agar tidak menggantung
+        while not self._queue.empty():
+            _, _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Antrean inferensi dihentikan."))
+        TRANSFORM_QUEUE_DEPTH.set(0)
+
+    async def submit(self, state, processed_text):
+        """Mendaftarkan satu teks ke antrean dan menunggu ID topik hasil prediksinya dengan model milik state."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None:
+            # Batcher belum berjalan (mis. dipanggil di luar siklus hidup aplikasi): jalankan langsung
+            return self._transform_batch(state, [processed_text])[0]
+
+        if self._queue.qsize() >= self.max_queue_size:
+            raise HTTPException(status_code=503, detail="Server sedang sibuk (antrean inferensi penuh). Silakan coba lagi.",
+                                headers={"Retry-After": "1"})
+
+        future = loop.create_future()
+        self._queue.put_nowait((state, processed_text, future, loop.time()))
+        self._has_items.set()
+        TRANSFORM_QUEUE_DEPTH.set(self._queue.qsize())
+        return await future
+
+    def _transform_batch(self, state, texts):
+        return transform_texts(state, texts)
+
+    async def _collect_batch(self):
+        loop = asyncio.get_running_loop()
+        while self._queue.empty():
+            self._has_items.clear()
+            await self._has_items.wait()
+
+        batch = [self._queue.get_nowait()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0: break
+            self._has_items.clear()
+            try:
+                await asyncio.wait_for(self._has_items.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        TRANSFORM_QUEUE_DEPTH.set(self._queue.qsize())
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            # Permintaan yang klien-nya sudah putus tidak perlu ikut dihitung
+            batch = [item for item in batch if not item[2].done()]
+            if not batch: continue
+
+            started = loop.time()
+            for _, _, _, enqueued_at in batch:
+                TRANSFORM_QUEUE_WAIT_SECONDS.observe(started - enqueued_at)
+
+            # Saat hot reload, antrean bisa berisi permintaan untuk model lama dan baru sekaligus
+            batches_per_state = {}
+            for item in batch:
+                batches_per_state.setdefault(item[0], []).append(item)
+
+            for state, items in batches_per_state.items():
+                texts = [text for _, text, _, _ in items]
+                try:
+                    topic_ids = await run_in_pool(MODEL_POOL, self._transform_batch, state, texts)
+                except Exception as e:
+                    for _, _, future, _ in items:
+                        if not future.done(): future.set_exception(e)
+                    continue
+
+                for (_, _, future, _), topic_id in zip(items, topic_ids):
+                    if not future.done(): future.set_result(topic_id)
+
+TRANSFORM_BATCHER = TransformBatcher(TRANSFORM_MAX_BATCH_SIZE, TRANSFORM_MAX_WAIT_MS, TRANSFORM_MAX_QUEUE_SIZE)
 
 # --- Pengaturan Aplikasi FastAPI ---
 app = FastAPI(title="AlbertopicAI API", version="1.0.0")
@@ -117,10 +623,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Histogram latensi per route + endpoint /metrics untuk di-scrape Prometheus (lihat prometheus.yml)
+Instrumentator(excluded_handlers=["/metrics", "/healthz", "/readyz"]).instrument(app).expose(app, include_in_schema=False)
+
 @app.on_event("startup")
 async def startup_event():
     print("Memulai aplikasi FastAPI...")
-    load_model_and_data()
+    MODEL_POOL.start()
+    CPU_POOL.start()
+    TRANSFORM_BATCHER.start()
+
+    # Jangan blokir startup: server langsung menerima koneksi, /readyz melaporkan kemajuan pemuatan
+    global STARTUP_LOADER_TASK, MODEL_WATCHER_TASK
+    STARTUP_LOADER_TASK = asyncio.create_task(load_artifacts_in_background())
+    if MODEL_RELOAD_INTERVAL_SECONDS > 0:
+        MODEL_WATCHER_TASK = asyncio.create_task(model_watcher())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in (STARTUP_LOADER_TASK, MODEL_WATCHER_TASK):
+        if task is not None:
+            task.cancel()
+    await TRANSFORM_BATCHER.stop()
+    MODEL_POOL.shutdown()
+    CPU_POOL.shutdown()
 
 # --- Pydantic Models (tidak berubah) ---
 class TextAnalysisRequest(BaseModel):
@@ -141,51 +667,133 @@ class AnalysisResponse(BaseModel):
 class TopicSearchResponse(BaseModel):
     articles: List[ArticleResponse] = []
 
-# --- Fungsi Helper (tidak berubah) ---
-def extract_text_from_pdf(file_content: bytes) -> str:
-    try:
-        doc = fitz.open(stream=file_content, filetype="pdf")
-        text = "".join(page.get_text() for page in doc)
-        doc.close()
-        return text
-    except Exception as e:
-        print(f"Error mengekstrak teks PDF: {e}")
-        raise HTTPException(status_code=500, detail=f"Gagal mengekstrak teks dari PDF: {e}")
-
-def get_topic_representation(topic_id: int) -> str:
-    if TOPIC_MODEL is None: return "Model tidak tersedia"
+class ScoredArticleResponse(ArticleResponse):
+    score: float
+
+class ArticleSearchResponse(BaseModel):
+    articles: List[ScoredArticleResponse] = []
+    offset: int = 0
+    limit: int = 10
+    total: int = 0
+
+class ModelReloadResponse(BaseModel):
+    previous_run_id: Optional[int] = None
+    run_id: Optional[int] = None
+    reloaded: bool = False
+
+# --- Fungsi Helper ---
+async def predict_topic_cached(state: ModelState, processed_text: str) -> int:
+    """Prediksi topik dengan cache berbasis hash teks terproses + ID run model."""
+    cache_key = PredictionCache.make_key("text", state.run_id, processed_text)
+    predicted_topic_id = await PREDICTION_CACHE.get_async(cache_key, kind="text")
+    if predicted_topic_id is None:
+        predicted_topic_id = await TRANSFORM_BATCHER.submit(state, processed_text)
+        PREDICTION_CACHE.put(cache_key, predicted_topic_id)
+    return predicted_topic_id
+
+# --- Analisis Batch ---
+async def read_body_limited(request: Request, max_bytes: int) -> bytes:
+    """Membaca body request secara streaming dan menolak (413) jika melebihi max_bytes."""
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Body request melebihi batas {max_bytes} byte.")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def parse_batch_items(body: bytes, content_type: str):
+    """
+    Mengubah body (array JSON atau NDJSON) menjadi list (indeks, TextAnalysisRequest atau pesan error).
+    Item yang tidak valid tidak menggagalkan seluruh batch; error-nya dikirim di baris hasil masing-masing.
+    """
+    if "ndjson" in content_type or "jsonl" in content_type:
+        try:
+            lines = body.decode('utf-8').splitlines()
+        except UnicodeDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Body bukan UTF-8 yang valid: {e}")
+        raw_items = []
+        for line in lines:
+            if not line.strip(): continue
+            try:
+                raw_items.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raw_items.append(e)
+    else:
+        try:
+            raw_items = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise HTTPException(status_code=400, detail=f"Body bukan JSON yang valid: {e}")
+        if not isinstance(raw_items, list):
+            raise HTTPException(status_code=400, detail="Body harus berupa array JSON atau NDJSON.")
+
+    if len(raw_items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Jumlah item ({len(raw_items)}) melebihi batas {BATCH_MAX_ITEMS}.")
+
+    items = []
+    for index, raw_item in enumerate(raw_items):
+        if isinstance(raw_item, Exception):
+            items.append((index, f"JSON tidak valid: {raw_item}"))
+            continue
+        try:
+            items.append((index, TextAnalysisRequest.parse_obj(raw_item)))
+        except ValidationError as e:
+            items.append((index, f"Item tidak valid: {e.errors()}"))
+    return items
+
+async def predict_topics_for_chunk(state, processed_texts):
+    """Prediksi topik untuk satu chunk: ambil dari cache jika ada, sisanya satu pemanggilan transform."""
+    cache_keys = [PredictionCache.make_key("text", state.run_id, text) for text in processed_texts]
+    topic_ids = await PREDICTION_CACHE.get_many_async(cache_keys, kind="batch")
+    missing = [i for i, topic_id in enumerate(topic_ids) if topic_id is None]
+    if missing:
+        new_topic_ids = await run_in_pool(MODEL_POOL, transform_texts, state, [processed_texts[i] for i in missing])
+        for i, topic_id in zip(missing, new_topic_ids):
+            topic_ids[i] = topic_id
+            PREDICTION_CACHE.put(cache_keys[i], topic_id)
+    return topic_ids
+
+async def stream_batch_results(state, items, include_related):
+    """Generator NDJSON: setiap chunk diproses (pra-pemrosesan + transform) lalu hasilnya langsung dikirim."""
+    chunks = [items[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(items), BATCH_CHUNK_SIZE)]
+
+    async def preprocess_chunk(chunk):
+        valid = [(index, item) for index, item in chunk if isinstance(item, TextAnalysisRequest)]
+        if not valid:
+            return valid, []
+        texts = [item.title + " " + item.abstract for _, item in valid]
+        processed_texts, preprocess_seconds = await run_in_pool(CPU_POOL, workers.preprocess_texts, texts)
+        STAGE_LATENCY_SECONDS.labels("preprocess").observe(preprocess_seconds)
+        return valid, processed_texts
+
+    # Pra-pemrosesan chunk berikutnya berjalan di process pool selagi chunk saat ini di-transform
+    next_preprocess = asyncio.ensure_future(preprocess_chunk(chunks[0])) if chunks else None
     try:
-        topic_words_scores = TOPIC_MODEL.get_topic(topic_id)
-        if topic_words_scores:
-            return ", ".join([word for word, score in topic_words_scores[:5]])
-        return f"Topik {topic_id} (tidak ada kata kunci)"
-    except Exception as e:
-        return f"Topik {topic_id} (error)"
-
-def find_related_articles_by_topic_id(topic_id: int, current_article_title: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
-    related = []
-    if TOPIC_RESULTS_DF is None or TOPIC_RESULTS_DF.empty: return related
-    
-    matched_articles_df = TOPIC_RESULTS_DF[TOPIC_RESULTS_DF['Topic'] == topic_id]
-    
-    for _, row in matched_articles_df.head(limit).iterrows():
-        if current_article_title and row.get('title', '').strip().lower() == current_article_title.strip().lower(): continue
-        
-        authors_list = []
-        authors_data = row.get('authors')
-        if isinstance(authors_data, str):
-            try: authors_list = eval(authors_data)
-            except: authors_list = [authors_data]
-        elif isinstance(authors_data, list): authors_list = authors_data
-
-        related.append({
-            "title": row.get('title', 'Tanpa Judul'),
-            "authors": authors_list,
-            "year": str(row.get('year', 'N/A')),
-            "topic_keywords": get_topic_representation(int(row.get('Topic'))) if pd.notna(row.get('Topic')) else "N/A",
-            "abstract_snippet": (str(row.get('abstract', ''))[:150] + '...') if pd.notna(row.get('abstract')) and str(row.get('abstract', '')) else "Abstrak tidak tersedia."
-        })
-    return related
+        for chunk_number, chunk in enumerate(chunks):
+            lines = {index: {"index": index, "error": item} for index, item in chunk if isinstance(item, str)}
+            try:
+                valid, processed_texts = await next_preprocess
+                next_preprocess = (asyncio.ensure_future(preprocess_chunk(chunks[chunk_number + 1]))
+                                   if chunk_number + 1 < len(chunks) else None)
+                topic_ids = await predict_topics_for_chunk(state, processed_texts) if valid else []
+                for (index, item), topic_id in zip(valid, topic_ids):
+                    result = {"index": index, "title": item.title, "predicted_topic_id": topic_id,
+                              "predicted_topic": state.get_topic_representation(topic_id)}
+                    if include_related:
+                        related = state.find_related_articles(topic_id, current_article_title=item.title)
+                        result["related_articles"] = [article.dict() for article in related]
+                    lines[index] = result
+            except Exception as e:
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                print(f"Error saat analisis batch chunk {chunk_number}: {detail}")
+                for index, _ in chunk:
+                    lines.setdefault(index, {"index": index, "error": detail})
+                if next_preprocess is None and chunk_number + 1 < len(chunks):
+                    next_preprocess = asyncio.ensure_future(preprocess_chunk(chunks[chunk_number + 1]))
+            yield "".join(json.dumps(lines[index]) + "\n" for index, _ in chunk)
+    finally:
+        if next_preprocess is not None and not next_preprocess.done():
+            next_preprocess.cancel()
 
 # --- API Endpoints ---
 @app.get("/", response_class=FileResponse, include_in_schema=False)
@@ -195,26 +803,59 @@ async def serve_index_html():
         raise HTTPException(status_code=404, detail="Halaman utama (index.html) tidak ditemukan.")
     return FileResponse(index_html_path)
     
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness: proses hidup dan event loop merespons, terlepas dari status model."""
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness: 200 hanya jika semua artefak sudah dimuat; selalu menyertakan status per artefak."""
+    ready = is_ready()
+    body = {
+        "ready": ready,
+        "run_id": MODEL_STATE.run_id if MODEL_STATE is not None else None,
+        "artifacts": ARTIFACT_STATUS,
+        "startup": STARTUP_TIMINGS,
+    }
+    return JSONResponse(status_code=200 if ready else 503, content=body)
+
 @app.post("/api/analyze/pdf", response_model=AnalysisResponse, tags=["Analysis"])
 async def analyze_pdf_endpoint(pdf_file: UploadFile = File(...)):
-    if TOPIC_MODEL is None: raise HTTPException(status_code=503, detail="Model BERTopic tidak tersedia.")
+    state = MODEL_STATE
+    if state is None or state.topic_model is None: raise HTTPException(status_code=503, detail="Model BERTopic tidak tersedia.")
     
     contents = await pdf_file.read()
     if not contents: raise HTTPException(status_code=400, detail="File PDF kosong.")
     
-    extracted_text = extract_text_from_pdf(contents)
-    if not extracted_text.strip(): raise HTTPException(status_code=400, detail="Tidak ada teks yang dapat diekstrak dari PDF.")
-    
-    processed_text = preprocess_text_pipeline(extracted_text, ENGLISH_STOPWORDS)
+    # PDF yang sama persis tidak perlu diekstrak ulang dengan PyMuPDF
+    pdf_cache_key = PredictionCache.make_key("pdf", state.run_id, contents)
+    predicted_topic_id = await PREDICTION_CACHE.get_async(pdf_cache_key, kind="pdf")
+
+    if predicted_topic_id is None:
+        try:
+            has_text, processed_text, pdf_stats = await run_in_pool(CPU_POOL, workers.extract_and_preprocess_pdf, contents)
+        except workers.PdfExtractionError as e:
+            raise HTTPException(status_code=500, detail=f"Gagal mengekstrak teks dari PDF: {e}")
+        INPUT_PDF_PAGES.observe(pdf_stats["pages"])
+        INPUT_CHARACTERS.labels("pdf").observe(pdf_stats["characters"])
+        STAGE_LATENCY_SECONDS.labels("pdf_extraction").observe(pdf_stats["extract_seconds"])
+        if has_text:
+            STAGE_LATENCY_SECONDS.labels("preprocess").observe(pdf_stats["preprocess_seconds"])
+        if not has_text: raise HTTPException(status_code=400, detail="Tidak ada teks yang dapat diekstrak dari PDF.")
     
     try:
-        topic_ids, probs = TOPIC_MODEL.transform([processed_text])
-        predicted_topic_id = topic_ids[0] if topic_ids else -1
-        predicted_topic_str = get_topic_representation(predicted_topic_id)
+        if predicted_topic_id is None:
+            predicted_topic_id = await predict_topic_cached(state, processed_text)
+            PREDICTION_CACHE.put(pdf_cache_key, predicted_topic_id)
+        predicted_topic_str = state.get_topic_representation(predicted_topic_id)
         
-        related = find_related_articles_by_topic_id(predicted_topic_id)
+        with stage_timer("related_articles"):
+            related = state.find_related_articles(predicted_topic_id)
         return AnalysisResponse(predicted_topic=predicted_topic_str, related_articles=related)
     
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         print(f"Error saat analisis PDF (traceback): {traceback.format_exc()}")
@@ -222,57 +863,128 @@ async def analyze_pdf_endpoint(pdf_file: UploadFile = File(...)):
 
 @app.post("/api/analyze/text", response_model=AnalysisResponse, tags=["Analysis"])
 async def analyze_text_endpoint(request: TextAnalysisRequest):
-    if TOPIC_MODEL is None: raise HTTPException(status_code=503, detail="Model BERTopic tidak tersedia.")
+    state = MODEL_STATE
+    if state is None or state.topic_model is None: raise HTTPException(status_code=503, detail="Model BERTopic tidak tersedia.")
     
     text_to_analyze = request.title + " " + request.abstract
-    processed_text = preprocess_text_pipeline(text_to_analyze, ENGLISH_STOPWORDS)
+    INPUT_CHARACTERS.labels("text").observe(len(text_to_analyze))
+    processed_text, preprocess_seconds = await run_in_pool(CPU_POOL, workers.preprocess_text, text_to_analyze)
+    STAGE_LATENCY_SECONDS.labels("preprocess").observe(preprocess_seconds)
 
     try:
-        topic_ids, _ = TOPIC_MODEL.transform([processed_text])
-        predicted_topic_id = topic_ids[0] if topic_ids else -1
-        predicted_topic_str = get_topic_representation(predicted_topic_id)
+        predicted_topic_id = await predict_topic_cached(state, processed_text)
+        predicted_topic_str = state.get_topic_representation(predicted_topic_id)
         
-        related = find_related_articles_by_topic_id(predicted_topic_id, current_article_title=request.title)
+        with stage_timer("related_articles"):
+            related = state.find_related_articles(predicted_topic_id, current_article_title=request.title)
         return AnalysisResponse(predicted_topic=predicted_topic_str, related_articles=related)
     
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         print(f"Error saat analisis teks (traceback): {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Terjadi kesalahan saat analisis teks: {e}")
 
+@app.post("/api/analyze/batch", tags=["Analysis"])
+async def analyze_batch_endpoint(request: Request, include_related: bool = Query(False)):
+    """
+    Menganalisis banyak artikel sekaligus. Body: array JSON TextAnalysisRequest, atau NDJSON
+    (Content-Type: application/x-ndjson). Hasil dikirim sebagai NDJSON per chunk yang selesai.
+    """
+    state = MODEL_STATE
+    if state is None or state.topic_model is None: raise HTTPException(status_code=503, detail="Model BERTopic tidak tersedia.")
+
+    body = await read_body_limited(request, BATCH_MAX_BODY_BYTES)
+    items = parse_batch_items(body, request.headers.get("content-type", ""))
+    del body
+    if not items: raise HTTPException(status_code=400, detail="Batch kosong.")
+    INPUT_CHARACTERS.labels("batch").observe(sum(len(item.title) + len(item.abstract)
+                                                 for _, item in items if isinstance(item, TextAnalysisRequest)))
+
+    return StreamingResponse(stream_batch_results(state, items, include_related), media_type="application/x-ndjson")
+
 @app.get("/api/search/topic", response_model=TopicSearchResponse, tags=["Search"])
 async def search_topic_endpoint(query: str = Query(..., min_length=3)):
-    if TOPIC_MODEL is None or SENTENCE_MODEL is None: raise HTTPException(status_code=503, detail="Model tidak tersedia.")
-    if TOPIC_RESULTS_DF is None or TOPIC_RESULTS_DF.empty: raise HTTPException(status_code=503, detail="Data artikel tidak tersedia.")
+    state = MODEL_STATE
+    if state is None or state.topic_model is None or SENTENCE_MODEL is None: raise HTTPException(status_code=503, detail="Model tidak tersedia.")
+    if not state.articles: raise HTTPException(status_code=503, detail="Data artikel tidak tersedia.")
+
+    if state.topic_embeddings is None: raise HTTPException(status_code=503, detail="Embedding topik tidak tersedia.")
 
     try:
-        query_embedding = SENTENCE_MODEL.encode(query)
-        
-        topic_ids = sorted([tid for tid in TOPIC_MODEL.get_topics() if tid != -1])
-        if not topic_ids: return TopicSearchResponse(articles=[])
+        if len(state.topic_ids) == 0: return TopicSearchResponse(articles=[])
 
-        topic_representations = [" ".join(word for word, _ in TOPIC_MODEL.get_topic(tid)) for tid in topic_ids]
-        topic_embeddings = SENTENCE_MODEL.encode(topic_representations)
-        
-        similarities = util.cos_sim(query_embedding, topic_embeddings)
-        top_topic_index = np.argmax(similarities[0])
-        highest_similarity_score = similarities[0][top_topic_index]
+        INPUT_CHARACTERS.labels("query").observe(len(query))
+        query_embedding = await run_in_pool(MODEL_POOL, timed_call, "query_encode", SENTENCE_MODEL.encode, query,
+                                            convert_to_numpy=True, normalize_embeddings=True)
+        with stage_timer("topic_ranking"):
+            target_topic_id, highest_similarity_score = state.rank_topics_by_similarity(query_embedding, top_k=1)[0]
 
         SIMILARITY_THRESHOLD = 0.2
         if highest_similarity_score > SIMILARITY_THRESHOLD:
-            target_topic_id = topic_ids[top_topic_index]
             print(f"Query '{query}' paling mirip dengan Topik ID: {target_topic_id} (Skor: {highest_similarity_score:.4f})")
-            articles = find_related_articles_by_topic_id(target_topic_id)
+            with stage_timer("related_articles"):
+                articles = state.find_related_articles(target_topic_id)
             return TopicSearchResponse(articles=articles)
         else:
             print(f"Tidak ada topik yang cukup mirip ditemukan untuk query: '{query}' (Skor tertinggi: {highest_similarity_score:.4f})")
             return TopicSearchResponse(articles=[])
 
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         print(f"Error saat mencari topik (traceback): {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Terjadi kesalahan saat mencari topik: {e}")
 
+@app.get("/api/search/articles", response_model=ArticleSearchResponse, tags=["Search"])
+async def search_articles_endpoint(query: str = Query(..., min_length=3),
+                                   limit: int = Query(10, ge=1),
+                                   offset: int = Query(0, ge=0)):
+    """Memeringkat artikel individual berdasarkan cosine similarity embedding-nya terhadap kueri."""
+    state = MODEL_STATE
+    if state is None or SENTENCE_MODEL is None: raise HTTPException(status_code=503, detail="Model tidak tersedia.")
+    if state.article_embeddings is None: raise HTTPException(status_code=503, detail="Indeks embedding artikel tidak tersedia.")
+    limit = min(limit, ARTICLE_SEARCH_MAX_LIMIT)
+
+    try:
+        INPUT_CHARACTERS.labels("query").observe(len(query))
+        # Embedding dokumen dibuat dari teks terproses, jadi kueri dibersihkan dengan pipeline yang sama
+        processed_query, preprocess_seconds = await run_in_pool(CPU_POOL, workers.preprocess_text, query)
+        STAGE_LATENCY_SECONDS.labels("preprocess").observe(preprocess_seconds)
+        query_embedding = await run_in_pool(MODEL_POOL, timed_call, "query_encode", SENTENCE_MODEL.encode,
+                                            processed_query or query, convert_to_numpy=True, normalize_embeddings=True)
+        indices, scores = await run_in_pool(MODEL_POOL, timed_call, "article_search", state.article_embeddings.search,
+                                            query_embedding, limit, offset)
+
+        articles = [ScoredArticleResponse(**state.get_article(i).dict(), score=float(score))
+                    for i, score in zip(indices, scores)]
+        return ArticleSearchResponse(articles=articles, offset=offset, limit=limit, total=len(state.article_embeddings))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        print(f"Error saat mencari artikel (traceback): {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Terjadi kesalahan saat mencari artikel: {e}")
+
+@app.post("/api/admin/reload", response_model=ModelReloadResponse, tags=["Admin"])
+async def reload_model_endpoint(force: bool = Query(False), x_admin_token: Optional[str] = Header(None)):
+    # Tanpa ADMIN_TOKEN endpoint admin dinonaktifkan, agar klien sembarang tidak bisa memicu pemuatan ulang penuh
+    if not ADMIN_TOKEN: raise HTTPException(status_code=404, detail="Endpoint admin tidak aktif (ADMIN_TOKEN belum diset).")
+    if not hmac.compare_digest((x_admin_token or "").encode('utf-8'), ADMIN_TOKEN.encode('utf-8')):
+        raise HTTPException(status_code=403, detail="Token admin tidak valid.")
+
+    previous_run_id = MODEL_STATE.run_id if MODEL_STATE is not None else None
+    try:
+        run_id, reloaded = await reload_latest_model(force=force)
+    except Exception as e:
+        import traceback
+        print(f"Error saat memuat ulang model (traceback): {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Terjadi kesalahan saat memuat ulang model: {e}")
+    return ModelReloadResponse(previous_run_id=previous_run_id, run_id=run_id, reloaded=reloaded)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main_api:app", host="0.0.0.0", port=8000, reload=True)
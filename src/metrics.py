@@ -0,0 +1,110 @@
+"""Definisi metrik Prometheus yang dipakai bersama oleh modul-modul API."""
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# --- Micro-batching TOPIC_MODEL.transform ---
+TRANSFORM_QUEUE_DEPTH = Gauge(
+    "albertopic_transform_queue_depth",
+    "Jumlah permintaan transform yang sedang menunggu di antrean batch.",
+)
+TRANSFORM_BATCH_SIZE = Histogram(
+    "albertopic_transform_batch_size",
+    "Jumlah dokumen per pemanggilan TOPIC_MODEL.transform.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+TRANSFORM_QUEUE_WAIT_SECONDS = Histogram(
+    "albertopic_transform_queue_wait_seconds",
+    "Waktu tunggu permintaan di antrean sebelum batch-nya dijalankan.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+# --- Pool eksekutor (thread pool model, process pool PDF/pra-pemrosesan) ---
+POOL_INFLIGHT_TASKS = Gauge(
+    "albertopic_pool_inflight_tasks",
+    "Jumlah tugas yang sedang berjalan atau mengantre di pool.",
+    ["pool"],
+)
+POOL_QUEUED_TASKS = Gauge(
+    "albertopic_pool_queued_tasks",
+    "Jumlah tugas yang menunggu worker kosong di pool.",
+    ["pool"],
+)
+POOL_UTILIZATION = Gauge(
+    "albertopic_pool_utilization_ratio",
+    "Rasio worker yang sedang sibuk terhadap jumlah worker pool.",
+    ["pool"],
+)
+POOL_REJECTED_TOTAL = Counter(
+    "albertopic_pool_rejected_total",
+    "Jumlah tugas yang ditolak karena pool penuh (backpressure).",
+    ["pool"],
+)
+POOL_TASK_SECONDS = Histogram(
+    "albertopic_pool_task_seconds",
+    "Durasi tugas di pool, termasuk waktu antre.",
+    ["pool"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+# --- Cache prediksi endpoint analisis ---
+PREDICTION_CACHE_REQUESTS_TOTAL = Counter(
+    "albertopic_prediction_cache_requests_total",
+    "Jumlah pencarian di cache prediksi berdasarkan jenis kunci dan hasil (hit/miss).",
+    ["kind", "result"],
+)
+PREDICTION_CACHE_ENTRIES = Gauge(
+    "albertopic_prediction_cache_entries",
+    "Jumlah entri cache prediksi di memori.",
+)
+
+# --- Latensi per tahap pemrosesan request ---
+STAGE_LATENCY_SECONDS = Histogram(
+    "albertopic_stage_seconds",
+    "Durasi tahap internal pemrosesan request (tanpa waktu antre pool).",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+# --- Ukuran input ---
+INPUT_PDF_PAGES = Histogram(
+    "albertopic_input_pdf_pages",
+    "Jumlah halaman PDF yang diunggah ke /api/analyze/pdf.",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+INPUT_CHARACTERS = Histogram(
+    "albertopic_input_characters",
+    "Jumlah karakter teks input per sumber (pdf, text, query).",
+    ["source"],
+    buckets=(10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000, 500000),
+)
+
+# --- Model yang dimuat ---
+MODEL_LOAD_SECONDS = Gauge(
+    "albertopic_model_load_seconds",
+    "Durasi pemuatan terakhir per artefak (sentence_model, topic_model, topic_results, dst.).",
+    ["artifact"],
+)
+MODEL_RUN_ID = Gauge(
+    "albertopic_model_run_id",
+    "ID run model BERTopic yang sedang aktif.",
+)
+ARTICLES_LOADED = Gauge(
+    "albertopic_articles_loaded",
+    "Jumlah artikel di indeks artikel model aktif.",
+)
+
+@contextmanager
+def stage_timer(stage):
+    """Context manager untuk mencatat durasi satu tahap ke STAGE_LATENCY_SECONDS."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY_SECONDS.labels(stage).observe(time.perf_counter() - started)
+
+def timed_call(stage, fn, *args, **kwargs):
+    """Memanggil fn sambil mengukur durasinya; berguna untuk fungsi yang dijalankan di thread pool."""
+    with stage_timer(stage):
+        return fn(*args, **kwargs)
@@ -1,7 +1,14 @@
+import argparse
+import itertools
+import json
+import multiprocessing
 import os
-import re
 import pickle
+import shutil
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
 import pandas as pd
 
 # Impor untuk MLflow
@@ -11,8 +18,28 @@ import mlflow.pyfunc
 # Impor untuk BERTopic dan pemodelan
 from bertopic import BERTopic
 from sentence_transformers import SentenceTransformer
-from gensim.models.coherencemodel import CoherenceModel
-from gensim.corpora import Dictionary
+from umap import UMAP
+from hdbscan import HDBSCAN
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+# Modul lain di 'src' (mendukung dijalankan sebagai skrip maupun sebagai paket)
+try:
+    from .article_search import (normalize_embeddings, save_doc_embeddings, get_doc_embeddings_path,
+                                 get_faiss_index_path, maybe_build_faiss_index)
+    from .artifacts import (RUN_ID_FILE_PATTERN, TableWriter, artifact_path, find_artifact, iter_table_chunks,
+                            read_table, write_table)
+    from .coherence import evaluate_topic_coherence, load_tokenized_corpus, prepare_dictionary_cache
+    from .embedding_store import EmbeddingStore
+    from .topic_updates import add_update_topics, assign_update_topics, compute_topic_centroid, has_update_topics
+except ImportError:
+    from article_search import (normalize_embeddings, save_doc_embeddings, get_doc_embeddings_path,
+                                get_faiss_index_path, maybe_build_faiss_index)
+    from artifacts import (RUN_ID_FILE_PATTERN, TableWriter, artifact_path, find_artifact, iter_table_chunks,
+                           read_table, write_table)
+    from coherence import evaluate_topic_coherence, load_tokenized_corpus, prepare_dictionary_cache
+    from embedding_store import EmbeddingStore
+    from topic_updates import add_update_topics, assign_update_topics, compute_topic_centroid, has_update_topics
 
 # Fungsi untuk memuat data (tidak berubah)
 def load_data(input_file_path):
@@ -20,28 +47,47 @@ def load_data(input_file_path):
     if not os.path.exists(input_file_path):
         print(f"Error: File {input_file_path} tidak ditemukan!")
         return None
-    df = pd.read_csv(input_file_path)
+    df = read_table(input_file_path)
 
     if 'Processed_Title' not in df.columns:
         print("Error: Kolom Processed_Title tidak ditemukan.")
         return None
+    if 'Processed_Abstract' not in df.columns:
+        print("Peringatan: Kolom Processed_Abstract tidak ditemukan. Menggunakan hanya Processed_Title.")
+    return add_processed_text(df)
 
+def add_processed_text(df):
+    """Menambahkan kolom Processed_Text (judul + abstrak yang telah diproses) ke DataFrame."""
     df['Processed_Title'] = df['Processed_Title'].fillna('')
     if 'Processed_Abstract' in df.columns:
         df['Processed_Abstract'] = df['Processed_Abstract'].fillna('')
         df['Processed_Text'] = df['Processed_Title'] + ' ' + df['Processed_Abstract']
     else:
-        print("Peringatan: Kolom Processed_Abstract tidak ditemukan. Menggunakan hanya Processed_Title.")
         df['Processed_Text'] = df['Processed_Title']
-
     return df
 
+def compute_embeddings(embedding_model, texts, embedding_store=None):
+    """Embedding dokumen; lewat cache embedding persisten jika embedding_store diberikan."""
+    if embedding_store is not None:
+        return embedding_store.get_embeddings(texts, embedding_model.encode, show_progress_bar=True)
+    return embedding_model.encode(texts, show_progress_bar=True)
+
+def get_processed_data_path():
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    processed_data_base = os.path.join(project_root, 'data', 'processed_data', 'processed_articles')
+    return find_artifact(processed_data_base) or f"{processed_data_base}.csv"
+
 # Fungsi untuk pelatihan model (ditambahkan calculate_probabilities)
-def perform_bertopic_modeling(df, nr_topics="auto", min_topic_size=10, sentence_model_name='paraphrase-MiniLM-L6-v2'):
-    """Melakukan pemodelan topik BERTopic."""
+def perform_bertopic_modeling(df, nr_topics="auto", min_topic_size=10, sentence_model_name='paraphrase-MiniLM-L6-v2',
+                              embedding_store=None):
+    """
+    Melakukan pemodelan topik BERTopic. Mengembalikan (topic_model, topics, embeddings dokumen).
+    Jika embedding_store (EmbeddingStore untuk sentence_model_name) diberikan, hanya dokumen baru/berubah
+    yang di-encode; sisanya dibaca dari cache embedding.
+    """
     print(f"Memulai pelatihan dengan parameter: nr_topics='{nr_topics}', min_topic_size={min_topic_size}")
     embedding_model = SentenceTransformer(sentence_model_name)
-    embeddings = embedding_model.encode(df['Processed_Text'].tolist(), show_progress_bar=True)
+    embeddings = compute_embeddings(embedding_model, df['Processed_Text'].tolist(), embedding_store)
 
     bertopic_nr_topics = None if nr_topics == "auto" else nr_topics
 
@@ -54,7 +100,7 @@ def perform_bertopic_modeling(df, nr_topics="auto", min_topic_size=10, sentence_
     )
     
     topics, _ = topic_model.fit_transform(df['Processed_Text'].tolist(), embeddings)
-    return topic_model, topics
+    return topic_model, topics, embeddings
 
 # --- PERUBAHAN DI SINI: Fungsi untuk mendapatkan ID berurutan ---
 def get_next_run_id(base_dir="data/final/topic_results"):
@@ -62,59 +108,75 @@ def get_next_run_id(base_dir="data/final/topic_results"):
     os.makedirs(base_dir, exist_ok=True)
     max_id = -1
     for filename in os.listdir(base_dir):
-        # Ekstrak angka dari nama file seperti 'topic_results_5.csv'
-        match = re.search(r'_(\d+)\.csv$', filename)
+        # Ekstrak angka dari nama file seperti 'topic_results_5.csv' atau 'topic_results_5.parquet'
+        match = RUN_ID_FILE_PATTERN.search(filename)
         if match:
             current_id = int(match.group(1))
             if current_id > max_id:
                 max_id = current_id
     return max_id + 1
 
-# --- PERUBAHAN DI SINI: Fungsi untuk menyimpan ke subfolder yang berbeda ---
-def save_local_artifacts(topic_model, df_with_topics, sequential_run_id):
-    """Menyimpan model .pkl dan hasil topik .csv ke subfolder terpisah dengan ID berurutan."""
+def get_output_dirs():
+    """(direktori model .pkl, direktori hasil topik) di data/final; dibuat jika belum ada."""
     base_output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'final')
-    
-    # Direktori untuk model .pkl
     model_output_dir = os.path.join(base_output_dir, "bertopic_model")
-    os.makedirs(model_output_dir, exist_ok=True)
-    
-    # Direktori untuk hasil .csv
     results_output_dir = os.path.join(base_output_dir, "topic_results")
+    os.makedirs(model_output_dir, exist_ok=True)
     os.makedirs(results_output_dir, exist_ok=True)
+    return model_output_dir, results_output_dir
 
-    # Simpan model .pkl
+def save_model_pickle(topic_model, model_output_dir, sequential_run_id):
+    # File ditulis ke .tmp lalu di-rename agar API (hot reload) tidak pernah membaca file setengah jadi
     model_path = os.path.join(model_output_dir, f"bertopic_model_{sequential_run_id}.pkl")
-    with open(model_path, 'wb') as f:
+    with open(f"{model_path}.tmp", 'wb') as f:
         pickle.dump(topic_model, f)
+    os.replace(f"{model_path}.tmp", model_path)
     print(f"Model disimpan secara lokal di: {model_path}")
+    return model_path
+
+# --- PERUBAHAN DI SINI: Fungsi untuk menyimpan ke subfolder yang berbeda ---
+def save_local_artifacts(topic_model, df_with_topics, sequential_run_id, doc_embeddings=None, doc_embeddings_dtype="float32",
+                         results_format=None):
+    """
+    Menyimpan model .pkl dan hasil topik (.parquet, atau .csv sebagai fallback) ke subfolder terpisah dengan ID berurutan.
+    Jika doc_embeddings diberikan, embedding dokumen disimpan sebagai doc_embeddings_<id>.npy di samping
+    hasil topik (urutan baris sama) untuk pencarian artikel semantik di API.
+    """
+    model_output_dir, results_output_dir = get_output_dirs()
+    model_path = save_model_pickle(topic_model, model_output_dir, sequential_run_id)
+
+    # Simpan embedding dokumen .npy
+    if doc_embeddings is not None:
+        save_doc_embeddings(get_doc_embeddings_path(results_output_dir, sequential_run_id), doc_embeddings,
+                            dtype=doc_embeddings_dtype)
+        maybe_build_faiss_index(get_doc_embeddings_path(results_output_dir, sequential_run_id),
+                                get_faiss_index_path(results_output_dir, sequential_run_id))
 
-    # Simpan hasil topik .csv
-    results_path = os.path.join(results_output_dir, f"topic_results_{sequential_run_id}.csv")
-    df_with_topics.to_csv(results_path, index=False)
+    # Simpan hasil topik (ditulis terakhir: kemunculannya menandakan run sudah lengkap)
+    results_path = artifact_path(os.path.join(results_output_dir, f"topic_results_{sequential_run_id}"), results_format)
+    write_table(df_with_topics, results_path)
     print(f"Hasil topik disimpan secara lokal di: {results_path}")
     
     return model_path, results_path
 
-# Fungsi untuk evaluasi koherensi (tidak berubah)
-def evaluate_coherence(df, topic_model):
-    """Mengevaluasi model topik menggunakan Coherence Score (c_v)."""
+# Fungsi untuk evaluasi koherensi (lihat coherence.py)
+def evaluate_coherence(df, topic_model, **coherence_kwargs):
+    """
+    Mengevaluasi model topik menggunakan Coherence Score (c_v). Mengembalikan dict hasil
+    evaluate_topic_coherence (coherence_cv, ci_low, ci_high, seconds, ...); coherence_cv 0.0 jika gagal.
+    """
     try:
-        documents = df['Processed_Text'].astype(str).tolist()
-        topics = topic_model.get_topics()
-        valid_topic_words = [words for t_id, words in topics.items() if t_id != -1]
-        if not valid_topic_words: return 0.0
-        tokenized_docs = [doc.split() for doc in documents]
-        dictionary = Dictionary(tokenized_docs)
-        corpus = [dictionary.doc2bow(doc) for doc in tokenized_docs]
-        if not corpus: return 0.0
-        coherence_model = CoherenceModel(topics=valid_topic_words, texts=tokenized_docs, dictionary=dictionary, coherence='c_v')
-        coherence_score = coherence_model.get_coherence()
-        print(f"Coherence Score (c_v): {coherence_score:.4f}")
-        return coherence_score
+        return evaluate_topic_coherence(df['Processed_Text'].astype(str).tolist(), topic_model, **coherence_kwargs)
     except Exception as e:
         print(f"Error saat menghitung koherensi: {e}")
-        return 0.0
+        return {"coherence_cv": 0.0, "ci_low": 0.0, "ci_high": 0.0, "seconds": 0.0}
+
+def log_coherence_metrics(coherence_result):
+    mlflow.log_metric("coherence_score_cv", coherence_result["coherence_cv"])
+    mlflow.log_metric("coherence_time_seconds", round(coherence_result["seconds"], 2))
+    if coherence_result.get("n_samples", 1) > 1:
+        mlflow.log_metric("coherence_ci_low", coherence_result["ci_low"])
+        mlflow.log_metric("coherence_ci_high", coherence_result["ci_high"])
 
 # ### MLFLOW ###: Wrapper untuk model
 class BERTopicWrapper(mlflow.pyfunc.PythonModel):
@@ -128,7 +190,13 @@ class BERTopicWrapper(mlflow.pyfunc.PythonModel):
         else:
             texts_to_transform = model_input
             
-        topic_ids, probabilities = self.topic_model.transform(texts_to_transform)
+        if has_update_topics(self.topic_model):
+            # Topik dari `modelling.py update` hanya bisa ditetapkan lewat centroid, jadi embedding dibutuhkan
+            embeddings = self.topic_model._extract_embeddings(texts_to_transform, method="document")
+            topic_ids, probabilities = self.topic_model.transform(texts_to_transform, embeddings)
+            topic_ids = assign_update_topics(self.topic_model, topic_ids, embeddings).tolist()
+        else:
+            topic_ids, probabilities = self.topic_model.transform(texts_to_transform)
         
         # Penanganan kasus jika probabilitas adalah None
         if probabilities is None:
@@ -141,73 +209,713 @@ class BERTopicWrapper(mlflow.pyfunc.PythonModel):
             'probabilities': probabilities_list
         })
 
+# --- Pelatihan pada sampel untuk korpus besar ---
+SAMPLE_FIT_CHUNK_ROWS = int(os.getenv("SAMPLE_FIT_CHUNK_ROWS", "50000"))
+PROBABILITY_TOP_K = 5
+
+def get_topic_probabilities_path(results_dir, run_id):
+    return os.path.join(results_dir, f"topic_probabilities_{run_id}.npz")
+
+def stratified_sample_indices(strata, sample_size, seed=42):
+    """
+    Posisi baris sampel (terurut) dengan alokasi proporsional per strata (mis. tahun; nilai kosong menjadi
+    strata tersendiri). Sisa kuota dibagi dengan metode largest remainder sehingga total tepat sample_size.
+    """
+    strata = pd.Series(strata).fillna('unknown').astype(str).reset_index(drop=True)
+    if sample_size >= len(strata):
+        return np.arange(len(strata))
+    groups = strata.groupby(strata).indices
+    quotas = {value: sample_size * len(positions) / len(strata) for value, positions in groups.items()}
+    allocation = {value: int(np.floor(quota)) for value, quota in quotas.items()}
+    remainder = sample_size - sum(allocation.values())
+    for value in sorted(quotas, key=lambda value: (allocation[value] - quotas[value], value))[:remainder]:
+        allocation[value] += 1
+
+    rng = np.random.default_rng(seed)
+    picked = [rng.choice(groups[value], size=allocation[value], replace=False)
+              for value in sorted(groups) if allocation[value]]
+    return np.sort(np.concatenate(picked))
+
+def top_k_probabilities(topics, probabilities, k):
+    """(id topik, probabilitas) top-k per dokumen, masing-masing berbentuk (n, k); -1/0 sebagai padding."""
+    n_docs = len(topics)
+    topic_ids = np.full((n_docs, k), -1, dtype=np.int32)
+    values = np.zeros((n_docs, k), dtype=np.float32)
+    if probabilities is None:
+        return topic_ids, values
+    probabilities = np.asarray(probabilities, dtype=np.float32)
+    if probabilities.ndim == 1:
+        # Hanya probabilitas topik terpilih yang tersedia
+        topic_ids[:, 0] = topics
+        values[:, 0] = probabilities
+        return topic_ids, values
+    k_available = min(k, probabilities.shape[1])
+    if k_available == 0:
+        return topic_ids, values
+    top = np.argpartition(-probabilities, k_available - 1, axis=1)[:, :k_available]
+    top_values = np.take_along_axis(probabilities, top, axis=1)
+    order = np.argsort(-top_values, axis=1)
+    topic_ids[:, :k_available] = np.take_along_axis(top, order, axis=1)
+    values[:, :k_available] = np.take_along_axis(top_values, order, axis=1)
+    return topic_ids, values
+
+def read_sample_documents(input_path, sample_positions, chunk_rows):
+    """Processed_Text untuk baris sampel, dibaca per chunk (hanya kolom teks)."""
+    sample_documents = []
+    offset = 0
+    for chunk in iter_table_chunks(input_path, chunk_rows, columns=['Processed_Title', 'Processed_Abstract']):
+        start, end = np.searchsorted(sample_positions, [offset, offset + len(chunk)])
+        texts = add_processed_text(chunk)['Processed_Text']
+        sample_documents.extend(texts.iloc[sample_positions[start:end] - offset].tolist())
+        offset += len(chunk)
+    return sample_documents
+
+def perform_sample_fit_modeling(input_path, sequential_run_id, sample_size, nr_topics="auto", min_topic_size=10,
+                                sentence_model_name='paraphrase-MiniLM-L6-v2', embedding_store=None,
+                                stratify_column='year', seed=42, chunk_rows=SAMPLE_FIT_CHUNK_ROWS,
+                                probability_top_k=PROBABILITY_TOP_K, doc_embeddings_dtype="float32", results_format=None):
+    """
+    Mode korpus besar: BERTopic di-fit pada sampel terstratifikasi (per stratify_column) berukuran sample_size,
+    lalu seluruh dokumen diberi topik per chunk (dokumen sampel memakai hasil fit, sisanya transform) dan
+    langsung ditulis ke topic_results_<id>. Embedding dokumen ditulis ke .npy memory-map dan probabilitas
+    disimpan top-k saja di topic_probabilities_<id>.npz (topic_ids, probabilities; bentuk n x k), sehingga
+    memori dibatasi oleh ukuran sampel dan chunk, bukan ukuran korpus.
+    Mengembalikan (topic_model, dokumen sampel, jumlah dokumen, results_path).
+    """
+    strata_df = read_table(input_path, columns=[stratify_column])
+    n_docs = len(strata_df)
+    strata = strata_df[stratify_column] if stratify_column in strata_df.columns else pd.Series(['all'] * n_docs)
+    if stratify_column not in strata_df.columns:
+        print(f"Peringatan: Kolom {stratify_column} tidak ditemukan. Sampel diambil acak tanpa strata.")
+    sample_positions = stratified_sample_indices(strata, sample_size, seed)
+    del strata_df, strata
+    print(f"Fit pada sampel {len(sample_positions)} dari {n_docs} dokumen (strata: {stratify_column}).")
+
+    sample_documents = read_sample_documents(input_path, sample_positions, chunk_rows)
+    embedding_model = SentenceTransformer(sentence_model_name)
+    sample_embeddings = np.asarray(compute_embeddings(embedding_model, sample_documents, embedding_store), dtype=np.float32)
+    topic_model = BERTopic(
+        nr_topics=None if nr_topics == "auto" else nr_topics,
+        min_topic_size=min_topic_size,
+        embedding_model=embedding_model,
+        calculate_probabilities=True  # Matriks padat hanya sebesar sampel x topik
+    )
+    sample_topics, sample_probabilities = topic_model.fit_transform(sample_documents, sample_embeddings)
+    sample_topics = np.asarray(sample_topics)
+    sample_topic_ids, sample_topic_values = top_k_probabilities(sample_topics, sample_probabilities, probability_top_k)
+    del sample_probabilities
+
+    model_output_dir, results_output_dir = get_output_dirs()
+    save_model_pickle(topic_model, model_output_dir, sequential_run_id)
+
+    results_path = artifact_path(os.path.join(results_output_dir, f"topic_results_{sequential_run_id}"), results_format)
+    embeddings_path = get_doc_embeddings_path(results_output_dir, sequential_run_id)
+    probabilities_path = get_topic_probabilities_path(results_output_dir, sequential_run_id)
+    doc_embeddings = np.lib.format.open_memmap(f"{embeddings_path}.tmp.npy", mode='w+', dtype=doc_embeddings_dtype,
+                                               shape=(n_docs, sample_embeddings.shape[1]))
+    # Top-k per dokumen juga ditulis ke memory-map sementara agar memori tidak tumbuh seiring ukuran korpus
+    all_topic_ids = np.lib.format.open_memmap(f"{probabilities_path}.ids.tmp.npy", mode='w+', dtype=np.int32,
+                                              shape=(n_docs, probability_top_k))
+    all_topic_values = np.lib.format.open_memmap(f"{probabilities_path}.values.tmp.npy", mode='w+', dtype=np.float32,
+                                                 shape=(n_docs, probability_top_k))
+
+    writer = TableWriter(results_path)
+    try:
+        offset = 0
+        start_time = time.time()
+        for chunk in iter_table_chunks(input_path, chunk_rows):
+            chunk = add_processed_text(chunk)
+            texts = chunk['Processed_Text'].tolist()
+            start, end = np.searchsorted(sample_positions, [offset, offset + len(chunk)])
+            is_sample = np.zeros(len(chunk), dtype=bool)
+            is_sample[sample_positions[start:end] - offset] = True
+            rest = np.flatnonzero(~is_sample)
+
+            chunk_topics = np.empty(len(chunk), dtype=np.int64)
+            chunk_embeddings = np.empty((len(chunk), sample_embeddings.shape[1]), dtype=np.float32)
+            chunk_topics[is_sample] = sample_topics[start:end]
+            chunk_embeddings[is_sample] = sample_embeddings[start:end]
+            all_topic_ids[offset:offset + len(chunk)][is_sample] = sample_topic_ids[start:end]
+            all_topic_values[offset:offset + len(chunk)][is_sample] = sample_topic_values[start:end]
+            if len(rest):
+                rest_texts = [texts[i] for i in rest]
+                rest_embeddings = np.asarray(compute_embeddings(embedding_model, rest_texts, embedding_store), dtype=np.float32)
+                rest_topics, rest_probabilities = topic_model.transform(rest_texts, rest_embeddings)
+                chunk_topics[rest] = rest_topics
+                chunk_embeddings[rest] = rest_embeddings
+                rest_ids, rest_values = top_k_probabilities(np.asarray(rest_topics), rest_probabilities, probability_top_k)
+                all_topic_ids[offset + rest] = rest_ids
+                all_topic_values[offset + rest] = rest_values
+
+            doc_embeddings[offset:offset + len(chunk)] = normalize_embeddings(chunk_embeddings)
+            chunk['Topic'] = chunk_topics
+            writer.write(chunk)
+            offset += len(chunk)
+            elapsed = time.time() - start_time
+            print(f"Penugasan topik: {offset}/{n_docs} dokumen ({offset / max(elapsed, 1e-9):.0f} dok/detik)")
+
+        doc_embeddings.flush()
+        del doc_embeddings
+        os.replace(f"{embeddings_path}.tmp.npy", embeddings_path)
+        maybe_build_faiss_index(embeddings_path, get_faiss_index_path(results_output_dir, sequential_run_id))
+        np.savez(f"{probabilities_path}.tmp.npz", topic_ids=all_topic_ids, probabilities=all_topic_values)
+        os.replace(f"{probabilities_path}.tmp.npz", probabilities_path)
+        del all_topic_ids, all_topic_values
+        print(f"Probabilitas top-{probability_top_k} disimpan di: {probabilities_path}")
+        # Hasil topik diganti terakhir: kemunculannya menandakan run sudah lengkap
+        writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    finally:
+        for tmp_path in (f"{embeddings_path}.tmp.npy", f"{probabilities_path}.ids.tmp.npy",
+                         f"{probabilities_path}.values.tmp.npy"):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    print(f"Hasil topik disimpan secara lokal di: {results_path}")
+    return topic_model, sample_documents, n_docs, results_path
+
+# --- Pembaruan inkremental dengan artikel baru ---
+def compute_topic_keywords(documents_per_topic, top_n_words=10, n_gram_range=(1, 1)):
+    """
+    Kata kunci c-TF-IDF per topik: {topic_id: [dokumen]} -> {topic_id: [(kata, skor)]}. Setiap topik
+    diperlakukan sebagai satu dokumen gabungan; idf = log(1 + rata-rata kata per topik / frekuensi kata).
+    """
+    topic_ids = sorted(documents_per_topic)
+    vectorizer = CountVectorizer(ngram_range=tuple(n_gram_range))
+    counts = vectorizer.fit_transform([' '.join(documents_per_topic[topic_id]) for topic_id in topic_ids])
+    words = vectorizer.get_feature_names_out()
+    word_frequencies = np.asarray(counts.sum(axis=0)).ravel()
+    idf = np.log(1 + (counts.sum() / len(topic_ids)) / np.maximum(word_frequencies, 1))
+    scores = normalize(counts, norm='l1', axis=1).multiply(idf).tocsr()
+
+    keywords = {}
+    for row, topic_id in enumerate(topic_ids):
+        topic_scores = scores.getrow(row).toarray().ravel()
+        top = np.argsort(-topic_scores)[:top_n_words]
+        keywords[topic_id] = [(words[i], float(topic_scores[i])) for i in top if topic_scores[i] > 0]
+    return keywords
+
+def extend_topic_representations(topic_model, documents_per_topic, centroids):
+    """
+    Menambahkan baris topik baru ke matriks c-TF-IDF (vectorizer dan bobot idf model) dan ke topic_embeddings
+    model, agar find_topics/visualisasi sejajar dengan daftar topik. ID topik baru selalu di atas ID lama,
+    sehingga baris cukup ditambahkan di akhir. Dilewati dengan peringatan jika atribut model tidak sesuai.
+    """
+    from scipy import sparse
+
+    topic_ids = sorted(documents_per_topic)
+    try:
+        if getattr(topic_model, 'c_tf_idf', None) is not None and getattr(topic_model, 'transformer', None) is not None:
+            counts = topic_model.vectorizer_model.transform([' '.join(documents_per_topic[topic_id]) for topic_id in topic_ids])
+            topic_model.c_tf_idf = sparse.vstack([topic_model.c_tf_idf, topic_model.transformer.transform(counts)]).tocsr()
+    except Exception as e:
+        print(f"Peringatan: Matriks c-TF-IDF tidak diperbarui: {e}")
+    topic_embeddings = getattr(topic_model, 'topic_embeddings', None)
+    if topic_embeddings is not None:
+        new_rows = [centroids[topic_id] for topic_id in topic_ids]
+        if isinstance(topic_embeddings, np.ndarray):
+            topic_model.topic_embeddings = np.vstack([topic_embeddings, np.asarray(new_rows, dtype=topic_embeddings.dtype)])
+        else:
+            topic_model.topic_embeddings = list(topic_embeddings) + new_rows
+
+def add_topics_to_model(topic_model, new_topic_keywords, topic_counts, documents_per_topic=None, centroids=None):
+    """
+    Mendaftarkan topik baru pada model BERTopic yang sudah di-fit: kata kunci, ukuran topik, centroid embedding
+    (dipakai assign_update_topics saat prediksi dan pembaruan berikutnya), baris c-TF-IDF dan topic_embeddings.
+    centroids: {topic_id: (centroid, ambang)}.
+    """
+    for topic_id, keywords in new_topic_keywords.items():
+        topic_model.topics[topic_id] = keywords
+        if isinstance(getattr(topic_model, 'topic_names', None), dict):
+            topic_model.topic_names[topic_id] = f"{topic_id}_" + "_".join(word for word, _ in keywords[:4])
+    if isinstance(getattr(topic_model, 'topic_sizes', None), dict):
+        for topic_id, count in topic_counts.items():
+            topic_model.topic_sizes[topic_id] = topic_model.topic_sizes.get(topic_id, 0) + count
+    if new_topic_keywords and centroids:
+        new_topic_ids = sorted(new_topic_keywords)
+        add_update_topics(topic_model, new_topic_ids, [centroids[topic_id][0] for topic_id in new_topic_ids],
+                          [centroids[topic_id][1] for topic_id in new_topic_ids])
+        extend_topic_representations(topic_model, {topic_id: documents_per_topic[topic_id] for topic_id in new_topic_ids},
+                                     {topic_id: centroids[topic_id][0] for topic_id in new_topic_ids})
+
+def read_new_rows(input_path, offset, chunk_rows):
+    """Baris artefak mulai dari posisi offset (artikel yang ditambahkan setelah run dasar), dibaca per chunk."""
+    new_chunks = []
+    position = 0
+    for chunk in iter_table_chunks(input_path, chunk_rows):
+        if position + len(chunk) > offset:
+            new_chunks.append(chunk.iloc[max(offset - position, 0):])
+        position += len(chunk)
+    if not new_chunks:
+        return pd.DataFrame()
+    return pd.concat(new_chunks, ignore_index=True)
+
+def count_table_rows(path, chunk_rows):
+    return sum(len(chunk) for chunk in iter_table_chunks(path, chunk_rows, columns=['Topic']))
+
+def run_topic_update(base_run_id, new_run_id, input_path, offset=None, sentence_model_name='paraphrase-MiniLM-L6-v2',
+                     embedding_store=None, min_new_topic_size=None, chunk_rows=SAMPLE_FIT_CHUNK_ROWS,
+                     doc_embeddings_dtype="float32", results_format=None):
+    """
+    Memperbarui model run base_run_id dengan artikel baru (baris input_path mulai dari offset; default jumlah
+    baris hasil run dasar, cocok dengan artefak yang ditambah oleh preprocess --incremental). Artikel baru
+    diberi topik dengan model yang ada; outlier (-1) dikelompokkan dengan HDBSCAN di ruang UMAP model, dan
+    klaster yang cukup besar menjadi topik baru dengan kata kunci c-TF-IDF. Outlier yang dekat dengan centroid
+    topik dari pembaruan sebelumnya diberi topik tersebut lebih dulu, sehingga tidak menjadi topik duplikat. Hasilnya disimpan sebagai run
+    new_run_id: model baru dan topic_results yang berisi hasil lama ditambah artikel baru. Biaya (embedding,
+    transform, klasterisasi) sebanding dengan jumlah artikel baru; hasil lama hanya disalin per chunk.
+    Mengembalikan dict statistik (beserta topic_model dan results_path), atau None jika tidak ada artikel baru.
+    """
+    model_output_dir, results_output_dir = get_output_dirs()
+    base_results_path = find_artifact(os.path.join(results_output_dir, f"topic_results_{base_run_id}"))
+    if base_results_path is None:
+        print(f"Error: Hasil topik run {base_run_id} tidak ditemukan.")
+        return None
+    with open(os.path.join(model_output_dir, f"bertopic_model_{base_run_id}.pkl"), 'rb') as f:
+        topic_model = pickle.load(f)
+
+    base_rows = count_table_rows(base_results_path, chunk_rows)
+    new_df = read_new_rows(input_path, base_rows if offset is None else offset, chunk_rows)
+    if new_df.empty:
+        print("Tidak ada artikel baru untuk diproses.")
+        return None
+    new_df = add_processed_text(new_df)
+    texts = new_df['Processed_Text'].tolist()
+    print(f"Memperbarui run {base_run_id} dengan {len(texts)} artikel baru -> run {new_run_id}.")
+
+    embeddings = np.asarray(compute_embeddings(SentenceTransformer(sentence_model_name), texts, embedding_store),
+                            dtype=np.float32)
+    topics, _ = topic_model.transform(texts, embeddings)
+    transform_outliers = int((np.asarray(topics) == -1).sum())
+    topics = assign_update_topics(topic_model, topics, embeddings)
+    outliers = np.flatnonzero(topics == -1)
+    assigned_update_topics = transform_outliers - len(outliers)
+    min_new_topic_size = min_new_topic_size or topic_model.min_topic_size
+    print(f"{len(texts) - transform_outliers} artikel masuk topik model, {assigned_update_topics} masuk topik "
+          f"pembaruan sebelumnya, {len(outliers)} outlier.")
+
+    new_topic_keywords = {}
+    documents_per_topic = {}
+    centroids = {}
+    if len(outliers) >= min_new_topic_size:
+        reduced = topic_model.umap_model.transform(embeddings[outliers])
+        labels = HDBSCAN(min_cluster_size=min_new_topic_size, metric='euclidean',
+                         cluster_selection_method='eom').fit(np.nan_to_num(reduced)).labels_
+        next_topic_id = max(topic_model.get_topics()) + 1
+        topics[outliers[labels >= 0]] = next_topic_id + labels[labels >= 0]
+        new_topic_ids = sorted(set((next_topic_id + labels[labels >= 0]).tolist()))
+        if new_topic_ids:
+            for text, topic in zip(texts, topics.tolist()):
+                documents_per_topic.setdefault(topic, []).append(text)
+            keywords = compute_topic_keywords(documents_per_topic, top_n_words=topic_model.top_n_words,
+                                              n_gram_range=topic_model.n_gram_range)
+            new_topic_keywords = {topic_id: keywords[topic_id] for topic_id in new_topic_ids}
+            for topic_id in new_topic_ids:
+                centroids[topic_id] = compute_topic_centroid(embeddings[topics == topic_id])
+                print(f"Topik baru {topic_id}: {[word for word, _ in new_topic_keywords[topic_id][:5]]}")
+    topic_ids, topic_counts = np.unique(topics, return_counts=True)
+    add_topics_to_model(topic_model, new_topic_keywords, dict(zip(topic_ids.tolist(), topic_counts.tolist())),
+                        documents_per_topic, centroids)
+    save_model_pickle(topic_model, model_output_dir, new_run_id)
+
+    results_path = artifact_path(os.path.join(results_output_dir, f"topic_results_{new_run_id}"), results_format)
+    base_embeddings_path = get_doc_embeddings_path(results_output_dir, base_run_id)
+    embeddings_path = get_doc_embeddings_path(results_output_dir, new_run_id)
+    writer = TableWriter(results_path)
+    try:
+        for chunk in iter_table_chunks(base_results_path, chunk_rows):
+            writer.write(chunk)
+        new_df['Topic'] = topics
+        writer.write(new_df)
+
+        if os.path.exists(base_embeddings_path):
+            base_embeddings = np.load(base_embeddings_path, mmap_mode='r')
+            if base_embeddings.shape[0] == base_rows:
+                merged = np.lib.format.open_memmap(f"{embeddings_path}.tmp.npy", mode='w+', dtype=doc_embeddings_dtype,
+                                                   shape=(base_rows + len(texts), base_embeddings.shape[1]))
+                for start in range(0, base_rows, chunk_rows):
+                    merged[start:start + chunk_rows] = base_embeddings[start:start + chunk_rows]
+                merged[base_rows:] = normalize_embeddings(embeddings)
+                merged.flush()
+                del merged
+                os.replace(f"{embeddings_path}.tmp.npy", embeddings_path)
+                maybe_build_faiss_index(embeddings_path, get_faiss_index_path(results_output_dir, new_run_id))
+            else:
+                print(f"Peringatan: {base_embeddings_path} tidak sejajar dengan hasil run {base_run_id}. Embedding tidak diperbarui.")
+        # Hasil topik diganti terakhir: kemunculannya menandakan run sudah lengkap
+        writer.close()
+    except BaseException:
+        writer.abort()
+        if os.path.exists(f"{embeddings_path}.tmp.npy"):
+            os.remove(f"{embeddings_path}.tmp.npy")
+        raise
+    print(f"Hasil topik disimpan secara lokal di: {results_path}")
+
+    return {
+        "topic_model": topic_model,
+        "results_path": results_path,
+        "new_documents": len(texts),
+        "assigned_existing": len(texts) - transform_outliers,
+        "assigned_update_topics": assigned_update_topics,
+        "outliers_before": len(outliers),
+        "outliers_after": int((topics == -1).sum()),
+        "new_topics": len(new_topic_keywords),
+        "total_documents": base_rows + len(texts),
+    }
+
+# --- Sweep hyperparameter ---
+SWEEP_DIR = os.getenv("SWEEP_DIR", "data/final/sweeps")
+# Parameter UMAP default BERTopic 0.9; konfigurasi dengan parameter UMAP yang sama memakai satu reduksi bersama
+UMAP_SWEEP_DEFAULTS = {"n_neighbors": 15, "n_components": 5, "min_dist": 0.0, "metric": "cosine"}
+BERTOPIC_SWEEP_PARAMS = ("nr_topics", "min_topic_size", "top_n_words")
+
+class PrecomputedReduction:
+    """
+    Pengganti umap_model BERTopic yang mengembalikan reduksi UMAP yang sudah dihitung untuk dokumen latih.
+    Hanya untuk sweep: model hasil sweep tidak bisa mentransformasi dokumen baru.
+    """
+    def __init__(self, reduced_embeddings):
+        self.reduced_embeddings = reduced_embeddings
+
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        if X.shape[0] != self.reduced_embeddings.shape[0]:
+            raise ValueError("PrecomputedReduction hanya berlaku untuk dokumen latih sweep.")
+        return np.asarray(self.reduced_embeddings)
+
+def expand_param_grid(param_grid):
+    """{"nr_topics": [20, 50], "min_topic_size": [10, 15]} -> daftar dict konfigurasi (produk kartesius)."""
+    unknown = set(param_grid) - set(BERTOPIC_SWEEP_PARAMS) - set(UMAP_SWEEP_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Parameter sweep tidak dikenal: {sorted(unknown)}. "
+                         f"Didukung: {list(BERTOPIC_SWEEP_PARAMS) + list(UMAP_SWEEP_DEFAULTS)}")
+    names = sorted(param_grid)
+    values = [param_grid[name] if isinstance(param_grid[name], list) else [param_grid[name]] for name in names]
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+def umap_params_for(config):
+    return {name: config.get(name, default) for name, default in UMAP_SWEEP_DEFAULTS.items()}
+
+def umap_params_key(umap_params):
+    return json.dumps(umap_params, sort_keys=True)
+
+_SWEEP_WORKER_STATE = {}
+
+def _init_sweep_worker(documents, embeddings_path, reduction_paths, coherence_sample_size=None):
+    # Embedding dan reduksi dibuka sebagai memory-map: dibagi antar proses lewat page cache, tidak disalin
+    _SWEEP_WORKER_STATE["df"] = pd.DataFrame({'Processed_Text': documents})
+    # Sekali per worker; Dictionary sudah disiapkan di cache disk oleh run_sweep
+    load_tokenized_corpus(_SWEEP_WORKER_STATE["df"]['Processed_Text'].astype(str).tolist())
+    _SWEEP_WORKER_STATE["embeddings"] = np.load(embeddings_path, mmap_mode='r')
+    _SWEEP_WORKER_STATE["reduction_paths"] = reduction_paths
+    _SWEEP_WORKER_STATE["coherence_sample_size"] = coherence_sample_size
+
+def _run_sweep_config(config):
+    """Melatih satu konfigurasi sweep di proses worker dan mengembalikan metriknya."""
+    df = _SWEEP_WORKER_STATE["df"]
+    reduction_path = _SWEEP_WORKER_STATE["reduction_paths"][umap_params_key(umap_params_for(config))]
+    nr_topics = config.get("nr_topics", "auto")
+
+    start_time = time.time()
+    topic_model = BERTopic(
+        nr_topics=None if nr_topics == "auto" else nr_topics,
+        min_topic_size=config.get("min_topic_size", 10),
+        top_n_words=config.get("top_n_words", 10),
+        umap_model=PrecomputedReduction(np.load(reduction_path, mmap_mode='r')),
+        calculate_probabilities=False  # Probabilitas tidak dipakai untuk metrik sweep
+    )
+    topics, _ = topic_model.fit_transform(df['Processed_Text'].tolist(), _SWEEP_WORKER_STATE["embeddings"])
+    training_time = time.time() - start_time
+
+    # Worker sudah paralel: coherence dihitung dengan satu proses agar core tidak oversubscribe
+    coherence_result = evaluate_coherence(df, topic_model, processes=1,
+                                          sample_size=_SWEEP_WORKER_STATE.get("coherence_sample_size"))
+    topic_info = topic_model.get_topic_info()
+    num_topics_found = len(topic_info) - (1 if -1 in topic_info['Topic'].values else 0)
+    return {
+        "coherence_score_cv": coherence_result["coherence_cv"],
+        "coherence_time_seconds": round(coherence_result["seconds"], 2),
+        "jumlah_topik_ditemukan": num_topics_found,
+        "training_time_seconds": round(training_time, 2),
+        "outlier_ratio": round(sum(1 for topic in topics if topic == -1) / max(len(topics), 1), 4),
+    }
+
+def run_sweep(df, param_grid, sentence_model_name='paraphrase-MiniLM-L6-v2', n_jobs=None, embedding_store=None,
+              umap_random_state=None, keep_arrays=False, coherence_sample_size=None):
+    """
+    Menjalankan grid konfigurasi BERTopic sebagai nested run MLflow. Embedding dihitung sekali dan reduksi UMAP
+    sekali per kombinasi parameter UMAP; keduanya disimpan sebagai .npy dan dibuka dengan memory-map oleh
+    worker di ProcessPoolExecutor. Mengembalikan DataFrame hasil (satu baris per konfigurasi).
+    """
+    configs = expand_param_grid(param_grid)
+    n_jobs = max(1, min(n_jobs or os.cpu_count() or 1, len(configs)))
+    documents = df['Processed_Text'].tolist()
+
+    with mlflow.start_run(run_name="sweep") as parent_run:
+        print(f"Sweep {len(configs)} konfigurasi dengan {n_jobs} proses. ID MLflow: {parent_run.info.run_id}")
+        mlflow.log_param("sweep_grid", json.dumps(param_grid, sort_keys=True))
+        mlflow.log_param("jumlah_konfigurasi", len(configs))
+        mlflow.log_param("jumlah_dokumen", len(df))
+        mlflow.log_param("sentence_model", sentence_model_name)
+
+        arrays_dir = os.path.join(SWEEP_DIR, parent_run.info.run_id)
+        os.makedirs(arrays_dir, exist_ok=True)
+        try:
+            start_time = time.time()
+            embeddings = np.asarray(compute_embeddings(SentenceTransformer(sentence_model_name), documents, embedding_store),
+                                    dtype=np.float32)
+            embeddings_path = os.path.join(arrays_dir, "embeddings.npy")
+            np.save(embeddings_path, embeddings)
+            mlflow.log_metric("embedding_time_seconds", round(time.time() - start_time, 2))
+            if embedding_store is not None and embedding_store.last_stats:
+                mlflow.log_metric("embedding_cache_hit_ratio", round(embedding_store.last_stats["hit_ratio"], 4))
+
+            start_time = time.time()
+            reduction_paths = {}
+            for umap_params in {umap_params_key(umap_params_for(config)): umap_params_for(config) for config in configs}.values():
+                key = umap_params_key(umap_params)
+                print(f"Menghitung reduksi UMAP {key}...")
+                reduced = UMAP(**umap_params, low_memory=False, random_state=umap_random_state).fit_transform(embeddings)
+                reduction_paths[key] = os.path.join(arrays_dir, f"umap_{len(reduction_paths)}.npy")
+                np.save(reduction_paths[key], np.nan_to_num(reduced).astype(np.float32))
+            mlflow.log_metric("umap_time_seconds", round(time.time() - start_time, 2))
+            mlflow.log_metric("jumlah_reduksi_umap", len(reduction_paths))
+            del embeddings
+
+            # Dictionary coherence dibangun sekali di sini; worker hanya memuatnya dari cache disk
+            prepare_dictionary_cache(documents)
+
+            results = []
+            # SentenceTransformer/torch sudah dimuat di proses ini: fork bisa deadlock di thread pool OpenMP/MKL
+            with ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_sweep_worker,
+                                     initargs=(documents, embeddings_path, reduction_paths,
+                                               coherence_sample_size)) as executor:
+                futures = {executor.submit(_run_sweep_config, config): config for config in configs}
+                for future in as_completed(futures):
+                    config = futures[future]
+                    try:
+                        metrics = future.result()
+                    except Exception as e:
+                        print(f"Error pada konfigurasi {config}: {e}")
+                        continue
+                    with mlflow.start_run(run_name=json.dumps(config, sort_keys=True), nested=True):
+                        mlflow.log_params(config)
+                        mlflow.log_metrics(metrics)
+                    print(f"{config}: coherence={metrics['coherence_score_cv']:.4f}, "
+                          f"topik={metrics['jumlah_topik_ditemukan']}, waktu={metrics['training_time_seconds']} detik")
+                    results.append({**config, **metrics})
+        finally:
+            if not keep_arrays:
+                shutil.rmtree(arrays_dir, ignore_errors=True)
+
+        results_df = pd.DataFrame(results)
+        if results_df.empty:
+            print("Tidak ada konfigurasi sweep yang berhasil.")
+            return results_df
+        results_df = results_df.sort_values("coherence_score_cv", ascending=False).reset_index(drop=True)
+        best = results_df.iloc[0]
+        mlflow.log_metric("best_coherence_score_cv", best["coherence_score_cv"])
+        mlflow.log_param("best_config", json.dumps({name: best[name] for name in configs[0]}, default=str, sort_keys=True))
+        sweep_results_path = f"sweep_results_{parent_run.info.run_id}.csv"
+        results_df.to_csv(sweep_results_path, index=False)
+        mlflow.log_artifact(sweep_results_path, "hasil_sweep")
+        os.remove(sweep_results_path)
+        print(f"\nKonfigurasi terbaik (coherence {best['coherence_score_cv']:.4f}):\n{results_df.head().to_string()}")
+        return results_df
+
 # --- Bagian utama skrip ---
 if __name__ == "__main__":
     # --- Konfigurasi Eksperimen ---
     NR_TOPICS_CONFIG = 50
     MIN_TOPIC_SIZE_CONFIG = 15
     SENTENCE_MODEL_NAME_CONFIG = 'paraphrase-MiniLM-L6-v2'
+    DOC_EMBEDDINGS_DTYPE_CONFIG = 'float32'  # 'float16' menghemat separuh disk/RAM, pencarian eksak sedikit lebih lambat
+    USE_EMBEDDING_STORE_CONFIG = True  # Cache embedding persisten (data/embedding_cache); False = selalu encode ulang
+    COHERENCE_SAMPLE_SIZE_CONFIG = None  # Misal 20000: c_v pada 5 sampel acak (seed 42) + interval kepercayaan 95%
 
-    mlflow.set_experiment("AlbertopicAI - Pelatihan Model Topik")
+    parser = argparse.ArgumentParser(description="Pelatihan model BERTopic dengan pelacakan MLflow.")
+    parser.add_argument("command", nargs="?", default="train", choices=["train", "sweep", "update"],
+                        help="train: satu konfigurasi di atas; sweep: grid konfigurasi sebagai nested run MLflow; "
+                             "update: tambahkan artikel baru ke run terakhir tanpa melatih ulang.")
+    parser.add_argument("--grid", default='{"nr_topics": [20, 50, "auto"], "min_topic_size": [10, 15, 30]}',
+                        help="sweep: grid parameter sebagai JSON atau path file JSON.")
+    parser.add_argument("--n-jobs", type=int, default=None, help="sweep: jumlah proses (default: semua core).")
+    parser.add_argument("--umap-seed", type=int, default=None, help="sweep: random_state UMAP agar reduksi reprodusibel.")
+    parser.add_argument("--keep-arrays", action="store_true", help="sweep: jangan hapus embedding/reduksi .npy bersama.")
+    parser.add_argument("--coherence-sample-size", type=int, default=COHERENCE_SAMPLE_SIZE_CONFIG,
+                        help="Hitung c_v pada sampel dokumen acak berukuran ini (default: seluruh korpus).")
+    parser.add_argument("--sample-size", type=int, default=None,
+                        help="train: fit pada sampel terstratifikasi berukuran ini, sisanya ditugaskan per chunk.")
+    parser.add_argument("--stratify-column", default="year", help="train --sample-size: kolom strata sampel.")
+    parser.add_argument("--chunk-rows", type=int, default=SAMPLE_FIT_CHUNK_ROWS,
+                        help="train --sample-size: jumlah baris per chunk penugasan topik.")
+    parser.add_argument("--probability-top-k", type=int, default=PROBABILITY_TOP_K,
+                        help="train --sample-size: jumlah probabilitas topik teratas yang disimpan per dokumen.")
+    parser.add_argument("--seed", type=int, default=42, help="train --sample-size: seed pengambilan sampel.")
+    parser.add_argument("--base-run", type=int, default=None, help="update: ID run dasar (default: run terakhir).")
+    parser.add_argument("--input", default=None,
+                        help="update: artefak artikel yang telah diproses (default: processed_articles).")
+    parser.add_argument("--offset", type=int, default=None,
+                        help="update: baris pertama artikel baru di --input (default: jumlah baris hasil run dasar).")
+    parser.add_argument("--min-new-topic-size", type=int, default=None,
+                        help="update: ukuran minimum klaster outlier untuk menjadi topik baru (default: min_topic_size model).")
+    args = parser.parse_args()
 
-    with mlflow.start_run() as run:
-        # --- PERUBAHAN DI SINI: Gunakan ID berurutan untuk file lokal ---
-        sequential_run_id = get_next_run_id()
-        print(f"Memulai Run. ID Lokal: {sequential_run_id}, ID MLflow: {run.info.run_id}")
-
-        mlflow.log_param("local_run_id", sequential_run_id)
-        mlflow.log_param("nr_topics", NR_TOPICS_CONFIG)
-        mlflow.log_param("min_topic_size", MIN_TOPIC_SIZE_CONFIG)
-        mlflow.log_param("sentence_model", SENTENCE_MODEL_NAME_CONFIG)
-
-        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-        processed_data_path = os.path.join(project_root, 'data', 'processed_data', 'processed_articles.csv')
-        df = load_data(processed_data_path)
+    mlflow.set_experiment("AlbertopicAI - Pelatihan Model Topik")
 
+    if args.command == "sweep":
+        df = load_data(get_processed_data_path())
         if df is None:
             print("Gagal memuat data. Menghentikan proses.")
             exit()
-        mlflow.log_param("jumlah_dokumen", len(df))
+        if os.path.exists(args.grid):
+            with open(args.grid, 'r', encoding='utf-8') as f:
+                param_grid = json.load(f)
+        else:
+            param_grid = json.loads(args.grid)
+        run_sweep(df, param_grid, sentence_model_name=SENTENCE_MODEL_NAME_CONFIG, n_jobs=args.n_jobs,
+                  embedding_store=EmbeddingStore(SENTENCE_MODEL_NAME_CONFIG) if USE_EMBEDDING_STORE_CONFIG else None,
+                  umap_random_state=args.umap_seed, keep_arrays=args.keep_arrays,
+                  coherence_sample_size=args.coherence_sample_size)
+    elif args.command == "update":
+        with mlflow.start_run(run_name="update") as run:
+            base_run_id = args.base_run if args.base_run is not None else get_next_run_id() - 1
+            sequential_run_id = get_next_run_id()
+            print(f"Memulai pembaruan. Run dasar: {base_run_id}, ID Lokal baru: {sequential_run_id}, "
+                  f"ID MLflow: {run.info.run_id}")
+            mlflow.log_param("local_run_id", sequential_run_id)
+            mlflow.log_param("base_run_id", base_run_id)
+            mlflow.log_param("sentence_model", SENTENCE_MODEL_NAME_CONFIG)
 
-        print("Memulai pelatihan model...")
-        start_time = time.time()
-        topic_model, topics = perform_bertopic_modeling(
-            df, 
-            nr_topics=NR_TOPICS_CONFIG, 
-            min_topic_size=MIN_TOPIC_SIZE_CONFIG,
-            sentence_model_name=SENTENCE_MODEL_NAME_CONFIG
-        )
-        training_time = time.time() - start_time
-        print(f"Pelatihan selesai dalam {training_time:.2f} detik.")
-
-        coherence_score = evaluate_coherence(df, topic_model)
-        num_topics_found = len(topic_model.get_topic_info())
-        if -1 in topic_model.get_topic_info()['Topic'].values: num_topics_found -= 1
+            embedding_store = EmbeddingStore(SENTENCE_MODEL_NAME_CONFIG) if USE_EMBEDDING_STORE_CONFIG else None
+            start_time = time.time()
+            update_result = run_topic_update(base_run_id, sequential_run_id, args.input or get_processed_data_path(),
+                                             offset=args.offset, sentence_model_name=SENTENCE_MODEL_NAME_CONFIG,
+                                             embedding_store=embedding_store,
+                                             min_new_topic_size=args.min_new_topic_size,
+                                             chunk_rows=args.chunk_rows,
+                                             doc_embeddings_dtype=DOC_EMBEDDINGS_DTYPE_CONFIG)
+            if update_result is None:
+                exit()
+            update_time = time.time() - start_time
+            print(f"Pembaruan selesai dalam {update_time:.2f} detik.")
+
+            mlflow.log_param("jumlah_dokumen", update_result["total_documents"])
+            mlflow.log_metric("update_time_seconds", round(update_time, 2))
+            for name in ("new_documents", "assigned_existing", "assigned_update_topics", "outliers_before",
+                         "outliers_after", "new_topics"):
+                mlflow.log_metric(name, update_result[name])
+            mlflow.log_artifact(update_result["results_path"], "hasil_topik")
+            mlflow.pyfunc.log_model(
+                artifact_path="bertopic_model",
+                python_model=BERTopicWrapper(update_result["topic_model"]),
+                input_example=pd.DataFrame(["Contoh dokumen tentang machine learning."])
+            )
+            print(f"\nPembaruan dengan ID Lokal {sequential_run_id} berhasil dilacak di MLflow.")
+    else:
+        with mlflow.start_run() as run:
+            # --- PERUBAHAN DI SINI: Gunakan ID berurutan untuk file lokal ---
+            sequential_run_id = get_next_run_id()
+            print(f"Memulai Run. ID Lokal: {sequential_run_id}, ID MLflow: {run.info.run_id}")
+
+            mlflow.log_param("local_run_id", sequential_run_id)
+            mlflow.log_param("nr_topics", NR_TOPICS_CONFIG)
+            mlflow.log_param("min_topic_size", MIN_TOPIC_SIZE_CONFIG)
+            mlflow.log_param("sentence_model", SENTENCE_MODEL_NAME_CONFIG)
+            mlflow.log_param("embedding_store", USE_EMBEDDING_STORE_CONFIG)
+            mlflow.log_param("coherence_sample_size", args.coherence_sample_size)
+
+            embedding_store = EmbeddingStore(SENTENCE_MODEL_NAME_CONFIG) if USE_EMBEDDING_STORE_CONFIG else None
+            if args.sample_size:
+                processed_data_path = get_processed_data_path()
+                if not os.path.exists(processed_data_path):
+                    print(f"Error: File {processed_data_path} tidak ditemukan! Menghentikan proses.")
+                    exit()
+                mlflow.log_param("sample_size", args.sample_size)
+                mlflow.log_param("stratify_column", args.stratify_column)
+                mlflow.log_param("probability_top_k", args.probability_top_k)
+
+                print("Memulai pelatihan model pada sampel...")
+                start_time = time.time()
+                topic_model, sample_documents, num_documents, local_results_path = perform_sample_fit_modeling(
+                    processed_data_path, sequential_run_id, args.sample_size,
+                    nr_topics=NR_TOPICS_CONFIG,
+                    min_topic_size=MIN_TOPIC_SIZE_CONFIG,
+                    sentence_model_name=SENTENCE_MODEL_NAME_CONFIG,
+                    embedding_store=embedding_store,
+                    stratify_column=args.stratify_column,
+                    seed=args.seed,
+                    chunk_rows=args.chunk_rows,
+                    probability_top_k=args.probability_top_k,
+                    doc_embeddings_dtype=DOC_EMBEDDINGS_DTYPE_CONFIG
+                )
+                training_time = time.time() - start_time
+                print(f"Pelatihan dan penugasan topik selesai dalam {training_time:.2f} detik.")
+                mlflow.log_param("jumlah_dokumen", num_documents)
+                # Coherence dihitung pada dokumen sampel (seluruh korpus tidak dimuat ke memori)
+                coherence_result = evaluate_coherence(pd.DataFrame({'Processed_Text': sample_documents}), topic_model,
+                                                      sample_size=args.coherence_sample_size)
+            else:
+                df = load_data(get_processed_data_path())
+
+                if df is None:
+                    print("Gagal memuat data. Menghentikan proses.")
+                    exit()
+                mlflow.log_param("jumlah_dokumen", len(df))
+
+                print("Memulai pelatihan model...")
+                start_time = time.time()
+                topic_model, topics, doc_embeddings = perform_bertopic_modeling(
+                    df, 
+                    nr_topics=NR_TOPICS_CONFIG, 
+                    min_topic_size=MIN_TOPIC_SIZE_CONFIG,
+                    sentence_model_name=SENTENCE_MODEL_NAME_CONFIG,
+                    embedding_store=embedding_store
+                )
+                training_time = time.time() - start_time
+                print(f"Pelatihan selesai dalam {training_time:.2f} detik.")
+
+                coherence_result = evaluate_coherence(df, topic_model, sample_size=args.coherence_sample_size)
+            num_topics_found = len(topic_model.get_topic_info())
+            if -1 in topic_model.get_topic_info()['Topic'].values: num_topics_found -= 1
         
-        print("Mencatat metrik ke MLflow...")
-        mlflow.log_metric("coherence_score_cv", coherence_score)
-        mlflow.log_metric("training_time_seconds", round(training_time, 2))
-        mlflow.log_metric("jumlah_topik_ditemukan", num_topics_found)
-
-        df['Topic'] = topics
-        # --- PERUBAHAN DI SINI: Kirim ID berurutan ke fungsi penyimpanan ---
-        _, local_results_path = save_local_artifacts(topic_model, df, sequential_run_id)
-
-        print("Mencatat artefak ke MLflow...")
-        mlflow.log_artifact(local_results_path, "hasil_topik")
-
-        topic_info_df = topic_model.get_topic_info()
-        topic_info_path = f"topic_info_{sequential_run_id}.csv"
-        topic_info_df.to_csv(topic_info_path, index=False)
-        mlflow.log_artifact(topic_info_path, "ringkasan_topik")
-        os.remove(topic_info_path)
-
-        print("Mencatat model ke MLflow...")
-        input_example = pd.DataFrame(["Contoh dokumen tentang machine learning.", "Dokumen lain tentang komputasi kuantum."])
-        mlflow.pyfunc.log_model(
-            artifact_path="bertopic_model",
-            python_model=BERTopicWrapper(topic_model),
-            input_example=input_example
-        )
+            print("Mencatat metrik ke MLflow...")
+            log_coherence_metrics(coherence_result)
+            mlflow.log_metric("training_time_seconds", round(training_time, 2))
+            mlflow.log_metric("jumlah_topik_ditemukan", num_topics_found)
+            if embedding_store is not None and embedding_store.total_stats["texts"]:
+                total_stats = embedding_store.total_stats
+                mlflow.log_metric("embedding_cache_hit_ratio", round(total_stats["hits"] / total_stats["texts"], 4))
+                mlflow.log_metric("embedding_cache_hits", total_stats["hits"])
+                mlflow.log_metric("embedding_cache_misses", total_stats["misses"])
+                mlflow.log_metric("embedding_encode_seconds", round(total_stats["encode_seconds"], 2))
+
+            if not args.sample_size:
+                df['Topic'] = topics
+                # --- PERUBAHAN DI SINI: Kirim ID berurutan ke fungsi penyimpanan ---
+                _, local_results_path = save_local_artifacts(topic_model, df, sequential_run_id,
+                                                             doc_embeddings=doc_embeddings,
+                                                             doc_embeddings_dtype=DOC_EMBEDDINGS_DTYPE_CONFIG)
+
+            print("Mencatat artefak ke MLflow...")
+            mlflow.log_artifact(local_results_path, "hasil_topik")
+
+            topic_info_df = topic_model.get_topic_info()
+            topic_info_path = f"topic_info_{sequential_run_id}.csv"
+            topic_info_df.to_csv(topic_info_path, index=False)
+            mlflow.log_artifact(topic_info_path, "ringkasan_topik")
+            os.remove(topic_info_path)
+
+            print("Mencatat model ke MLflow...")
+            input_example = pd.DataFrame(["Contoh dokumen tentang machine learning.", "Dokumen lain tentang komputasi kuantum."])
+            mlflow.pyfunc.log_model(
+                artifact_path="bertopic_model",
+                python_model=BERTopicWrapper(topic_model),
+                input_example=input_example
+            )
         
-        print(f"\nEksperimen dengan ID Lokal {sequential_run_id} berhasil dilacak di MLflow.")
+            print(f"\nEksperimen dengan ID Lokal {sequential_run_id} berhasil dilacak di MLflow.")
@@ -0,0 +1,200 @@
+"""
+Cache prediksi berbasis konten untuk endpoint analisis.
+Kunci = hash SHA-256 dari (jenis, ID run model, konten), sehingga hasil model lama tidak pernah
+terpakai oleh model baru. Entri di memori dibatasi jumlahnya (LRU) dan punya TTL; entri yang
+tergusur bisa ditumpahkan ke disk sebagai file JSON kecil.
+
+I/O disk tidak pernah berjalan di event loop: put() hanya menyentuh memori dan mengantrekan entri yang
+tergusur ke satu thread penulis (termasuk pemangkasan spill), sedangkan handler async membaca spill lewat
+get_async()/get_many_async() yang memakai run_in_executor.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+from .metrics import PREDICTION_CACHE_REQUESTS_TOTAL, PREDICTION_CACHE_ENTRIES
+
+# Entri tergusur yang menunggu ditulis ke disk; jika penuh (disk lambat), entri dibuang saja
+SPILL_QUEUE_MAX_ENTRIES = 10000
+
+class PredictionCache:
+    def __init__(self, max_entries=10000, ttl_seconds=86400, spill_dir=None, max_spill_entries=100000):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.spill_dir = spill_dir or None
+        self.max_spill_entries = max_spill_entries
+        self._entries = OrderedDict()  # kunci -> (kedaluwarsa, nilai)
+        self._spill_count = 0
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()  # _spill_count diubah dari thread penulis dan thread pembaca spill
+        self._spill_queue = None
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self._spill_count = sum(len(files) for _, _, files in os.walk(self.spill_dir))
+            self._spill_queue = queue.Queue(maxsize=SPILL_QUEUE_MAX_ENTRIES)
+            threading.Thread(target=self._spill_writer, name="prediction-cache-spill", daemon=True).start()
+
+    @staticmethod
+    def make_key(kind, run_id, content):
+        """Membuat kunci cache dari konten (str atau bytes) dan ID run model yang aktif."""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        digest = hashlib.sha256(content).hexdigest()
+        return f"{kind}-{run_id}-{digest}"
+
+    def _spill_path(self, key):
+        digest = key.rsplit('-', 1)[-1]
+        return os.path.join(self.spill_dir, digest[:2], f"{key}.json")
+
+    def _get_memory(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+        return None
+
+    def _promote(self, key, value, kind):
+        if value is None:
+            PREDICTION_CACHE_REQUESTS_TOTAL.labels(kind, "miss").inc()
+            return None
+        self.put(key, value)
+        PREDICTION_CACHE_REQUESTS_TOTAL.labels(kind, "hit").inc()
+        return value
+
+    def get(self, key, kind="default"):
+        """Versi sinkron (membaca spill di thread pemanggil); dari event loop gunakan get_async()."""
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None:
+            PREDICTION_CACHE_REQUESTS_TOTAL.labels(kind, "hit").inc()
+            return value
+        return self._promote(key, self._read_spill(key, now), kind)
+
+    async def get_async(self, key, kind="default"):
+        return (await self.get_many_async([key], kind))[0]
+
+    async def get_many_async(self, keys, kind="default"):
+        """Nilai untuk setiap kunci (None jika tidak ada); spill untuk semua miss dibaca dalam satu run_in_executor."""
+        now = time.time()
+        values = [self._get_memory(key, now) for key in keys]
+        missing = [i for i, value in enumerate(values) if value is None]
+        if len(missing) < len(values):
+            PREDICTION_CACHE_REQUESTS_TOTAL.labels(kind, "hit").inc(len(values) - len(missing))
+        if not missing:
+            return values
+        if not self.spill_dir:
+            PREDICTION_CACHE_REQUESTS_TOTAL.labels(kind, "miss").inc(len(missing))
+            return values
+        loop = asyncio.get_running_loop()
+        spilled = await loop.run_in_executor(None, self._read_spill_many, [keys[i] for i in missing], now)
+        for i, value in zip(missing, spilled):
+            values[i] = self._promote(keys[i], value, kind)
+        return values
+
+    def put(self, key, value):
+        """Hanya memori; entri yang tergusur diantrekan ke thread penulis spill."""
+        evicted = []
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False))
+            PREDICTION_CACHE_ENTRIES.set(len(self._entries))
+        if self._spill_queue is not None:
+            for evicted_key, (expires_at, evicted_value) in evicted:
+                try:
+                    self._spill_queue.put_nowait((evicted_key, expires_at, evicted_value))
+                except queue.Full:
+                    pass
+
+    def _spill_writer(self):
+        while True:
+            key, expires_at, value = self._spill_queue.get()
+            self._write_spill(key, expires_at, value)
+
+    def clear(self):
+        """
+        Mengosongkan cache memori dan disk. Tidak diperlukan saat model berganti (kunci memuat ID run); penghapusan
+        spill berjalan sinkron, jadi dari event loop panggil lewat run_in_executor.
+        """
+        with self._lock:
+            self._entries.clear()
+            PREDICTION_CACHE_ENTRIES.set(0)
+        if self.spill_dir:
+            for root, _, files in os.walk(self.spill_dir):
+                for filename in files:
+                    try:
+                        os.remove(os.path.join(root, filename))
+                    except OSError:
+                        pass
+            with self._spill_lock:
+                self._spill_count = 0
+
+    def _read_spill_many(self, keys, now):
+        return [self._read_spill(key, now) for key in keys]
+
+    def _read_spill(self, key, now):
+        if not self.spill_dir: return None
+        path = self._spill_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('expires_at', 0) <= now:
+            try:
+                os.remove(path)
+                with self._spill_lock:
+                    self._spill_count -= 1
+            except OSError:
+                pass
+            return None
+        return data.get('value')
+
+    def _write_spill(self, key, expires_at, value):
+        path = self._spill_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Nilai yang dipromosikan dari disk lalu tergusur lagi menimpa file yang sama: jangan dihitung dua kali
+            existed = os.path.exists(path)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'expires_at': expires_at, 'value': value}, f)
+            os.replace(tmp_path, path)
+            if not existed:
+                with self._spill_lock:
+                    self._spill_count += 1
+        except OSError as e:
+            print(f"Peringatan: Gagal menulis cache prediksi ke disk ({path}): {e}")
+            return
+        if self.max_spill_entries and self._spill_count > self.max_spill_entries:
+            self._prune_spill()
+
+    def _prune_spill(self):
+        """Menghapus 10% file spill tertua agar ukuran cache disk tetap terbatas."""
+        files = []
+        for root, _, filenames in os.walk(self.spill_dir):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                try:
+                    files.append((os.path.getmtime(path), path))
+                except OSError:
+                    pass
+        files.sort()
+        to_remove = len(files) - int(self.max_spill_entries * 0.9)
+        for _, path in files[:max(0, to_remove)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._spill_lock:
+            self._spill_count = len(files) - max(0, to_remove)
@@ -1,5 +1,8 @@
 import os
 import re
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import string
 import pandas as pd
 import nltk
@@ -8,6 +11,15 @@ from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 from nltk.stem import WordNetLemmatizer
 import json
+import hashlib
+
+# Modul lain di 'src' (mendukung dijalankan sebagai skrip maupun sebagai paket)
+try:
+    from .artifacts import TableWriter, artifact_path, compact_artifact, list_part_files, write_table
+    from .dedup import SeenArticleSet
+except ImportError:
+    from artifacts import TableWriter, artifact_path, compact_artifact, list_part_files, write_table
+    from dedup import SeenArticleSet
 
 try:
     nltk.data.find('tokenizers/punkt')
@@ -55,25 +67,379 @@ def preprocess_text_pipeline(text_input, stopword_list):
     cleaned_text = clean_text_advanced(str(text_input), custom_stopwords=stopword_list)
     return cleaned_text
 
+# --- Mesin pra-pemrosesan batch ---
+# Hasilnya identik byte-per-byte dengan preprocess_text_pipeline: hapus karakter non-huruf/non-spasi,
+# lowercase, normalisasi spasi, lalu filter stopwords (hanya jika stopwords tidak kosong).
+NON_ALPHA_PATTERN = re.compile(r'[^a-zA-Z\s]+')
+PREPROCESS_CHUNK_SIZE = 20000
+
+def preprocess_texts_batch(texts, stopword_list=None):
+    """Pra-pemrosesan sekumpulan teks dalam satu proses dengan pola regex terkompilasi dan frozenset stopwords."""
+    stopword_set = frozenset(stopword_list) if stopword_list else None
+    remove_non_alpha = NON_ALPHA_PATTERN.sub
+    results = []
+    for text in texts:
+        # str.split() tanpa argumen sekaligus menormalkan spasi dan melakukan strip
+        tokens = remove_non_alpha('', str(text)).lower().split()
+        if stopword_set:
+            tokens = [word for word in tokens if word not in stopword_set]
+        results.append(' '.join(tokens))
+    return results
+
+def preprocess_texts_parallel(texts, stopword_list=None, n_jobs=None, chunk_size=PREPROCESS_CHUNK_SIZE,
+                              executor=None):
+    """
+    Membagi teks menjadi chunk dan memprosesnya di process pool. Urutan hasil sama dengan urutan input.
+    n_jobs=None memakai semua core; n_jobs=1 (atau data kecil) diproses langsung di proses ini.
+    executor yang sudah ada bisa diberikan agar pool dipakai ulang antar pemanggilan (mode streaming).
+    """
+    texts = list(texts)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs <= 1 or len(texts) <= chunk_size:
+        return preprocess_texts_batch(texts, stopword_list)
+
+    stopword_set = frozenset(stopword_list) if stopword_list else frozenset()
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    results = []
+    if executor is not None:
+        for chunk_result in executor.map(preprocess_texts_batch, chunks, repeat(stopword_set)):
+            results.extend(chunk_result)
+        return results
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(chunks))) as executor:
+        for chunk_result in executor.map(preprocess_texts_batch, chunks, repeat(stopword_set)):
+            results.extend(chunk_result)
+    return results
+
+def preprocess_dataframe(df, language_stopwords, n_jobs=None, chunk_size=PREPROCESS_CHUNK_SIZE, executor=None,
+                         verbose=True):
+    """Menambahkan kolom Processed_Title dan Processed_Abstract ke df (in-place). df wajib punya kolom 'title'."""
+    if verbose: print("Melakukan pra-pemrosesan pada kolom 'title'...")
+    df['Processed_Title'] = preprocess_texts_parallel(df['title'], language_stopwords, n_jobs, chunk_size, executor)
+
+    if 'abstract' in df.columns:
+        if verbose: print("Melakukan pra-pemrosesan pada kolom 'abstract'...")
+        df['Processed_Abstract'] = preprocess_texts_parallel(df['abstract'], language_stopwords, n_jobs, chunk_size,
+                                                             executor)
+    else:
+        if verbose: print("Peringatan: Kolom 'abstract' tidak ditemukan. Hanya 'title' yang akan diproses.")
+        df['Processed_Abstract'] = ""
+    return df
+
+# --- Pembacaan JSONL streaming ---
+STREAM_CHUNK_ROWS = 50000
+MAX_REPORTED_MALFORMED_LINES = 20  # baris rusak setelah batas ini hanya dihitung, tidak dicetak
+
+def iter_jsonl_chunks(jsonl_filepath, chunk_rows=STREAM_CHUNK_ROWS, stats=None, start_offset=0, end_offset=None):
+    """
+    Membaca file JSONL secara streaming dan menghasilkan list of dict berukuran maksimal chunk_rows,
+    sehingga memori tidak bergantung pada ukuran file. Baris kosong dilewati; baris yang bukan JSON object
+    valid dihitung di stats['malformed'] dan dilewati. stats['end_offset'] berisi posisi byte setelah
+    baris terakhir dari chunk yang baru saja dihasilkan. Pembacaan dimulai dari byte start_offset dan
+    (jika diberikan) berhenti di byte end_offset.
+    """
+    if stats is None:
+        stats = {}
+    for key in ('lines', 'records', 'malformed'):
+        stats.setdefault(key, 0)
+    offset = start_offset
+    chunk = []
+    with open(jsonl_filepath, 'rb') as f:
+        f.seek(start_offset)
+        for raw_line in f:
+            if end_offset is not None and offset + len(raw_line) > end_offset:
+                break
+            offset += len(raw_line)
+            stats['lines'] += 1
+            if not raw_line.strip():
+                continue
+            try:
+                record = json.loads(raw_line.decode('utf-8'))
+                if not isinstance(record, dict):
+                    raise ValueError(f"baris berisi {type(record).__name__}, bukan JSON object")
+            except ValueError as e:  # JSONDecodeError dan UnicodeDecodeError turunan ValueError
+                stats['malformed'] += 1
+                if stats['malformed'] <= MAX_REPORTED_MALFORMED_LINES:
+                    print(f"Melewati baris {stats['lines']} yang rusak di {jsonl_filepath}: {e}")
+                continue
+            stats['records'] += 1
+            chunk.append(record)
+            if len(chunk) >= chunk_rows:
+                stats['end_offset'] = offset
+                yield chunk
+                chunk = []
+    stats['end_offset'] = offset
+    if chunk:
+        yield chunk
+
 def load_data_from_jsonl(jsonl_filepath):
-    data_list = []
     if not os.path.exists(jsonl_filepath):
         print(f"Error: File input {jsonl_filepath} tidak ditemukan!")
         return None
-    with open(jsonl_filepath, 'r', encoding='utf-8') as f:
-        for line_number, line in enumerate(f):
-            try:
-                data_list.append(json.loads(line))
-            except json.JSONDecodeError as e:
-                print(f"Error decoding JSON di baris {line_number + 1} file {jsonl_filepath}: {e}")
-                return None
+    stats = {}
+    data_list = []
+    for records in iter_jsonl_chunks(jsonl_filepath, stats=stats):
+        data_list.extend(records)
+    if stats['malformed']:
+        print(f"Peringatan: {stats['malformed']} baris rusak dilewati dari {jsonl_filepath}")
     if not data_list:
         print(f"Tidak ada data yang berhasil dimuat dari {jsonl_filepath}")
         return None
     return pd.DataFrame(data_list)
 
-def run_preprocess_pipeline(input_jsonl_path, output_csv_path, language_stopwords):
+def run_streaming_preprocess(input_jsonl_path, output_path, language_stopwords, n_jobs=None,
+                             chunk_size=PREPROCESS_CHUNK_SIZE, stream_chunk_rows=STREAM_CHUNK_ROWS,
+                             start_offset=0, end_offset=None, append=False, seen_articles=None):
+    """
+    Mode streaming: JSONL dibaca per stream_chunk_rows baris, setiap chunk diproses lalu langsung ditambahkan
+    ke artefak output (Parquet/CSV sesuai ekstensi), sehingga puncak memori konstan berapa pun ukuran korpus.
+    Output ditulis ke file .tmp dan baru menggantikan output lama setelah seluruh input selesai diproses.
+    Dengan append=True, data baru ditulis sebagai part file tambahan di <output>.parts/ (lihat artifacts.py).
+    Jika seen_articles (SeenArticleSet) diberikan, artikel duplikat dibuang sebelum diproses.
+    Mengembalikan dict statistik (lines, records, malformed, duplicates, end_offset, rows_written),
+    atau None jika proses gagal.
+    """
+    if not os.path.exists(input_jsonl_path):
+        print(f"Error: File input {input_jsonl_path} tidak ditemukan!")
+        return None
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    stats = {'duplicates': 0}
+    n_jobs = n_jobs or os.cpu_count() or 1
+    # Satu process pool dipakai untuk semua chunk agar biaya start worker tidak terulang
+    executor = ProcessPoolExecutor(max_workers=n_jobs) if n_jobs > 1 else None
+    try:
+        with TableWriter(output_path, append=append) as writer:
+            for chunk_number, records in enumerate(iter_jsonl_chunks(input_jsonl_path, stream_chunk_rows, stats,
+                                                                     start_offset, end_offset)):
+                if seen_articles is not None:
+                    records, new_keys, duplicate_count = seen_articles.filter_new(records)
+                    seen_articles.add(new_keys)
+                    stats['duplicates'] += duplicate_count
+                    if not records:
+                        continue
+                chunk_df = pd.DataFrame(records)
+                if writer.columns is None and 'title' not in chunk_df.columns:
+                    print("Error: Kolom 'title' tidak ditemukan dalam data JSONL.")
+                    return None
+                if 'title' not in chunk_df.columns:
+                    chunk_df['title'] = float('nan')  # sama seperti nilai hilang pada mode non-streaming
+                # Mode non-streaming mengisi abstrak yang hilang dengan NaN (-> 'nan') selama kolom abstract ada
+                # di data; "" dari preprocess_dataframe hanya jika artefak memang tidak punya kolom abstract
+                if 'abstract' not in chunk_df.columns and writer.columns is not None and 'abstract' in writer.columns:
+                    chunk_df['abstract'] = float('nan')
+                preprocess_dataframe(chunk_df, language_stopwords, n_jobs, chunk_size, executor, verbose=False)
+                writer.write(chunk_df)
+                print(f"Chunk {chunk_number + 1} selesai. Total baris diproses: {writer.rows_written}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if stats.get('malformed'):
+        print(f"Peringatan: {stats['malformed']} baris rusak dilewati dari {input_jsonl_path}")
+    if seen_articles is not None:
+        print(f"Duplikat dibuang: {stats['duplicates']}")
+    if writer.columns is None:
+        print("Tidak ada data yang berhasil dimuat. Proses pra-pemrosesan dihentikan.")
+        return None
+
+    print(f"Pra-pemrosesan selesai. Data yang diproses disimpan di: {output_path}")
+    print(f"Jumlah baris yang diproses: {writer.rows_written}")
+    stats.setdefault('end_offset', start_offset)
+    stats['rows_written'] = writer.rows_written
+    return stats
+
+# --- Pra-pemrosesan inkremental ---
+# Naikkan jika aturan pembersihan teks berubah agar manifest lama tidak lagi dianggap valid
+PREPROCESS_RULES_VERSION = 1
+HASH_READ_BLOCK_BYTES = 1024 * 1024
+# Setelah part file sebanyak ini, part digabung ke artefak utama (biaya penuh terbagi ke banyak run)
+PREPROCESS_MAX_PARTS = int(os.getenv("PREPROCESS_MAX_PARTS", "32"))
+
+def get_manifest_path(output_path):
+    return f"{output_path}.manifest.json"
+
+def get_seen_articles_path(output_path):
+    return f"{output_path}.seen.txt"
+
+def preprocess_config_fingerprint(language_stopwords, dedup=False):
+    """Sidik jari konfigurasi pembersihan; berbeda berarti artefak lama harus dibangun ulang."""
+    config = {
+        "rules_version": PREPROCESS_RULES_VERSION,
+        "pattern": NON_ALPHA_PATTERN.pattern,
+        "stopwords": sorted(language_stopwords) if language_stopwords else [],
+        "dedup": dedup,
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+
+def update_hash_from_file(hasher, path, start, end):
+    """Menambahkan byte [start, end) dari file ke hasher secara bertahap."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(HASH_READ_BLOCK_BYTES, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+def find_complete_lines_end(path):
+    """Posisi byte setelah newline terakhir; baris terakhir yang belum lengkap (scraper masih menulis) diabaikan."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        position = size
+        while position > 0:
+            read_start = max(0, position - HASH_READ_BLOCK_BYTES)
+            f.seek(read_start)
+            block = f.read(position - read_start)
+            newline_index = block.rfind(b'\n')
+            if newline_index != -1:
+                return read_start + newline_index + 1
+            position = read_start
+    return 0
+
+def load_manifest(manifest_path):
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Peringatan: Manifest {manifest_path} tidak bisa dibaca ({e}).")
+        return None
+
+def save_manifest(manifest_path, manifest):
+    with open(f"{manifest_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+
+def output_signature(output_path):
+    """
+    Ukuran dan waktu modifikasi artefak beserta part file-nya; dipakai untuk mendeteksi artefak yang diubah
+    di luar mode inkremental.
+    """
+    stat_result = os.stat(output_path)
+    signature = {"size": stat_result.st_size, "mtime_ns": stat_result.st_mtime_ns}
+    parts = list_part_files(output_path)
+    if parts:
+        signature["parts"] = [[os.path.basename(part), os.stat(part).st_size, os.stat(part).st_mtime_ns]
+                              for part in parts]
+    return signature
+
+def check_manifest(manifest, input_jsonl_path, output_path, fingerprint, prefix_hasher):
+    """
+    Mengembalikan None jika manifest masih valid (prefix input sama, konfigurasi sama, artefak tidak berubah),
+    atau string alasan build ulang penuh. prefix_hasher diisi dengan hash byte yang sudah diproses.
+    """
+    if manifest is None:
+        return "manifest belum ada"
+    if manifest.get("config_fingerprint") != fingerprint:
+        return "konfigurasi stopwords/aturan pembersihan berubah"
+    if manifest.get("input_path") != os.path.abspath(input_jsonl_path):
+        return "file input berbeda"
+    if not os.path.exists(output_path) or manifest.get("output") != output_signature(output_path):
+        return "artefak output hilang atau diubah di luar mode inkremental"
+    byte_offset = manifest.get("byte_offset", 0)
+    if os.path.getsize(input_jsonl_path) < byte_offset:
+        return "file input lebih kecil dari bagian yang sudah diproses"
+    update_hash_from_file(prefix_hasher, input_jsonl_path, 0, byte_offset)
+    if prefix_hasher.hexdigest() != manifest.get("prefix_sha256"):
+        return "isi bagian input yang sudah diproses berubah"
+    return None
+
+def run_incremental_preprocess(input_jsonl_path, output_path, language_stopwords, n_jobs=None,
+                               chunk_size=PREPROCESS_CHUNK_SIZE, stream_chunk_rows=STREAM_CHUNK_ROWS,
+                               full_rebuild=False, dedup=False):
+    """
+    Hanya memproses baris yang ditambahkan scraper sejak run sebelumnya, lalu menuliskannya sebagai part file
+    baru artefak yang ada (isi lama tidak disalin). Lebih dari PREPROCESS_MAX_PARTS part digabung ke file utama.
+    Manifest (<output>.manifest.json) mencatat byte offset, jumlah baris dan hash SHA-256 dari bagian input
+    yang sudah diproses, serta sidik jari konfigurasi. Build ulang penuh dilakukan jika full_rebuild=True
+    atau manifest tidak lagi cocok dengan input/konfigurasi/artefak. Dengan dedup=True, kunci artikel yang
+    sudah diproses disimpan di <output>.seen.txt agar duplikat di data baru juga dibuang.
+    """
+    if not os.path.exists(input_jsonl_path):
+        print(f"Error: File input {input_jsonl_path} tidak ditemukan!")
+        return None
+    manifest_path = get_manifest_path(output_path)
+    fingerprint = preprocess_config_fingerprint(language_stopwords, dedup)
+    manifest = load_manifest(manifest_path)
+    prefix_hasher = hashlib.sha256()
+
+    rebuild_reason = "diminta (--full-rebuild)" if full_rebuild else \
+        check_manifest(manifest, input_jsonl_path, output_path, fingerprint, prefix_hasher)
+    if rebuild_reason:
+        print(f"Build ulang penuh: {rebuild_reason}.")
+        prefix_hasher = hashlib.sha256()
+        start_offset, previous_lines, previous_malformed, previous_duplicates = 0, 0, 0, 0
+    else:
+        start_offset = manifest["byte_offset"]
+        previous_lines, previous_malformed = manifest.get("line_count", 0), manifest.get("malformed_lines", 0)
+        previous_duplicates = manifest.get("duplicates_dropped", 0)
+
+    seen_articles = SeenArticleSet(get_seen_articles_path(output_path)) if dedup else None
+    if seen_articles is not None and rebuild_reason:
+        # Hanya di memori; file seen-set lama baru diganti oleh save() setelah build ulang berhasil
+        seen_articles.reset()
+
+    end_offset = find_complete_lines_end(input_jsonl_path)
+    if not rebuild_reason and end_offset <= start_offset:
+        print("Tidak ada data baru sejak pra-pemrosesan terakhir.")
+        return {"rows_written": 0, "total_rows": manifest.get("rows", 0)}
+    if start_offset:
+        print(f"Memproses data baru mulai byte {start_offset} (baris {previous_lines + 1}).")
+
+    stats = run_streaming_preprocess(input_jsonl_path, output_path, language_stopwords, n_jobs, chunk_size,
+                                     stream_chunk_rows, start_offset=start_offset, end_offset=end_offset,
+                                     append=not rebuild_reason, seen_articles=seen_articles)
+    if stats is None:
+        return None
+    stats['total_rows'] = (0 if rebuild_reason else manifest.get("rows", 0)) + stats['rows_written']
+    if seen_articles is not None:
+        # Disimpan setelah artefak diganti; jika terhenti sebelum manifest ditulis, run berikutnya build ulang penuh
+        seen_articles.save()
+    if len(list_part_files(output_path)) > PREPROCESS_MAX_PARTS:
+        print(f"Menggabungkan {len(list_part_files(output_path))} part file ke {output_path}...")
+        compact_artifact(output_path)
+
+    update_hash_from_file(prefix_hasher, input_jsonl_path, start_offset, stats['end_offset'])
+    save_manifest(manifest_path, {
+        "input_path": os.path.abspath(input_jsonl_path),
+        "byte_offset": stats['end_offset'],
+        "line_count": previous_lines + stats.get('lines', 0),
+        "prefix_sha256": prefix_hasher.hexdigest(),
+        "config_fingerprint": fingerprint,
+        "rows": stats['total_rows'],
+        "malformed_lines": previous_malformed + stats.get('malformed', 0),
+        "duplicates_dropped": previous_duplicates + stats.get('duplicates', 0),
+        "output": output_signature(output_path),
+    })
+    print(f"Manifest diperbarui: {manifest_path}")
+    return stats
+
+def drop_duplicate_articles(df):
+    """Membuang baris duplikat (DOI / judul ternormalisasi sama), menyimpan kemunculan pertama."""
+    seen_articles = SeenArticleSet()
+    keep = []
+    for article in df.to_dict('records'):
+        new_articles, new_keys, _ = seen_articles.filter_new([article])
+        seen_articles.add(new_keys)
+        keep.append(bool(new_articles))
+    deduped_df = df[keep].reset_index(drop=True)
+    print(f"Duplikat dibuang: {len(df) - len(deduped_df)} dari {len(df)} artikel.")
+    return deduped_df
+
+def run_preprocess_pipeline(input_jsonl_path, output_path, language_stopwords, n_jobs=None,
+                            chunk_size=PREPROCESS_CHUNK_SIZE, streaming=False, stream_chunk_rows=STREAM_CHUNK_ROWS,
+                            incremental=False, full_rebuild=False, dedup=False):
     print(f"Memulai pra-pemrosesan untuk file: {input_jsonl_path}")
+    if incremental:
+        return run_incremental_preprocess(input_jsonl_path, output_path, language_stopwords, n_jobs, chunk_size,
+                                          stream_chunk_rows, full_rebuild=full_rebuild, dedup=dedup)
+    if streaming:
+        return run_streaming_preprocess(input_jsonl_path, output_path, language_stopwords, n_jobs, chunk_size,
+                                        stream_chunk_rows, seen_articles=SeenArticleSet() if dedup else None)
     
     df = load_data_from_jsonl(input_jsonl_path)
     if df is None or df.empty:
@@ -84,30 +450,40 @@ def run_preprocess_pipeline(input_jsonl_path, output_csv_path, language_stopword
         print("Error: Kolom 'title' tidak ditemukan dalam data JSONL.")
         return
 
-    print("Melakukan pra-pemrosesan pada kolom 'title'...")
-    df['Processed_Title'] = df['title'].apply(lambda x: preprocess_text_pipeline(x, language_stopwords))
+    if dedup:
+        df = drop_duplicate_articles(df)
 
-    if 'abstract' in df.columns:
-        print("Melakukan pra-pemrosesan pada kolom 'abstract'...")
-        df['Processed_Abstract'] = df['abstract'].apply(lambda x: preprocess_text_pipeline(x, language_stopwords))
-    else:
-        print("Peringatan: Kolom 'abstract' tidak ditemukan. Hanya 'title' yang akan diproses.")
-        df['Processed_Abstract'] = "" 
+    preprocess_dataframe(df, language_stopwords, n_jobs, chunk_size)
 
-    os.makedirs(os.path.dirname(output_csv_path), exist_ok=True)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
     try:
-        df.to_csv(output_csv_path, index=False, encoding='utf-8')
-        print(f"Pra-pemrosesan selesai. Data yang diproses disimpan di: {output_csv_path}")
+        write_table(df, output_path)
+        print(f"Pra-pemrosesan selesai. Data yang diproses disimpan di: {output_path}")
         print(f"Jumlah baris yang diproses: {len(df)}")
     except Exception as e:
-        print(f"Error saat menyimpan file CSV: {e}")
+        print(f"Error saat menyimpan file {output_path}: {e}")
 
 if __name__ == "__main__":
     project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
     raw_data_jsonl_path = os.path.join(project_root, 'data', 'rawdata', 'arxiv_cs_articles_by_date.jsonl')
-    processed_data_csv_path = os.path.join(project_root, 'data', 'processed_data', 'processed_articles.csv')
+    processed_data_path = artifact_path(os.path.join(project_root, 'data', 'processed_data', 'processed_articles'))
+
+    parser = argparse.ArgumentParser(description="Pra-pemrosesan artikel arXiv (JSONL -> Parquet/CSV).")
+    parser.add_argument("--input", default=raw_data_jsonl_path, help="Path file JSONL mentah.")
+    parser.add_argument("--output", default=processed_data_path, help="Path hasil; format mengikuti ekstensi (.parquet atau .csv).")
+    parser.add_argument("--n-jobs", type=int, default=None, help="Jumlah proses worker (default: semua core).")
+    parser.add_argument("--chunk-size", type=int, default=PREPROCESS_CHUNK_SIZE, help="Jumlah teks per chunk worker.")
+    parser.add_argument("--streaming", action="store_true", help="Baca input per chunk dengan memori konstan.")
+    parser.add_argument("--stream-chunk-rows", type=int, default=STREAM_CHUNK_ROWS, help="Jumlah baris JSONL per chunk streaming.")
+    parser.add_argument("--incremental", action="store_true", help="Hanya proses data baru sejak run sebelumnya (streaming).")
+    parser.add_argument("--full-rebuild", action="store_true", help="Dengan --incremental: abaikan manifest dan proses ulang semuanya.")
+    parser.add_argument("--dedup", action="store_true", help="Buang artikel duplikat (DOI / judul ternormalisasi) sebelum diproses.")
+    args = parser.parse_args()
+
     english_stopwords = set(stopwords.words('english'))
     
     print("Menjalankan preprocess.py sebagai skrip mandiri...")
-    run_preprocess_pipeline(raw_data_jsonl_path, processed_data_csv_path, english_stopwords)
\ No newline at end of file
+    run_preprocess_pipeline(args.input, args.output, english_stopwords, n_jobs=args.n_jobs, chunk_size=args.chunk_size,
+                            streaming=args.streaming, stream_chunk_rows=args.stream_chunk_rows,
+                            incremental=args.incremental, full_rebuild=args.full_rebuild, dedup=args.dedup)
\ No newline at end of file
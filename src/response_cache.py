@@ -0,0 +1,188 @@
+"""
+Cache respons mentah arXiv API di disk (terkompresi gzip), dengan alamat berdasarkan isi request.
+
+Kunci cache adalah hash SHA-256 dari parameter query (search_query, start, max_results, sortBy, sortOrder),
+sehingga mengurai ulang rentang yang sudah pernah diambil tidak memerlukan jaringan maupun jeda 3 detik.
+Hanya rentang submittedDate yang sudah tertutup (tanggal akhir lebih dari RESPONSE_CACHE_CLOSED_AFTER_DAYS hari
+yang lalu) yang dilayani dari cache tanpa batas waktu. Untuk bulan yang masih berjalan, query-nya tetap sama
+padahal artikel baru terus masuk (dan halaman bergeser karena urutan terbaru lebih dulu). Respons seperti itu
+hanya dipakai selama RESPONSE_CACHE_OPEN_TTL_SECONDS, setelah itu diambil ulang dari jaringan.
+index.jsonl mencatat setiap respons sesuai urutan pengambilan; mode replay membangun ulang file JSONL
+artikel sepenuhnya dari cache dengan parser saat ini.
+
+    python src/response_cache.py stats
+    python src/response_cache.py replay --output data/rawdata/arxiv_cs_articles_by_date.jsonl --rebuild-seen
+"""
+import argparse
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+
+RESPONSE_CACHE_DIR = os.getenv("SCRAPER_RESPONSE_CACHE_DIR", "data/rawdata/response_cache")
+RESPONSE_CACHE_ENABLED = os.getenv("SCRAPER_RESPONSE_CACHE", "true").lower() in ("1", "true", "yes")
+CACHE_KEY_PARAMS = ("search_query", "start", "max_results", "sortBy", "sortOrder")
+INDEX_FILENAME = "index.jsonl"
+# Artikel bisa diumumkan beberapa hari setelah tanggal submit, jadi rentang dianggap tertutup setelah jeda ini
+RESPONSE_CACHE_CLOSED_AFTER_DAYS = int(os.getenv("SCRAPER_RESPONSE_CACHE_CLOSED_AFTER_DAYS", "7"))
+RESPONSE_CACHE_OPEN_TTL_SECONDS = float(os.getenv("SCRAPER_RESPONSE_CACHE_OPEN_TTL_SECONDS", "3600"))
+DATE_RANGE_END_PATTERN = re.compile(r'submittedDate:\[\d+\s+TO\s+(\d{8})\d*\]')
+
+def make_cache_key(params):
+    canonical = json.dumps({name: str(params.get(name, "")) for name in CACHE_KEY_PARAMS}, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def is_closed_range(params, now=None):
+    """True jika search_query memfilter submittedDate dengan tanggal akhir yang sudah cukup lama lewat."""
+    match = DATE_RANGE_END_PATTERN.search(str(params.get("search_query", "")))
+    if not match:
+        return False
+    try:
+        end_date = datetime.datetime.strptime(match.group(1), "%Y%m%d").date()
+    except ValueError:
+        return False
+    today = (now or datetime.datetime.now(datetime.timezone.utc)).date()
+    return (today - end_date).days > RESPONSE_CACHE_CLOSED_AFTER_DAYS
+
+class ResponseCache:
+    """Penyimpanan respons feed: <cache_dir>/<2 karakter awal kunci>/<kunci>.xml.gz plus index.jsonl."""
+
+    def __init__(self, cache_dir=RESPONSE_CACHE_DIR, open_ttl_seconds=RESPONSE_CACHE_OPEN_TTL_SECONDS):
+        self.cache_dir = cache_dir
+        self.open_ttl_seconds = open_ttl_seconds
+        self.index_path = os.path.join(cache_dir, INDEX_FILENAME)
+        self.hits = 0
+        self.misses = 0
+
+    def _blob_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.xml.gz")
+
+    def get(self, params, allow_stale=False):
+        """
+        Konten respons (bytes) untuk parameter ini, atau None jika belum ada di cache atau sudah basi
+        (rentang tanggal yang belum tertutup dan lebih tua dari open_ttl_seconds). allow_stale=True
+        mengabaikan umur respons (untuk replay offline).
+        """
+        blob_path = self._blob_path(make_cache_key(params))
+        try:
+            if not allow_stale and not is_closed_range(params):
+                if time.time() - os.path.getmtime(blob_path) > self.open_ttl_seconds:
+                    self.misses += 1
+                    return None
+            with gzip.open(blob_path, 'rb') as f:
+                content = f.read()
+        except (FileNotFoundError, OSError, EOFError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return content
+
+    def put(self, params, content):
+        """Menyimpan respons secara atomik, lalu mencatatnya di index (blob ditulis lebih dulu)."""
+        key = make_cache_key(params)
+        blob_path = self._blob_path(key)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        with gzip.open(f"{blob_path}.tmp", 'wb', compresslevel=6) as f:
+            f.write(content)
+        os.replace(f"{blob_path}.tmp", blob_path)
+        record = {name: params.get(name) for name in CACHE_KEY_PARAMS}
+        record.update({"key": key, "bytes": len(content), "fetched_at": time.time()})
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+    def iter_index(self):
+        """Entri index unik per kunci, dalam urutan pengambilan pertama."""
+        if not os.path.exists(self.index_path):
+            return
+        seen_keys = set()
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("key") in seen_keys:
+                    continue
+                seen_keys.add(record.get("key"))
+                yield record
+
+    def stats(self):
+        responses, raw_bytes, stored_bytes = 0, 0, 0
+        for record in self.iter_index():
+            blob_path = self._blob_path(record["key"])
+            if os.path.exists(blob_path):
+                responses += 1
+                raw_bytes += record.get("bytes", 0)
+                stored_bytes += os.path.getsize(blob_path)
+        return {"responses": responses, "raw_bytes": raw_bytes, "stored_bytes": stored_bytes}
+
+def get_default_response_cache():
+    return ResponseCache(RESPONSE_CACHE_DIR) if RESPONSE_CACHE_ENABLED else None
+
+def replay_cache_to_jsonl(cache, output_path, parse_feed, seen_path=None):
+    """
+    Membangun ulang file JSONL artikel dari semua respons di cache (tanpa jaringan), dengan dedup seperti
+    scraper. Jika seen_path diberikan, seen-set scraper ikut dibangun ulang agar konsisten dengan output.
+    Mengembalikan (jumlah_artikel, jumlah_duplikat).
+    """
+    try:
+        from .dedup import SeenArticleSet
+    except ImportError:
+        from dedup import SeenArticleSet
+
+    seen_articles = SeenArticleSet()
+    written, duplicates, responses = 0, 0, 0
+    started = time.perf_counter()
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(f"{output_path}.tmp", 'w', encoding='utf-8') as out:
+        for record in cache.iter_index():
+            content = cache.get(record, allow_stale=True)
+            if content is None:
+                print(f"Peringatan: respons {record['key']} ada di index tetapi tidak ada di cache. Dilewati.")
+                continue
+            responses += 1
+            new_articles, new_keys, duplicate_count = seen_articles.filter_new(parse_feed(content))
+            seen_articles.add(new_keys)
+            duplicates += duplicate_count
+            for article in new_articles:
+                out.write(json.dumps(article) + '\n')
+            written += len(new_articles)
+    os.replace(f"{output_path}.tmp", output_path)
+
+    if seen_path:
+        persistent_seen = SeenArticleSet(seen_path)
+        persistent_seen.reset()
+        persistent_seen.add(seen_articles.keys)
+        persistent_seen.save()
+    elapsed = time.perf_counter() - started
+    print(f"Replay selesai dalam {elapsed:.1f} detik: {responses} respons, {written} artikel, "
+          f"{duplicates} duplikat -> {output_path}")
+    return written, duplicates
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cache respons arXiv API: statistik dan replay offline.")
+    parser.add_argument("command", choices=["stats", "replay"])
+    parser.add_argument("--cache-dir", default=RESPONSE_CACHE_DIR)
+    parser.add_argument("--output", default="data/rawdata/arxiv_cs_articles_by_date.jsonl",
+                        help="replay: path file JSONL yang dibangun ulang.")
+    parser.add_argument("--rebuild-seen", action="store_true", help="replay: bangun ulang seen-set scraper juga.")
+    args = parser.parse_args()
+
+    response_cache = ResponseCache(args.cache_dir)
+    if args.command == "stats":
+        cache_stats = response_cache.stats()
+        ratio = cache_stats["raw_bytes"] / cache_stats["stored_bytes"] if cache_stats["stored_bytes"] else 0
+        print(f"{cache_stats['responses']} respons, {cache_stats['raw_bytes'] / 1e6:.1f} MB mentah, "
+              f"{cache_stats['stored_bytes'] / 1e6:.1f} MB di disk (rasio kompresi {ratio:.1f}x)")
+    else:
+        try:
+            from .scraper import parse_arxiv_feed
+            from .dedup import SEEN_ARTICLES_FILENAME
+        except ImportError:
+            from scraper import parse_arxiv_feed
+            from dedup import SEEN_ARTICLES_FILENAME
+        replay_cache_to_jsonl(response_cache, args.output, parse_arxiv_feed,
+                              seen_path=SEEN_ARTICLES_FILENAME if args.rebuild_seen else None)
@@ -6,8 +6,18 @@ import time
 import calendar # Untuk mendapatkan jumlah hari dalam sebulan
 from datetime import datetime, timedelta # Untuk manipulasi tanggal
 
+# Modul lain di 'src' (mendukung dijalankan sebagai skrip maupun sebagai paket)
+try:
+    from .dedup import load_seen_articles, SEEN_ARTICLES_FILENAME
+    from .atom_parser import etree, parse_arxiv_feed_lxml
+    from .response_cache import get_default_response_cache
+except ImportError:
+    from dedup import load_seen_articles, SEEN_ARTICLES_FILENAME
+    from atom_parser import etree, parse_arxiv_feed_lxml
+    from response_cache import get_default_response_cache
+
 # --- Konfigurasi ---
-ARXIV_API_URL = "http://export.arxiv.org/api/query?"
+ARXIV_API_URL = os.getenv("ARXIV_API_URL", "http://export.arxiv.org/api/query?")  # bisa diarahkan ke server lokal
 DEFAULT_BASE_QUERY = "cat:cs.*"  # Kategori Computer Science, bisa diubah
 TARGET_ARTICLES_GOAL = 10000     # Target total artikel yang ingin dikumpulkan
 BATCH_SIZE_PER_ITERATION = 200   # Jumlah artikel per panggilan API (lebih kecil lebih aman)
@@ -135,15 +145,47 @@ def parse_arxiv_entry(entry_soup):
     }
 
 # --- Fungsi Scraping per Batch ---
-def scrape_arxiv_batch(api_query_with_date_filter, start_index_in_month_batch, batch_size_limit):
-    """Mengambil satu batch artikel dari arXiv API untuk kueri dan rentang tanggal tertentu."""
-    params = {
+def build_arxiv_params(api_query_with_date_filter, start_index_in_month_batch, batch_size_limit):
+    """Parameter query arXiv API untuk satu halaman hasil."""
+    return {
         "search_query": api_query_with_date_filter,
         "start": start_index_in_month_batch,
         "max_results": batch_size_limit,
         "sortBy": "submittedDate", # Urutkan berdasarkan tanggal submit (dalam rentang tanggal yang sudah difilter)
         "sortOrder": "descending"  # Dari yang terbaru dalam rentang tersebut
     }
+
+def parse_arxiv_feed(feed_content):
+    """Mengubah respons Atom arXiv (bytes) menjadi list artikel (dict). Memakai parser streaming lxml jika tersedia."""
+    if etree is not None:
+        return parse_arxiv_feed_lxml(feed_content)
+    return parse_arxiv_feed_bs4(feed_content)
+
+def parse_arxiv_feed_bs4(feed_content):
+    """Implementasi BeautifulSoup (fallback tanpa lxml dan acuan kesetaraan untuk benchmark)."""
+    # Menggunakan 'xml' parser dari lxml jika tersedia (lebih baik), atau parser XML bawaan BS4
+    soup = BeautifulSoup(feed_content, "xml") 
+    
+    entries = soup.find_all("entry") # atau "atom:entry"
+    if not entries and soup.find("atom:entry"): # Coba dengan prefix 'atom' jika tidak ditemukan
+        entries = soup.find_all("atom:entry")
+
+    return [parse_arxiv_entry(entry_element) for entry_element in entries]
+
+def scrape_arxiv_batch(api_query_with_date_filter, start_index_in_month_batch, batch_size_limit, response_cache=None):
+    """Mengambil satu batch artikel dari arXiv API untuk kueri dan rentang tanggal tertentu."""
+    articles, _ = scrape_arxiv_batch_with_source(api_query_with_date_filter, start_index_in_month_batch,
+                                                 batch_size_limit, response_cache)
+    return articles
+
+def scrape_arxiv_batch_with_source(api_query_with_date_filter, start_index_in_month_batch, batch_size_limit,
+                                   response_cache=None):
+    """Seperti scrape_arxiv_batch, tetapi mengembalikan (artikel, dari_cache) agar pemanggil bisa melewati jeda."""
+    params = build_arxiv_params(api_query_with_date_filter, start_index_in_month_batch, batch_size_limit)
+    if response_cache is not None:
+        cached_content = response_cache.get(params)
+        if cached_content is not None:
+            return parse_arxiv_feed(cached_content), True
     
     # print(f"  Mengambil data: start_idx_bulan={start_index_in_month_batch}, query='{api_query_with_date_filter}'") # Untuk debugging
     try:
@@ -151,17 +193,13 @@ def scrape_arxiv_batch(api_query_with_date_filter, start_index_in_month_batch, b
         response.raise_for_status()  # Akan error jika status code 4xx atau 5xx
     except requests.exceptions.RequestException as e:
         print(f"  Error saat request API: {e}")
-        return [] # Kembalikan list kosong jika ada error
-
-    # Menggunakan 'xml' parser dari lxml jika tersedia (lebih baik), atau parser XML bawaan BS4
-    soup = BeautifulSoup(response.content, "xml") 
-    
-    entries = soup.find_all("entry") # atau "atom:entry"
-    if not entries and soup.find("atom:entry"): # Coba dengan prefix 'atom' jika tidak ditemukan
-        entries = soup.find_all("atom:entry")
+        return [], False # Kembalikan list kosong jika ada error
 
-    scraped_articles_in_batch = [parse_arxiv_entry(entry_element) for entry_element in entries]
-    return scraped_articles_in_batch
+    articles = parse_arxiv_feed(response.content)
+    # Halaman kosong tidak disimpan: arXiv kadang mengembalikan feed kosong sementara
+    if response_cache is not None and articles:
+        response_cache.put(params, response.content)
+    return articles, False
 
 # --- Fungsi Penyimpanan Data ---
 def append_articles_to_jsonl(list_of_articles_to_append, output_filepath):
@@ -180,11 +218,19 @@ def run_scraper_by_date_range(
     limit_stop_month=DEFAULT_START_MONTH,
     # Tanggal mulai iterasi (mundur dari sini)
     iteration_start_year=DEFAULT_END_YEAR,
-    iteration_start_month=DEFAULT_END_MONTH
+    iteration_start_month=DEFAULT_END_MONTH,
+    response_cache=None
 ):
     # Memuat status dari checkpoint
     cp_year, cp_month, cp_month_start_idx, total_scraped_count_overall = load_checkpoint()
 
+    # Seen-set dedup: artikel yang sudah pernah ditulis (restart, rentang tanggal tumpang tindih) tidak ditulis lagi
+    seen_articles = load_seen_articles(SEEN_ARTICLES_FILENAME, OUTPUT_FILENAME)
+    total_duplicates_skipped = 0
+    # Cache respons mentah: halaman yang sudah pernah diambil dibaca dari disk tanpa request dan tanpa jeda
+    if response_cache is None:
+        response_cache = get_default_response_cache()
+
     # Menentukan titik awal iterasi berdasarkan checkpoint atau default
     if cp_year is not None and cp_month is not None: # Jika ada checkpoint valid
         current_iter_year = cp_year
@@ -228,10 +274,11 @@ def run_scraper_by_date_range(
 
             print(f"  Batch untuk {current_iter_month:02d}-{current_iter_year}: start_idx={current_month_start_index_val}, minta_size={current_batch_size_for_api}")
             
-            newly_fetched_articles_list = scrape_arxiv_batch(
+            newly_fetched_articles_list, served_from_cache = scrape_arxiv_batch_with_source(
                 api_query_for_current_month,
                 current_month_start_index_val,
-                current_batch_size_for_api
+                current_batch_size_for_api,
+                response_cache
             )
 
             if not newly_fetched_articles_list: # Jika tidak ada artikel baru di batch ini
@@ -242,23 +289,30 @@ def run_scraper_by_date_range(
                 break # Keluar dari loop paginasi bulan ini, pindah ke bulan sebelumnya
             
             articles_found_in_current_month_this_session = True
-            append_articles_to_jsonl(newly_fetched_articles_list, OUTPUT_FILENAME)
+            new_articles, new_keys, duplicate_count = seen_articles.filter_new(newly_fetched_articles_list)
+            # Artikel ditulis sebelum seen-set: jika proses terhenti di antaranya, paling buruk muncul duplikat
+            # (bisa dibuang dengan `python src/dedup.py file`), bukan artikel yang hilang
+            append_articles_to_jsonl(new_articles, OUTPUT_FILENAME)
+            seen_articles.add(new_keys)
+            seen_articles.save()
+            total_duplicates_skipped += duplicate_count
             
             num_actually_scraped_this_batch = len(newly_fetched_articles_list)
-            total_scraped_count_overall += num_actually_scraped_this_batch
+            total_scraped_count_overall += len(new_articles)
             current_month_start_index_val += num_actually_scraped_this_batch # Maju untuk batch berikutnya di bulan ini
             
             # Simpan checkpoint setelah setiap batch berhasil
             save_checkpoint(current_iter_year, current_iter_month, current_month_start_index_val, total_scraped_count_overall)
-            print(f"  Berhasil menyimpan {num_actually_scraped_this_batch} artikel. Total keseluruhan: {total_scraped_count_overall}.")
+            print(f"  Berhasil menyimpan {len(new_articles)} artikel ({duplicate_count} duplikat dilewati). Total keseluruhan: {total_scraped_count_overall}.")
             
             # Jika API mengembalikan lebih sedikit dari yang diminta, anggap akhir dari hasil untuk bulan ini
             if num_actually_scraped_this_batch < current_batch_size_for_api:
                 print(f"  Batch terakhir untuk bulan {current_iter_month:02d}-{current_iter_year} (diterima {num_actually_scraped_this_batch} dari {current_batch_size_for_api} diminta). Pindah ke bulan sebelumnya.")
                 break # Keluar dari loop paginasi bulan ini
             
-            print("  Jeda 3 detik sebelum batch berikutnya dalam bulan yang sama...")
-            time.sleep(3) # Jeda untuk menghormati API server
+            if not served_from_cache:
+                print("  Jeda 3 detik sebelum batch berikutnya dalam bulan yang sama...")
+                time.sleep(3) # Jeda untuk menghormati API server
         
         # Setelah selesai dengan satu bulan (baik karena habis artikelnya atau target tercapai),
         # pindah ke bulan sebelumnya untuk iterasi berikutnya.
@@ -271,6 +325,9 @@ def run_scraper_by_date_range(
     # Selesai loop utama
     print(f"\n--- Scraper Selesai ---")
     print(f"Total artikel yang berhasil di-scrape: {total_scraped_count_overall}.")
+    print(f"Duplikat yang dilewati pada sesi ini: {total_duplicates_skipped}.")
+    if response_cache is not None:
+        print(f"Cache respons: {response_cache.hits} hit, {response_cache.misses} miss.")
     if total_scraped_count_overall < target_total_articles_to_scrape:
         print(f"Peringatan: Target {target_total_articles_to_scrape} artikel tidak tercapai.")
     else:
@@ -0,0 +1,66 @@
+"""
+Topik tambahan hasil `modelling.py update`.
+
+Topik baru dari pembaruan inkremental tidak dikenal oleh HDBSCAN/topic_mapper model (keduanya tidak di-fit ulang),
+sehingga transform BERTopic tidak pernah memprediksinya. Centroid embedding (ter-normalisasi L2) dan ambang
+similarity setiap topik tambahan disimpan sebagai atribut biasa di objek BERTopic yang di-pickle
+(UPDATE_TOPICS_ATTR). Setelah transform, dokumen outlier (-1) yang cukup dekat dengan salah satu centroid diberi
+topik tersebut. Langkah ini dipakai oleh API, penilaian massal, dan pembaruan berikutnya, sehingga outlier yang
+sama tidak menjadi topik baru lagi.
+"""
+import numpy as np
+
+# Modul lain di 'src' (mendukung dijalankan sebagai skrip maupun sebagai paket)
+try:
+    from .article_search import normalize_embeddings
+except ImportError:
+    from article_search import normalize_embeddings
+
+UPDATE_TOPICS_ATTR = "update_topic_centroids"
+# Ambang per topik: persentil similarity anggota klaster terhadap centroid-nya
+UPDATE_TOPIC_THRESHOLD_PERCENTILE = 5
+
+def get_update_topics(topic_model):
+    """Dict topic_ids, centroids, thresholds untuk topik tambahan model, atau None jika tidak ada."""
+    update_topics = getattr(topic_model, UPDATE_TOPICS_ATTR, None)
+    if not update_topics or len(update_topics["topic_ids"]) == 0:
+        return None
+    return update_topics
+
+def has_update_topics(topic_model):
+    return get_update_topics(topic_model) is not None
+
+def compute_topic_centroid(member_embeddings):
+    """(centroid ter-normalisasi, ambang similarity) dari embedding dokumen anggota satu topik."""
+    members = normalize_embeddings(member_embeddings)
+    centroid = normalize_embeddings(members.mean(axis=0, keepdims=True))[0]
+    threshold = float(np.percentile(members @ centroid, UPDATE_TOPIC_THRESHOLD_PERCENTILE))
+    return centroid, threshold
+
+def add_update_topics(topic_model, topic_ids, centroids, thresholds):
+    """Menambahkan topik tambahan (centroid dan ambang) ke model; topik dari pembaruan sebelumnya dipertahankan."""
+    existing = get_update_topics(topic_model)
+    topic_ids = np.asarray(topic_ids, dtype=np.int64)
+    centroids = np.asarray(centroids, dtype=np.float32).reshape(len(topic_ids), -1)
+    thresholds = np.asarray(thresholds, dtype=np.float32)
+    if existing is not None:
+        topic_ids = np.concatenate([existing["topic_ids"], topic_ids])
+        centroids = np.vstack([existing["centroids"], centroids])
+        thresholds = np.concatenate([existing["thresholds"], thresholds])
+    setattr(topic_model, UPDATE_TOPICS_ATTR, {"topic_ids": topic_ids, "centroids": centroids, "thresholds": thresholds})
+
+def assign_update_topics(topic_model, topics, embeddings):
+    """
+    Memberi topik tambahan kepada dokumen outlier (-1) yang similarity-nya terhadap centroid terdekat
+    mencapai ambang topik tersebut. Mengembalikan array topik baru (input tidak diubah).
+    """
+    topics = np.array(topics, dtype=np.int64)
+    update_topics = get_update_topics(topic_model)
+    outliers = np.flatnonzero(topics == -1)
+    if update_topics is None or not len(outliers):
+        return topics
+    similarities = normalize_embeddings(np.asarray(embeddings)[outliers]) @ update_topics["centroids"].T
+    best = np.argmax(similarities, axis=1)
+    accepted = similarities[np.arange(len(outliers)), best] >= update_topics["thresholds"][best]
+    topics[outliers[accepted]] = update_topics["topic_ids"][best[accepted]]
+    return topics
@@ -0,0 +1,108 @@
+"""
+Pool eksekutor berbatas untuk pekerjaan blocking agar tidak dijalankan di event loop.
+- Thread pool: pemanggilan model (transform/encode) yang melepas GIL di dalam torch/numpy.
+- Process pool: ekstraksi PDF (PyMuPDF) dan pra-pemrosesan teks yang murni Python.
+Jika jumlah tugas aktif + antrean melebihi batas, tugas baru ditolak dengan PoolSaturatedError.
+"""
+import asyncio
+import functools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .metrics import (POOL_INFLIGHT_TASKS, POOL_QUEUED_TASKS, POOL_UTILIZATION,
+                      POOL_REJECTED_TOTAL, POOL_TASK_SECONDS)
+
+class PoolSaturatedError(RuntimeError):
+    """Dilempar ketika pool sudah penuh dan tidak menerima tugas baru."""
+
+class BoundedPool:
+    def __init__(self, name, kind, max_workers, max_pending, initializer=None, initargs=()):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Jenis pool tidak dikenal: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(0, max_pending)
+        self.initializer = initializer
+        self.initargs = initargs
+        self._executor = None
+        self._inflight = 0
+        self._restart_lock = threading.Lock()
+
+    def start(self):
+        if self._executor is not None: return
+        if self.kind == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"{self.name}-pool",
+                                                initializer=self.initializer, initargs=self.initargs)
+        else:
+            # 'spawn' menghindari fork dari proses yang sudah memuat torch beserta thread-nya
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=self.initializer, initargs=self.initargs)
+        self._update_gauges()
+
+    def shutdown(self, wait=True):
+        if self._executor is None: return
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self._executor = None
+
+    def _replace_broken(self, broken_executor):
+        """
+        Membuat ulang pool yang rusak. Beberapa tugas bisa gagal bersamaan pada executor yang sama; hanya
+        yang pertama mengganti pool, sehingga pemanggil berikutnya tidak mematikan executor yang baru dibuat.
+        """
+        with self._restart_lock:
+            if self._executor is not broken_executor: return
+            print(f"Peringatan: Process pool '{self.name}' rusak. Membuat ulang pool...")
+            self._executor = None
+            broken_executor.shutdown(wait=False, cancel_futures=True)
+            self.start()
+
+    @property
+    def capacity(self):
+        return self.max_workers + self.max_pending
+
+    def stats(self):
+        busy = min(self._inflight, self.max_workers)
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "inflight": self._inflight,
+            "queued": max(0, self._inflight - self.max_workers),
+            "utilization": busy / self.max_workers,
+        }
+
+    def _update_gauges(self):
+        stats = self.stats()
+        POOL_INFLIGHT_TASKS.labels(self.name).set(stats["inflight"])
+        POOL_QUEUED_TASKS.labels(self.name).set(stats["queued"])
+        POOL_UTILIZATION.labels(self.name).set(stats["utilization"])
+
+    async def run(self, fn, *args, **kwargs):
+        """Menjalankan fn di pool dan menunggu hasilnya tanpa memblokir event loop."""
+        if self._executor is None:
+            raise RuntimeError(f"Pool '{self.name}' belum dijalankan.")
+        if self._inflight >= self.capacity:
+            POOL_REJECTED_TOTAL.labels(self.name).inc()
+            raise PoolSaturatedError(f"Server sedang sibuk (pool '{self.name}' penuh). Silakan coba lagi.")
+
+        call = functools.partial(fn, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        self._inflight += 1
+        self._update_gauges()
+        started = time.perf_counter()
+        try:
+            return await loop.run_in_executor(executor, call)
+        except BrokenProcessPool:
+            # Worker mati (mis. PDF yang membuat PyMuPDF crash): ganti pool agar permintaan berikutnya tetap dilayani
+            self._replace_broken(executor)
+            raise
+        finally:
+            self._inflight -= 1
+            POOL_TASK_SECONDS.labels(self.name).observe(time.perf_counter() - started)
+            self._update_gauges()
@@ -0,0 +1,69 @@
+"""
+Fungsi yang dijalankan di dalam process pool API.
+Harus didefinisikan di level modul agar bisa di-pickle oleh ProcessPoolExecutor.
+"""
+import time
+
+# Stopwords diset sekali per proses worker melalui init_worker
+WORKER_STOPWORDS = frozenset()
+
+class PdfExtractionError(ValueError):
+    """Dilempar ketika PyMuPDF gagal membaca PDF."""
+
+def load_english_stopwords():
+    try:
+        from nltk.corpus import stopwords
+        return set(stopwords.words('english'))
+    except (ImportError, LookupError):
+        print("NLTK stopwords tidak ditemukan. Pastikan NLTK terinstal dan resource diunduh.")
+        return set()
+
+def init_worker(stopword_list=None):
+    """Initializer process pool; tanpa argumen, stopwords bahasa Inggris dimuat dari NLTK di proses worker."""
+    global WORKER_STOPWORDS
+    if stopword_list is None:
+        from . import preprocess  # noqa: F401 -- impor modul ini memastikan resource NLTK sudah diunduh
+        stopword_list = load_english_stopwords()
+    WORKER_STOPWORDS = frozenset(stopword_list)
+
+def extract_text_from_pdf(file_content: bytes):
+    """Mengekstrak teks semua halaman PDF. Mengembalikan tuple (teks, jumlah_halaman)."""
+    import fitz  # PyMuPDF, hanya dibutuhkan di proses worker
+    try:
+        doc = fitz.open(stream=file_content, filetype="pdf")
+        text = "".join(page.get_text() for page in doc)
+        page_count = doc.page_count
+        doc.close()
+        return text, page_count
+    except Exception as e:
+        print(f"Error mengekstrak teks PDF: {e}")
+        raise PdfExtractionError(str(e))
+
+def preprocess_text(text: str):
+    """Membersihkan teks. Mengembalikan tuple (teks_terproses, durasi_detik)."""
+    from .preprocess import preprocess_text_pipeline
+    started = time.perf_counter()
+    processed_text = preprocess_text_pipeline(text, WORKER_STOPWORDS)
+    return processed_text, time.perf_counter() - started
+
+def preprocess_texts(texts):
+    """Versi batch dari preprocess_text. Mengembalikan tuple (list_teks_terproses, durasi_detik)."""
+    from .preprocess import preprocess_texts_batch
+    started = time.perf_counter()
+    processed_texts = preprocess_texts_batch(texts, WORKER_STOPWORDS)
+    return processed_texts, time.perf_counter() - started
+
+def extract_and_preprocess_pdf(file_content: bytes):
+    """
+    Mengekstrak teks PDF lalu membersihkannya.
+    Mengembalikan (ada_teks, teks_terproses, statistik); statistik berisi jumlah halaman, jumlah karakter
+    dan durasi tiap tahap agar proses induk bisa mencatatnya ke Prometheus.
+    """
+    started = time.perf_counter()
+    extracted_text, page_count = extract_text_from_pdf(file_content)
+    stats = {"pages": page_count, "characters": len(extracted_text),
+             "extract_seconds": time.perf_counter() - started, "preprocess_seconds": 0.0}
+    if not extracted_text.strip():
+        return False, "", stats
+    processed_text, stats["preprocess_seconds"] = preprocess_text(extracted_text)
+    return True, processed_text, stats